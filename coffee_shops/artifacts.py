@@ -0,0 +1,105 @@
+"""
+Report cache for main.py: a run whose sales.csv contents, options and code
+are unchanged points at the workbook a previous run wrote instead of
+writing a duplicate.
+
+  key = sha256 of the input digests + run parameters + code version
+        -> the report paths recorded under .artifacts/reports.json
+
+evict() bounds output/: reports older than a maximum age are removed, then
+the oldest until the total fits a size budget.
+"""
+import functools
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+
+REPORT_GLOB = "weekly_*"
+
+
+@functools.lru_cache(maxsize=1)
+def code_version() -> str:
+    """Digest of the coffee_shops sources."""
+    h = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()[:16]
+
+
+def file_digest(path: Path) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.file_digest(fh, "sha256").hexdigest()
+
+
+def digest(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size
+
+
+class ArtifactCache:
+    """Reports already written, by key, with their manifest under cache_dir."""
+
+    def __init__(self, cache_dir: Path, out_dir: Path, report_glob: str = REPORT_GLOB):
+        self.cache_dir = cache_dir
+        self.out_dir = out_dir
+        self.report_glob = report_glob
+        self.manifest_path = cache_dir / "reports.json"
+        self.reports: dict[str, dict] = {}
+        if self.manifest_path.exists():
+            self.reports = json.loads(self.manifest_path.read_text())
+
+    def report_key(self, inputs: dict, params: dict) -> str:
+        return digest({"code": code_version(), "inputs": inputs, "params": params})
+
+    def lookup(self, key: str) -> list[Path] | None:
+        """The reports recorded for key, if every one of them still exists."""
+        entry = self.reports.get(key)
+        if entry is None:
+            return None
+        paths = [Path(p) for p in entry["paths"]]
+        if not paths or not all(p.exists() for p in paths):
+            del self.reports[key]
+            return None
+        return paths
+
+    def record(self, key: str, paths: list[Path]):
+        self.reports[key] = {"paths": [p.as_posix() for p in paths], "created": time.time()}
+
+    def evict(self, max_mb: float | None = None, max_age_days: float | None = None,
+              keep: tuple[Path, ...] = ()) -> list[Path]:
+        """
+        Remove reports from out_dir over the age limit, then oldest-first over
+        the size budget; paths in (or inside) `keep` are never removed.
+        """
+        removed = []
+        now = time.time()
+        kept = {p.resolve() for p in keep} | {p.resolve().parent for p in keep}
+        found = sorted(self.out_dir.glob(self.report_glob), key=lambda p: p.stat().st_mtime)
+        sizes = {p: _size(p) for p in found}
+        total = sum(sizes.values())  # kept files count towards the budget too
+        for p in found:
+            if p.resolve() in kept:
+                continue
+            too_old = max_age_days is not None and now - p.stat().st_mtime > max_age_days * 86400
+            too_big = max_mb is not None and total > max_mb * 1e6
+            if not (too_old or too_big):
+                continue
+            shutil.rmtree(p) if p.is_dir() else p.unlink()
+            total -= sizes[p]
+            removed.append(p)
+        return removed
+
+    def save(self):
+        """Write the manifest, dropping entries whose reports are gone."""
+        self.reports = {k: e for k, e in self.reports.items()
+                        if all(Path(p).exists() for p in e["paths"])}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps(self.reports, indent=1, sort_keys=True))
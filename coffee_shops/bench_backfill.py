@@ -0,0 +1,95 @@
+"""
+Timing: a year of weekly metrics via compute_period_metrics (one grouped pass)
+vs looping the previous per-week compute_metrics 52 times.
+
+    python bench_backfill.py [--weeks 52] [--rows-per-day 2000]
+
+Runs on synthetic sales so the result does not depend on data/sales.csv.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from main import ITEM_CATEGORY, compute_period_metrics, weekly_periods
+
+
+def compute_metrics_loop(df: pd.DataFrame, today):
+    """
+    The per-week compute_metrics as it was before the period API (baseline),
+    with "this week" capped at `today` so past weeks can be backfilled.
+    """
+    df["date"] = pd.to_datetime(df["date"])
+    this_week_mask = df["date"] >= (today - pd.Timedelta(days=7))
+    last_week_mask = (df["date"] < (today - pd.Timedelta(days=7))) & \
+                     (df["date"] >= (today - pd.Timedelta(days=14)))
+    this_week = df[this_week_mask & (df["date"] < today)].copy()
+    last_week = df[last_week_mask].copy()
+    rev_this = float(this_week["revenue"].sum())
+    rev_last = float(last_week["revenue"].sum())
+    orders_this = int(this_week["order_id"].nunique())
+    orders_last = int(last_week["order_id"].nunique())
+    daily_rev = (this_week.groupby(this_week["date"].dt.date)["revenue"]
+                 .sum().reset_index().rename(columns={"date": "day"}))
+    peak_day = daily_rev.sort_values("revenue", ascending=False).head(1) if not daily_rev.empty else None
+    top_items_revenue = this_week.groupby("item")["revenue"].sum().sort_values(ascending=False).reset_index()
+    top_items_units = (this_week.groupby("item")["item"].count().sort_values(ascending=False)
+                       .reset_index(name="units"))
+    this_week["category"] = this_week["item"].map(ITEM_CATEGORY).fillna("Other")
+    category_rev = this_week.groupby("category")["revenue"].sum().sort_values(ascending=False).reset_index()
+    return {
+        "rev_this": round(rev_this, 2), "rev_last": round(rev_last, 2),
+        "orders_this": orders_this, "orders_last": orders_last,
+        "aov_this": round(rev_this / orders_this, 2) if orders_this else 0.0,
+        "aov_last": round(rev_last / orders_last, 2) if orders_last else 0.0,
+        "wow_pct": round(((rev_this - rev_last) / rev_last * 100.0), 1) if rev_last else None,
+        "units_this": int(len(this_week)), "daily_rev": daily_rev, "peak_day": peak_day,
+        "top_items_revenue": top_items_revenue, "top_items_units": top_items_units,
+        "category_rev": category_rev,
+    }
+
+
+def synthetic_sales(days: int, rows_per_day: int, end: pd.Timestamp, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = days * rows_per_day
+    items = [*ITEM_CATEGORY, "Scone", "Chai"]
+    return pd.DataFrame({
+        "date": (end - pd.Timedelta(days=days) + pd.to_timedelta(rng.integers(0, days, n), unit="D"))
+                .strftime("%Y-%m-%d"),
+        "order_id": rng.integers(0, n // 2, n),
+        "item": rng.choice(items, n),
+        "revenue": rng.choice([3.75, 3.95, 4.5, 5.25, 5.75], n),
+    })
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--weeks", type=int, default=52)
+    ap.add_argument("--rows-per-day", type=int, default=2000)
+    args = ap.parse_args()
+
+    end = pd.Timestamp("2025-09-22")
+    raw = synthetic_sales(7 * (args.weeks + 1), args.rows_per_day, end)
+    periods = weekly_periods(args.weeks, end)
+    print(f"{len(raw):,} rows, {len(periods)} weekly periods")
+
+    t0 = time.perf_counter()
+    df = raw.copy()  # dates are parsed in place on the first call, as in a real loop
+    looped = [compute_metrics_loop(df, e) for _, e in periods]
+    t_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batched = compute_period_metrics(raw.copy(), periods)
+    t_batch = time.perf_counter() - t0
+
+    for a, b in zip(looped, batched):
+        for key, value in a.items():
+            if isinstance(value, pd.DataFrame):
+                pd.testing.assert_frame_equal(value, b[key])
+            else:
+                assert value == b[key], (key, value, b[key])
+    print(f"loop x{len(periods)}: {t_loop:.2f}s   one pass: {t_batch:.2f}s   "
+          f"speedup {t_loop / t_batch:.1f}x (results identical)")
+
+
+if __name__ == "__main__":
+    main()
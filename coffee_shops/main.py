@@ -1,10 +1,16 @@
+import argparse
 import datetime as dt
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from artifacts import ArtifactCache, file_digest
 
 DATA = Path("data/sales.csv")
 OUTDIR = Path("output")
 OUTDIR.mkdir(exist_ok=True)
+# Reports already written, keyed by a digest of sales.csv, the run parameters
+# and the scripts (artifacts.py)
+ARTIFACTS = OUTDIR / ".artifacts"
 
 # --- Add a simple category map (edit as you like) ---
 ITEM_CATEGORY = {
@@ -17,106 +23,295 @@ ITEM_CATEGORY = {
     "Croissant": "Pastry",
 }
 
-def compute_metrics(df: pd.DataFrame):
-    df["date"] = pd.to_datetime(df["date"])
-    today = pd.Timestamp.today().normalize()
+REQUIRED = ["date", "order_id", "item", "revenue"]
+
+# sales.csv rules, the same as the starbucks_demo EOD files': ISO 8601 or US
+# m/d/Y dates, integer order ids, finite decimal revenue; pandas' default NA
+# strings are missing values
+_ISO_RE = r"^\d{4}-\d{2}-\d{2}([T ]([01]\d|2[0-3]):[0-5]\d(:[0-5]\d(\.\d{1,6})?)?)?$"
+_US_RE = r"^\d{1,2}/\d{1,2}/\d{4}$"
+_INT_RE = r"^[+-]?\d{1,18}$"
+_FLOAT_RE = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+NULL_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+               "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+
+def _parse_dates(text: pd.Series) -> pd.Series:
+    """ISO or US dates as datetime64; NaT for anything else, including days that do not exist."""
+    out = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+    for pattern, fmt in [(_ISO_RE, "ISO8601"), (_US_RE, "%m/%d/%Y")]:
+        hit = text.str.match(pattern, na=False)
+        if hit.any():
+            out[hit] = pd.to_datetime(text[hit], format=fmt, errors="coerce")
+    return out
 
-    # Windows: past 7 days = "this week" window; prior 7 = last week
-    this_week_mask = df["date"] >= (today - pd.Timedelta(days=7))
-    last_week_mask = (df["date"] < (today - pd.Timedelta(days=7))) & \
-                     (df["date"] >= (today - pd.Timedelta(days=14)))
-
-    this_week = df[this_week_mask].copy()
-    last_week = df[last_week_mask].copy()
-
-    # ---- Base metrics ----
-    rev_this = float(this_week["revenue"].sum())
-    rev_last = float(last_week["revenue"].sum())
-
-    orders_this = int(this_week["order_id"].nunique())
-    orders_last = int(last_week["order_id"].nunique())
-
-    aov_this = round(rev_this / orders_this, 2) if orders_this else 0.0
-    aov_last = round(rev_last / orders_last, 2) if orders_last else 0.0
-
-    wow_pct = round(((rev_this - rev_last) / rev_last * 100.0), 1) if rev_last else None
-
-    # ---- Extra KPIs ----
-    units_this = int(len(this_week))  # each row is a line item
-    # Daily revenue (date-by-date)
-    daily_rev = (this_week.groupby(this_week["date"].dt.date)["revenue"]
-                 .sum().reset_index().rename(columns={"date":"day","revenue":"revenue"}))
-    # Peak day
-    peak_day = daily_rev.sort_values("revenue", ascending=False).head(1) if not daily_rev.empty else None
-
-    # Top items by revenue (already had)
-    top_items_revenue = (this_week.groupby("item")["revenue"]
-                         .sum().sort_values(ascending=False).reset_index())
-
-    # Top items by units sold
-    top_items_units = (this_week.groupby("item")["item"]
-                       .count().sort_values(ascending=False)
-                       .reset_index(name="units"))
-
-    # Category revenue (map unknowns to "Other")
-    this_week["category"] = this_week["item"].map(ITEM_CATEGORY).fillna("Other")
-    category_rev = (this_week.groupby("category")["revenue"]
-                    .sum().sort_values(ascending=False).reset_index())
-
-    metrics = {
-        "rev_this": round(rev_this, 2),
-        "rev_last": round(rev_last, 2),
-        "orders_this": orders_this,
-        "orders_last": orders_last,
-        "aov_this": aov_this,
-        "aov_last": aov_last,
-        "wow_pct": wow_pct,
-        "units_this": units_this,
-        "daily_rev": daily_rev,
-        "peak_day": peak_day,
-        "top_items_revenue": top_items_revenue,
-        "top_items_units": top_items_units,
-        "category_rev": category_rev,
+
+def load_sales(path: Path = DATA) -> pd.DataFrame:
+    """
+    Read and validate sales.csv: date datetime64, order_id int32 (int64 if
+    needed), item categorical, revenue float64. Rows with a missing or
+    unparseable date, a non-integer order_id or a non-finite revenue are
+    skipped and listed.
+    """
+    raw = pd.read_csv(path, dtype=str, na_values=NULL_VALUES, keep_default_na=False)
+    if not set(REQUIRED).issubset(raw.columns):
+        raise ValueError(f"{path} must include columns: {REQUIRED}")
+
+    text = {c: raw[c].str.strip() for c in ["date", "order_id", "revenue"]}
+    date = _parse_dates(text["date"])
+    revenue = pd.to_numeric(text["revenue"].where(text["revenue"].str.match(_FLOAT_RE, na=False)),
+                            errors="coerce").astype("float64")
+    problems = {
+        "date": date.isna(),
+        "order_id": ~text["order_id"].str.match(_INT_RE, na=False),
+        "revenue": ~np.isfinite(revenue),
     }
-    return metrics
+    bad = problems["date"] | problems["order_id"] | problems["revenue"]
+    for pos in np.flatnonzero(bad.to_numpy()):
+        row = raw.iloc[pos]
+        reason = "; ".join(f"{c} {'missing' if pd.isna(row[c]) else f'invalid {row[c]!r}'}"
+                           for c, mask in problems.items() if mask.iloc[pos])
+        print(f"Skipped {path} line {pos + 2} ({reason}): {','.join(row.fillna('').astype(str))}")
+
+    keep = ~bad
+    ids = text["order_id"][keep].to_numpy(dtype="int64")
+    fits = ids.size == 0 or (np.iinfo(np.int32).min <= ids.min() and ids.max() <= np.iinfo(np.int32).max)
+    return pd.DataFrame({
+        "date": date[keep].to_numpy(),
+        "order_id": ids.astype("int32" if fits else "int64"),
+        "item": pd.Categorical(raw["item"][keep].to_numpy(dtype=object)),
+        "revenue": revenue[keep].to_numpy(),
+    })
+
+
+def compute_metrics(df: pd.DataFrame, today=None):
+    df["date"] = pd.to_datetime(df["date"])
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today).normalize()
+
+    # Windows: past 7 days = "this week" window (open-ended); prior 7 = last week
+    week = pd.Timedelta(days=7)
+    return compute_period_metrics(df, [(today - week, None)], prev=[(today - 2 * week, today - week)])[0]
+
+
+def weekly_periods(weeks: int, end) -> list[tuple]:
+    """The `weeks` consecutive 7-day periods ending at `end` (exclusive), oldest first."""
+    end = pd.Timestamp(end).normalize()
+    return [(end - pd.Timedelta(days=7 * (k + 1)), end - pd.Timedelta(days=7 * k))
+            for k in reversed(range(weeks))]
+
+
+def _span_slices(dates: pd.Series, spans: list[tuple]):
+    """Row positions of each (start, end) span (end None = open), in original row order."""
+    values = dates.to_numpy()
+    order = np.argsort(values, kind="stable")
+    sorted_dates = values[order]
+    n_valid = int((~np.isnat(sorted_dates)).sum())  # NaT sorts last and never matches
+    for start, end in spans:
+        lo = int(np.searchsorted(sorted_dates[:n_valid], start.to_datetime64(), "left"))
+        hi = int(np.searchsorted(sorted_dates[:n_valid], end.to_datetime64(), "left")) if end is not None else n_valid
+        yield np.sort(order[lo:hi])
+
+
+def _per_span(grouped: pd.Series, n_spans: int, labels: pd.Index | None = None):
+    """Split a (span, key) groupby result into one Series per span; labels decode integer keys."""
+    keys = grouped.index.get_level_values(1)
+    if labels is not None:
+        keys = labels.take(keys)
+    bounds = np.searchsorted(grouped.index.get_level_values(0).to_numpy(), np.arange(n_spans + 1))
+    vals = grouped.to_numpy()
+    return [pd.Series(vals[a:b], index=keys[a:b], name=grouped.name)
+            for a, b in zip(bounds[:-1], bounds[1:])]
+
 
-def save_report(m):
+def compute_period_metrics(df: pd.DataFrame, periods: list[tuple], prev: list[tuple] | None = None):
+    """
+    compute_metrics() for every (start, end) period in one grouped pass.
+    end is exclusive (None = open-ended); prev gives each period's comparison
+    window, by default the equal-length span right before it.
+    Returns one dict per period, shaped like compute_metrics() plus "start"/"end".
+    """
+    periods = [(pd.Timestamp(s), None if e is None else pd.Timestamp(e)) for s, e in periods]
+    if prev is None:
+        prev = [(s - (e - s), s) for s, e in periods]
+    prev = [(pd.Timestamp(s), None if e is None else pd.Timestamp(e)) for s, e in prev]
+    spans = list(dict.fromkeys(periods + prev))  # a backfill's weeks double as each other's prev
+    span_id = {span: k for k, span in enumerate(spans)}
+
+    # One frame holding every span's rows, keyed by span
+    dates = pd.to_datetime(df["date"])
+    slices = list(_span_slices(dates, spans))
+    idx = np.concatenate(slices) if slices else np.array([], dtype=int)
+    key = np.repeat(np.arange(len(spans)), [len(s) for s in slices])
+    win = df[["order_id", "item", "revenue"]].take(idx).reset_index(drop=True)
+    win["date"] = dates.to_numpy()[idx]
+    win["_span"] = key
+    bounds = np.searchsorted(key, np.arange(len(spans) + 1))
+
+    # Items as sorted integer codes (groupby order); the category map is
+    # applied once per distinct item, not per row
+    codes, items = pd.factorize(win["item"], sort=True)
+    item_cats = np.array([ITEM_CATEGORY.get(u, "Other") for u in items] + ["Other"], dtype=object)
+    categories = pd.Index(sorted(set(item_cats)))
+    win["_item"] = codes
+    win["_cat"] = categories.get_indexer(item_cats)[codes]
+
+    rev = win["revenue"].to_numpy(dtype="float64", na_value=np.nan)
+    rev = np.where(np.isnan(rev), 0.0, rev)
+    revenue = [float(rev[a:b].sum()) for a, b in zip(bounds[:-1], bounds[1:])]
+    orders = win.groupby("_span")["order_id"].nunique().reindex(range(len(spans)), fill_value=0)
+    daily = _per_span(win.groupby(["_span", win["date"].dt.normalize()])["revenue"].sum(), len(spans))
+    by_item = win[codes >= 0].groupby(["_span", "_item"])["revenue"].agg(["sum", "size"])
+    items_rev = _per_span(by_item["sum"], len(spans), items)
+    items_units = _per_span(by_item["size"], len(spans), items)
+    category = _per_span(win.groupby(["_span", "_cat"])["revenue"].sum(), len(spans), categories)
+
+    results = []
+    for period, before in zip(periods, prev):
+        k, j = span_id[period], span_id[before]
+        rev_this, rev_last = revenue[k], revenue[j]
+        orders_this, orders_last = int(orders.iloc[k]), int(orders.iloc[j])
+
+        day = daily[k]
+        daily_rev = pd.DataFrame({"day": pd.Series([d.date() for d in day.index], dtype=object),
+                                  "revenue": day.to_numpy()})
+        peak_day = daily_rev.sort_values("revenue", ascending=False).head(1) if not daily_rev.empty else None
+
+        results.append({
+            "start": period[0],
+            "end": period[1],
+            "rev_this": round(rev_this, 2),
+            "rev_last": round(rev_last, 2),
+            "orders_this": orders_this,
+            "orders_last": orders_last,
+            "aov_this": round(rev_this / orders_this, 2) if orders_this else 0.0,
+            "aov_last": round(rev_last / orders_last, 2) if orders_last else 0.0,
+            "wow_pct": round(((rev_this - rev_last) / rev_last * 100.0), 1) if rev_last else None,
+            "units_this": int(bounds[k + 1] - bounds[k]),
+            "daily_rev": daily_rev,
+            "peak_day": peak_day,
+            "top_items_revenue": items_rev[k].rename_axis("item").rename("revenue")
+                                 .sort_values(ascending=False).reset_index(),
+            "top_items_units": items_units[k].rename_axis("item")
+                               .sort_values(ascending=False).reset_index(name="units"),
+            "category_rev": category[k].rename_axis("category").rename("revenue")
+                            .sort_values(ascending=False).reset_index(),
+        })
+    return results
+
+def _write_period(xw, m):
+    # Summary
+    pd.DataFrame([
+        ["Revenue (this week)", m["rev_this"]],
+        ["Revenue (last week)", m["rev_last"]],
+        ["WoW Change (%)", m["wow_pct"]],
+        ["Orders (this week)", m["orders_this"]],
+        ["Orders (last week)", m["orders_last"]],
+        ["Avg Order Value (this week)", m["aov_this"]],
+        ["Avg Order Value (last week)", m["aov_last"]],
+        ["Units sold (this week)", m["units_this"]],
+    ], columns=["Metric","Value"]).to_excel(xw, index=False, sheet_name="Summary")
+
+    # Daily revenue
+    m["daily_rev"].to_excel(xw, index=False, sheet_name="Daily Revenue")
+
+    # Peak day (single row)
+    if m["peak_day"] is not None and not m["peak_day"].empty:
+        m["peak_day"].to_excel(xw, index=False, sheet_name="Peak Day")
+
+    # Top items by revenue / by units
+    m["top_items_revenue"].to_excel(xw, index=False, sheet_name="Top Items (Revenue)")
+    m["top_items_units"].to_excel(xw, index=False, sheet_name="Top Items (Units)")
+
+    # Category revenue
+    m["category_rev"].to_excel(xw, index=False, sheet_name="Category Revenue")
+
+
+def _write_backfill(xw, results):
+    """All periods in one workbook: a row per period, long tables with a Week column."""
+    week = lambda m: m["start"].date()
+    pd.DataFrame([
+        [week(m), m["rev_this"], m["wow_pct"], m["orders_this"], m["aov_this"], m["units_this"],
+         None if m["peak_day"] is None else m["peak_day"]["day"].iloc[0]]
+        for m in results
+    ], columns=["Week", "Revenue", "WoW Change (%)", "Orders", "Avg Order Value",
+                "Units sold", "Peak Day"]).to_excel(xw, index=False, sheet_name="Summary")
+    for key, sheet in [("daily_rev", "Daily Revenue"), ("top_items_revenue", "Top Items (Revenue)"),
+                       ("top_items_units", "Top Items (Units)"), ("category_rev", "Category Revenue")]:
+        pd.concat([m[key].assign(Week=week(m)) for m in results], ignore_index=True) \
+            .pipe(lambda t: t[["Week", *t.columns[:-1]]]) \
+            .to_excel(xw, index=False, sheet_name=sheet)
+
+
+def save_report(m, batch: bool = False):
+    """
+    Write one period's metrics, or a list of them (a backfill): one workbook
+    by default, or with batch=True a folder holding a workbook per period.
+    """
     ts = dt.datetime.now().strftime("%Y-%m-%d_%H%M%S")  # unique filename
-    xlsx = OUTDIR / f"weekly_report_{ts}.xlsx"
+    if isinstance(m, dict):
+        xlsx = OUTDIR / f"weekly_report_{ts}.xlsx"
+        with pd.ExcelWriter(xlsx) as xw:
+            _write_period(xw, m)
+        print("Report generated:", xlsx)
+        return xlsx
 
-    with pd.ExcelWriter(xlsx) as xw:
-        # Summary
-        pd.DataFrame([
-            ["Revenue (this week)", m["rev_this"]],
-            ["Revenue (last week)", m["rev_last"]],
-            ["WoW Change (%)", m["wow_pct"]],
-            ["Orders (this week)", m["orders_this"]],
-            ["Orders (last week)", m["orders_last"]],
-            ["Avg Order Value (this week)", m["aov_this"]],
-            ["Avg Order Value (last week)", m["aov_last"]],
-            ["Units sold (this week)", m["units_this"]],
-        ], columns=["Metric","Value"]).to_excel(xw, index=False, sheet_name="Summary")
+    if not batch:
+        xlsx = OUTDIR / f"weekly_backfill_{ts}.xlsx"
+        with pd.ExcelWriter(xlsx) as xw:
+            _write_backfill(xw, m)
+        print(f"Backfill report generated ({len(m)} weeks):", xlsx)
+        return xlsx
 
-        # Daily revenue
-        m["daily_rev"].to_excel(xw, index=False, sheet_name="Daily Revenue")
+    folder = OUTDIR / f"weekly_backfill_{ts}"
+    folder.mkdir(exist_ok=True)
+    for period in m:
+        with pd.ExcelWriter(folder / f"weekly_report_{period['start']:%Y-%m-%d}.xlsx") as xw:
+            _write_period(xw, period)
+    print(f"Backfill reports generated ({len(m)} workbooks):", folder)
+    return folder
 
-        # Peak day (single row)
-        if m["peak_day"] is not None and not m["peak_day"].empty:
-            m["peak_day"].to_excel(xw, index=False, sheet_name="Peak Day")
+def report_key(artifacts: ArtifactCache, params: dict, path: Path = DATA) -> str:
+    return artifacts.report_key({path.as_posix(): file_digest(path)}, params)
 
-        # Top items by revenue / by units
-        m["top_items_revenue"].to_excel(xw, index=False, sheet_name="Top Items (Revenue)")
-        m["top_items_units"].to_excel(xw, index=False, sheet_name="Top Items (Units)")
 
-        # Category revenue
-        m["category_rev"].to_excel(xw, index=False, sheet_name="Category Revenue")
+def evict(artifacts: ArtifactCache, args, keep: Path):
+    removed = artifacts.evict(args.output_max_mb, args.output_max_age_days, keep=(keep,))
+    artifacts.save()
+    if removed:
+        print(f"Removed {len(removed)} old report(s) from {OUTDIR}")
 
-    print("Report generated:", xlsx)
 
 def main():
-    df = pd.read_csv(DATA)
-    metrics = compute_metrics(df)
-    save_report(metrics)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--weeks", type=int,
+                    help="backfill this many 7-day periods instead of the current week")
+    ap.add_argument("--end", help="backfill end date, exclusive (default: today)")
+    ap.add_argument("--batch", action="store_true", help="one workbook per week for --weeks")
+    ap.add_argument("--force", action="store_true",
+                    help="rebuild even if an identical report (same data and options) exists")
+    ap.add_argument("--output-max-mb", type=float,
+                    help="after the run, delete the oldest reports in output/ beyond this size")
+    ap.add_argument("--output-max-age-days", type=float,
+                    help="after the run, delete reports in output/ older than this")
+    args = ap.parse_args()
+
+    today = pd.Timestamp.today().normalize()
+    end = pd.Timestamp(args.end) if args.end else today
+    artifacts = ArtifactCache(ARTIFACTS, OUTDIR)
+    key = report_key(artifacts, {"weeks": args.weeks, "end": str(end.date()), "batch": args.batch})
+    if not args.force and (existing := artifacts.lookup(key)) is not None:
+        print("Data and options unchanged; existing report:", existing[0])
+        evict(artifacts, args, existing[0])
+        return
+
+    df = load_sales()
+    if args.weeks:
+        out = save_report(compute_period_metrics(df, weekly_periods(args.weeks, end)), batch=args.batch)
+    else:
+        metrics = compute_metrics(df)
+        out = save_report(metrics)
+    artifacts.record(key, [out])
+    evict(artifacts, args, out)
 
 if __name__ == "__main__":
     main()
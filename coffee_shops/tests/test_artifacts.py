@@ -0,0 +1,26 @@
+import os
+import time
+from artifacts import ArtifactCache
+
+
+def test_report_lookup_and_eviction(tmp_path):
+    out = tmp_path / "output"
+    out.mkdir()
+    old, new = out / "weekly_report_old.xlsx", out / "weekly_report_new.xlsx"
+    old.write_bytes(b"x" * 2000)
+    new.write_bytes(b"x" * 2000)
+    os.utime(old, (time.time() - 3 * 86400,) * 2)
+    (out / "notes.txt").write_text("not a report")
+
+    cache = ArtifactCache(out / ".artifacts", out)
+    key = cache.report_key({"data/sales.csv": "abc"}, {"weeks": 2})
+    assert key != cache.report_key({"data/sales.csv": "abd"}, {"weeks": 2})
+    cache.record(key, [old])
+    cache.save()
+    assert ArtifactCache(out / ".artifacts", out).lookup(key) == [old]
+
+    assert cache.evict(max_age_days=1, keep=(new,)) == [old]
+    assert cache.evict(max_mb=0.001, keep=(new,)) == []  # the kept report is never removed
+    cache.save()
+    assert cache.lookup(key) is None and cache.reports == {}
+    assert sorted(p.name for p in out.iterdir()) == [".artifacts", "notes.txt", new.name]
@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+from bench_backfill import compute_metrics_loop, synthetic_sales
+from main import compute_metrics, compute_period_metrics, load_sales, weekly_periods
+
+END = pd.Timestamp("2025-09-22")
+
+
+def _assert_metrics_equal(got, want):
+    for key, value in want.items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(got[key], value)
+        else:
+            assert got[key] == value, key
+
+
+@pytest.mark.parametrize("weeks", [1, 5])
+def test_backfill_matches_per_week_loop(weeks):
+    raw = synthetic_sales(7 * (weeks + 1), 60, END)
+    periods = weekly_periods(weeks, END)
+    assert periods[-1] == (END - pd.Timedelta(days=7), END)
+    got = compute_period_metrics(raw.copy(), periods)
+    for (start, end), m in zip(periods, got):
+        assert (m["start"], m["end"]) == (start, end)
+        _assert_metrics_equal(m, compute_metrics_loop(raw.copy(), end))
+
+
+def test_compute_metrics_is_the_open_ended_week():
+    raw = synthetic_sales(21, 60, END)
+    _assert_metrics_equal(compute_metrics(raw.copy(), today=END), compute_metrics_loop(raw.copy(), END))
+
+
+def test_arbitrary_periods():
+    raw = synthetic_sales(40, 30, END)
+    df = raw.assign(date=pd.to_datetime(raw["date"]))
+    periods = [(END - pd.Timedelta(days=30), END - pd.Timedelta(days=2)),   # 28 days
+               (END - pd.Timedelta(days=10), END - pd.Timedelta(days=7)),   # inside the first
+               (END + pd.Timedelta(days=1), END + pd.Timedelta(days=4))]    # no rows
+    got = compute_period_metrics(raw.copy(), periods)
+    for (start, end), m in zip(periods, got):
+        this = df[(df["date"] >= start) & (df["date"] < end)]
+        before = df[(df["date"] >= start - (end - start)) & (df["date"] < start)]
+        assert m["rev_this"] == round(this["revenue"].sum(), 2)
+        assert m["rev_last"] == round(before["revenue"].sum(), 2)
+        assert (m["orders_this"], m["orders_last"]) == (this["order_id"].nunique(), before["order_id"].nunique())
+        assert m["units_this"] == len(this)
+        assert len(m["daily_rev"]) == this["date"].nunique()
+    assert got[2]["peak_day"] is None and got[2]["aov_this"] == 0.0
+
+
+def test_load_sales_skips_invalid_rows(tmp_path, capsys):
+    path = tmp_path / "sales.csv"
+    path.write_text("date,order_id,item,revenue,cashier\n"
+                    "2025-09-15,1,Latte,5.25,A\n"
+                    "2025-09-15,x,Mocha,5.75,A\n"
+                    "2025-02-30,2,Latte,5.25,B\n"
+                    "2025-09-16,3,Croissant,inf,B\n"
+                    "9/16/2025 ,4,Croissant,3.95,B\n")
+    df = load_sales(path)
+    assert list(df.columns) == ["date", "order_id", "item", "revenue"]
+    assert df["order_id"].tolist() == [1, 4]
+    assert df["date"].tolist() == [pd.Timestamp("2025-09-15"), pd.Timestamp("2025-09-16")]
+    assert df["item"].dtype == "category" and df["revenue"].dtype == "float64"
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+    assert capsys.readouterr().out.count("Skipped") == 3
+    path.write_text("date,item,revenue\n2025-09-15,Latte,5.25\n")
+    with pytest.raises(ValueError):
+        load_sales(path)
@@ -0,0 +1 @@
+# empty file is fine; it just marks this as a package
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Benchmark: write_excel time and peak memory as the store count grows, for
+the per-cell writer it replaced (every cell through df.iloc, its format
+picked per cell) and for the bulk writer with sheets held in memory or
+streamed (xlsxwriter constant_memory). The per-cell workbook's sheets are
+checked against the in-memory one's ("same" column).
+
+Run from starbucks_demo/:
+    python -m bench.excel --stores 10 100 500
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+import pandas as pd
+from report.excel_report import ReportWorkbook, _freeze_and_page, _set_col_widths, write_excel
+from report.io_load import collect_store_frames
+from report.metrics import kpis_for_windows, report_tables
+from .kpis import scaled_stores
+
+
+def report_inputs(stores: dict[str, pd.DataFrame]):
+    """write_excel arguments for the weekly/monthly windows ending after the data."""
+    today = max(df["date"].max() for df in stores.values()).normalize() + pd.Timedelta(days=1)
+    week_start, month_start = today - pd.Timedelta(days=7), today - pd.Timedelta(days=30)
+    kpis = kpis_for_windows(stores, {"week": (week_start, today), "month": (month_start, today)})
+    weekly_df, weekly_tabs = report_tables(kpis, "week", "Week Range", "bench")
+    monthly_df, monthly_tabs = report_tables(kpis, "month", "Month Range", "bench")
+    return weekly_df, monthly_df, weekly_tabs, monthly_tabs
+
+
+class PerCellWorkbook(ReportWorkbook):
+    """ReportWorkbook with the original per-cell table loops (the baseline)."""
+
+    def write_table(self, ws, df, title=None,
+                    money=("Revenue",),
+                    pct=("Drinks %", "Food %", "Seasonal %", "% of Total", "% Orders w/ Food"),
+                    aov=("AOV",), row=0):
+        cols = list(df.columns)
+        r0 = row
+        if title:
+            ws.write(r0, 0, title, self.f_title)
+            r0 += 1
+        for j, c in enumerate(cols):
+            ws.write(r0, j, c, self.f_hdr)
+        for i in range(len(df)):
+            for j, c in enumerate(cols):
+                v = df.iloc[i, j]
+                if c in money:
+                    ws.write(r0 + 1 + i, j, v, self.f_money)
+                elif c in aov:
+                    ws.write(r0 + 1 + i, j, v, self.f_aov)
+                elif c in pct:
+                    ws.write(r0 + 1 + i, j, (v / 100 if isinstance(v, (int, float)) and v > 1 else v),
+                             self.f_pct)
+                else:
+                    ws.write(r0 + 1 + i, j, v, self.f_cell)
+        _set_col_widths(ws, [6, 16, 24, 12, 10, 10, 10, 10, 12, 16, 16, 11])
+        last_row = r0 + 1 + len(df)
+        _freeze_and_page(ws, last_row, len(cols))
+        return last_row, len(cols)
+
+    def add_store(self, store: str, tabs_week: dict, tabs_month: dict):
+        ws = self.wb.add_worksheet(store[:31])
+        _set_col_widths(ws, [18, 12, 12, 12, 12, 12, 12, 12])
+        r, max_cols = 0, 1
+        for period, tabs in (("WEEKLY", tabs_week), ("MONTHLY", tabs_month)):
+            for name, df in tabs.items():
+                ws.write(r, 0, f"{store} – {period} • {name}", self.f_sub)
+                r += 1
+                cols = list(df.columns)
+                max_cols = max(max_cols, len(cols))
+                for j, c in enumerate(cols):
+                    ws.write(r, j, c, self.f_hdr)
+                for i in range(len(df)):
+                    for j, c in enumerate(cols):
+                        ws.write(r + 1 + i, j, df.iloc[i, j], self.f_cell)
+                r += len(df) + 3
+        _freeze_and_page(ws, r, max_cols)
+
+
+def write_excel_per_cell(weekly_df, monthly_df, store_tabs_week, store_tabs_month,
+                         constant_memory: bool = False, out_dir: Path = Path(".")) -> Path:
+    """write_excel through PerCellWorkbook."""
+    book = PerCellWorkbook(out_dir / "per_cell.xlsx", constant_memory=constant_memory)
+    for store in sorted(store_tabs_week):
+        book.add_store(store, store_tabs_week[store], store_tabs_month[store])
+    return book.close(weekly_df, monthly_df)
+
+
+MODES = {
+    "per-cell": (write_excel_per_cell, False),
+    "in-memory": (write_excel, False),
+    "streamed": (write_excel, True),
+}
+
+
+def _sheets(path: Path) -> dict[str, bytes]:
+    """Worksheet and shared-string parts of a workbook (everything but timestamps)."""
+    with zipfile.ZipFile(path) as z:
+        return {n: z.read(n) for n in z.namelist()
+                if n.startswith("xl/worksheets/") or n == "xl/sharedStrings.xml"}
+
+
+def measure(args: tuple, mode: str) -> tuple[float, float, float, dict]:
+    """
+    (seconds, peak traced MB, file MB, sheet parts) for one writer mode;
+    timed and traced in separate runs.
+    """
+    write, constant_memory = MODES[mode]
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        path = write(*args, constant_memory=constant_memory, out_dir=Path(tmp))
+        elapsed = time.perf_counter() - t0
+        size = path.stat().st_size
+        sheets = _sheets(path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        write(*args, constant_memory=constant_memory, out_dir=Path(tmp))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak / 1e6, size / 1e6, sheets
+
+
+def run():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stores", type=int, nargs="+", default=[10, 100, 500])
+    args = ap.parse_args()
+
+    base = collect_store_frames()
+    print(f"{'stores':>8} {'mode':>10} {'seconds':>8} {'peak MB':>8} {'file MB':>8} {'same':>5}")
+    for n in args.stores:
+        inputs = report_inputs(scaled_stores(base, n))
+        sheets = {}
+        for mode in MODES:
+            secs, peak, size, sheets[mode] = measure(inputs, mode)
+            same = ("yes" if sheets[mode] == sheets["per-cell"] else "NO") if mode == "in-memory" else ""
+            print(f"{n:>8} {mode:>10} {secs:>8.2f} {peak:>8.1f} {size:>8.2f} {same:>5}")
+
+
+if __name__ == "__main__":
+    run()
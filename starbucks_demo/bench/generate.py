@@ -0,0 +1,116 @@
+"""
+Seeded synthetic franchise data in the EOD layout (date,order_id,item,category,revenue).
+
+Run from starbucks_demo/:
+    python -m bench.generate --out /tmp/franchise --stores 100 --days 28 --orders-per-day 300
+    python -m bench.generate --out /tmp/franchise --weekly   # starbucks_storeNNN_week.csv exports
+
+Same arguments and seed give byte-identical files.
+"""
+import argparse
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# item, category, price, relative popularity
+MENU = [
+    ("Caffè Latte", "Drink", 5.25, 1.2),
+    ("Americano", "Drink", 3.95, 1.0),
+    ("Cold Brew", "Drink", 4.75, 1.1),
+    ("Caramel Macchiato", "Drink", 5.95, 0.9),
+    ("Matcha Latte", "Drink", 5.45, 0.8),
+    ("Blueberry Muffin", "Food", 3.25, 0.7),
+    ("Croissant", "Food", 3.45, 0.7),
+    ("Spinach Feta Wrap", "Food", 4.95, 0.6),
+    ("Turkey Pesto Panini", "Food", 6.95, 0.5),
+]
+# item, category, price, popularity, first month, last month (inclusive)
+SEASONAL = [
+    ("Pumpkin Spice Latte", "Seasonal", 6.25, 1.3, 9, 11),
+    ("Peppermint Mocha", "Seasonal", 6.45, 1.2, 11, 12),
+    ("Iced Lavender Latte", "Seasonal", 5.95, 0.9, 3, 5),
+    ("Summer Berry Refresher", "Seasonal", 4.95, 0.9, 6, 8),
+]
+# Items per order: mostly one or two
+BASKET_SIZES = np.array([1, 2, 3, 4, 5])
+BASKET_WEIGHTS = np.array([0.45, 0.30, 0.15, 0.07, 0.03])
+# Mon..Sun traffic multipliers
+WEEKDAY_TRAFFIC = np.array([0.9, 0.9, 0.95, 1.0, 1.1, 1.25, 1.15])
+
+
+def _menu_for(day: pd.Timestamp):
+    items = list(MENU) + [s[:4] for s in SEASONAL if s[4] <= day.month <= s[5]]
+    names, cats, prices, pop = zip(*items)
+    return np.array(names, dtype=object), np.array(cats, dtype=object), np.array(prices), \
+        np.array(pop) / sum(pop)
+
+
+def store_day(rng: np.random.Generator, day: pd.Timestamp, orders: int, first_id: int) -> pd.DataFrame:
+    """Line items for one store-day: `orders` baskets with ids from first_id."""
+    names, cats, prices, pop = _menu_for(day)
+    sizes = rng.choice(BASKET_SIZES, size=orders, p=BASKET_WEIGHTS)
+    n = int(sizes.sum())
+    pick = rng.choice(len(names), size=n, p=pop)
+    return pd.DataFrame({
+        "date": day,
+        "order_id": np.repeat(np.arange(first_id, first_id + orders), sizes),
+        "item": names[pick],
+        "category": cats[pick],
+        "revenue": prices[pick],
+    })
+
+
+def generate_franchise(out_dir: Path, stores: int = 10, days: int = 28, orders_per_day: int = 200,
+                       start: str = "2025-09-01", seed: int = 0, weekly: bool = False) -> int:
+    """
+    Write stores x days of EOD data under out_dir; returns the number of line items.
+    Daily layout: out_dir/storeNNN/YYYY-MM-DD.csv (ISO dates).
+    weekly=True:  out_dir/starbucks_storeNNN_week.csv per store (m/d/Y dates),
+                  the export format split_to_daily.py consumes.
+    Store traffic varies per store (log-normal) and by weekday.
+    """
+    rng = np.random.default_rng(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    dates = pd.date_range(start, periods=days, freq="D")
+    traffic = rng.lognormal(mean=0.0, sigma=0.3, size=stores)
+    rows = 0
+    for s in range(stores):
+        number = 101 + s
+        next_id = number * 1_000_000
+        day_frames = []
+        for day in dates:
+            orders = max(1, int(rng.poisson(orders_per_day * traffic[s] * WEEKDAY_TRAFFIC[day.weekday()])))
+            day_frames.append(store_day(rng, day, orders, next_id))
+            next_id += orders
+        rows += sum(len(f) for f in day_frames)
+
+        if weekly:
+            df = pd.concat(day_frames, ignore_index=True)
+            df["date"] = df["date"].map(lambda d: f"{d.month}/{d.day}/{d.year}")
+            df.to_csv(out_dir / f"starbucks_store{number}_week.csv", index=False)
+        else:
+            folder = out_dir / f"store{number}"
+            folder.mkdir(exist_ok=True)
+            for day, df in zip(dates, day_frames):
+                df.assign(date=day.date().isoformat()).to_csv(folder / f"{day.date().isoformat()}.csv",
+                                                             index=False)
+    return rows
+
+
+def run():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", type=Path, required=True)
+    ap.add_argument("--stores", type=int, default=10)
+    ap.add_argument("--days", type=int, default=28)
+    ap.add_argument("--orders-per-day", type=int, default=200)
+    ap.add_argument("--start", default="2025-09-01")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--weekly", action="store_true", help="one export per store instead of daily files")
+    args = ap.parse_args()
+    rows = generate_franchise(args.out, args.stores, args.days, args.orders_per_day,
+                              args.start, args.seed, args.weekly)
+    print(f"Wrote {rows:,} line items for {args.stores} store(s) x {args.days} day(s) to {args.out}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,76 @@
+"""
+Benchmark: per-store kpis_for_window calls vs. the single-pass kpis_for_windows engine.
+Every KPI, tables included, must come out identical or the run stops.
+
+Run from starbucks_demo/:
+    python -m bench.kpis --stores 10 100 1000
+"""
+import argparse
+import time
+import pandas as pd
+from report.io_load import collect_store_frames
+from report.metrics import kpis_for_window, kpis_for_windows
+
+
+def scaled_stores(base: dict[str, pd.DataFrame], n: int) -> dict[str, pd.DataFrame]:
+    """Cycle the demo stores out to n store names (order ids offset per copy)."""
+    frames = list(base.values())
+    out = {}
+    for i in range(n):
+        df = frames[i % len(frames)].copy()
+        df["order_id"] = df["order_id"] + (i // len(frames)) * 10_000_000
+        out[f"Store{1000 + i}"] = df
+    return out
+
+
+def assert_kpis_equal(got: dict, want: dict):
+    """Same keys, equal scalars and exactly equal tables (values, dtypes, index)."""
+    assert got.keys() == want.keys(), f"keys {sorted(got)} != {sorted(want)}"
+    for k, v in want.items():
+        if isinstance(v, pd.DataFrame):
+            try:
+                pd.testing.assert_frame_equal(got[k], v, check_exact=True)
+            except AssertionError as e:
+                raise AssertionError(f"{k}: {e}") from None
+        else:
+            assert got[k] == v, f"{k}: {got[k]!r} != {v!r}"
+
+
+def run():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stores", type=int, nargs="+", default=[10, 100, 500])
+    ap.add_argument("--days-week", type=int, default=7)
+    ap.add_argument("--days-month", type=int, default=30)
+    args = ap.parse_args()
+
+    base = collect_store_frames()
+    today = max(df["date"].max() for df in base.values()).normalize() + pd.Timedelta(days=1)
+    windows = {"week": (today - pd.Timedelta(days=args.days_week), today),
+               "month": (today - pd.Timedelta(days=args.days_month), today)}
+
+    print(f"{'stores':>8} {'rows':>10} {'per-store s':>12} {'engine s':>10} {'speedup':>8}")
+    for n in args.stores:
+        stores = scaled_stores(base, n)
+        rows = sum(len(df) for df in stores.values())
+
+        t0 = time.perf_counter()
+        loop = {s: {w: kpis_for_window(df, a, b) for w, (a, b) in windows.items()}
+                for s, df in stores.items()}
+        t_loop = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        engine = kpis_for_windows(stores, windows)
+        t_engine = time.perf_counter() - t0
+
+        for s in stores:
+            for w in windows:
+                try:
+                    assert_kpis_equal(engine[s][w], loop[s][w])
+                except AssertionError as e:
+                    raise SystemExit(f"Mismatch for {s}/{w}: {e}")
+
+        print(f"{n:>8} {rows:>10} {t_loop:>12.3f} {t_engine:>10.3f} {t_loop / t_engine:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run()
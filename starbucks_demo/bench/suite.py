@@ -0,0 +1,220 @@
+"""
+Benchmark suite: every pipeline stage on seeded synthetic data, timed and
+memory-traced, saved as JSON and compared with a stored baseline.
+
+Run from starbucks_demo/:
+    python -m bench.suite                                  # compare with bench/baseline.json
+    python -m bench.suite --stores 200 --save /tmp/run.json
+    python -m bench.suite --update-baseline                # after an intended change
+
+Stages run in a scratch workspace (weekly exports -> split_weekly_to_daily ->
+collect_store_frames -> KPIs -> write_excel). The weekly exports are removed
+once split, so the loader reads each row once, from the daily files. Each stage
+is timed --repeat times (the median is kept) and then re-run under tracemalloc
+for its peak traced memory (--no-memory skips that).
+tracemalloc sees Python and numpy allocations but not Arrow buffers, so each
+stage also records the process RSS high-water mark reached so far.
+Exits 1 when a stage is slower or bigger than the baseline by more than its
+tolerance (STAGE_TOLERANCE; --tolerance sets one for all), so a regression
+fails the run. A run whose params (sizes, seed, repeat, generated rows) differ
+from the baseline's is not compared (exit 2).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import pandas as pd
+from report.excel_report import write_excel
+from report.io_load import collect_store_frames
+from report.metrics import kpis_for_window, kpis_for_windows, report_tables
+from report.profiling import peak_rss_mb
+from report.rollup import DailyRollup
+from .generate import generate_franchise
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def _measure(stage: str, fn, memory: bool, repeat: int = 1) -> tuple[object, dict]:
+    """
+    Median wall time of `repeat` runs of fn (stdout silenced), then one traced
+    run; returns (first result, stats).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        times = []
+        for i in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            out = fn()
+            times.append(time.perf_counter() - t0)
+            result = out if i == 0 else result
+        stats = {"seconds": round(statistics.median(times), 4)}
+        if memory:
+            tracemalloc.start()
+            fn()
+            stats["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+            tracemalloc.stop()
+    print(f"  {stage}: {stats}", file=sys.stderr)
+    return result, stats
+
+
+def run_suite(stores: int, days: int, orders_per_day: int, seed: int, memory: bool = True,
+              repeat: int = 3) -> dict:
+    """Results dict: {"params", "env", "stages": {stage: {"seconds", "peak_mb", ...}}}."""
+    import split_to_daily  # top-level script module
+
+    params = {"stores": stores, "days": days, "orders_per_day": orders_per_day, "seed": seed,
+              "repeat": repeat}
+    stages: dict[str, dict] = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as ws:
+        os.chdir(ws)  # the pipeline works on ./data and ./output
+
+        def stage(name: str, fn, traced: bool = memory):
+            result, stages[name] = _measure(name, fn, traced, repeat)
+            rss = peak_rss_mb()
+            if rss is not None:
+                stages[name]["rss_high_water_mb"] = round(rss, 1)
+            return result
+
+        try:
+            rows = stage("generate", lambda: generate_franchise(
+                Path("data"), stores, days, orders_per_day, seed=seed, weekly=True), traced=False)
+            stages["generate"]["rows"] = params["rows"] = rows
+            stage("split_weekly_to_daily", split_to_daily.split_weekly_to_daily)
+            for weekly in Path("data").glob("*.csv"):
+                weekly.unlink()
+            frames = stage("collect_store_frames", collect_store_frames)
+            stages["collect_store_frames"]["rows"] = sum(len(df) for df in frames.values())
+
+            today = max(df["date"].max() for df in frames.values()).normalize() + pd.Timedelta(days=1)
+            windows = {"week": (today - pd.Timedelta(days=7), today),
+                       "month": (today - pd.Timedelta(days=30), today)}
+            stage("kpis_for_window", lambda: {
+                s: {w: kpis_for_window(df, a, b) for w, (a, b) in windows.items()}
+                for s, df in frames.items()})
+            kpis = stage("kpis_for_windows", lambda: kpis_for_windows(frames, windows))
+
+            def rollup():
+                r = DailyRollup(rollup_dir=Path(ws) / "rollup", rebuild=True)
+                r.update(frames, today)
+                return r.kpis_for_windows(windows)
+            stage("rollup_build_and_kpis", rollup)
+
+            weekly_df, weekly_tabs = report_tables(kpis, "week", "Week Range", "bench")
+            monthly_df, monthly_tabs = report_tables(kpis, "month", "Month Range", "bench")
+            (Path(ws) / "output").mkdir()
+            stage("write_excel", lambda: write_excel(weekly_df, monthly_df, weekly_tabs, monthly_tabs,
+                                                     out_dir=Path(ws) / "output"))
+        finally:
+            os.chdir(cwd)
+
+    env = {"python": platform.python_version(), "pandas": pd.__version__,
+           "platform": platform.platform(), "machine": platform.machine()}
+    return {"params": params, "env": env, "stages": stages}
+
+
+# Differences below these are noise, whatever the ratio
+MIN_DELTA = {"seconds": 0.1, "peak_mb": 1.0}
+# Allowed slowdown per stage. Medians of the default 3 runs still vary by up to
+# ~1.3x between runs on one machine for the disk-bound stages; generate only
+# sets up the data and is reported but not checked.
+STAGE_TOLERANCE = {"generate": None, "split_weekly_to_daily": 0.5, "collect_store_frames": 0.5,
+                   "write_excel": 0.5}
+DEFAULT_TOLERANCE = 0.4
+MEMORY_TOLERANCE = 0.25  # traced peaks barely move between runs
+
+
+def _tolerance(stage: str, metric: str, tolerance: float | None) -> float | None:
+    if metric == "peak_mb":
+        return MEMORY_TOLERANCE if tolerance is None else tolerance
+    if tolerance is not None:
+        return tolerance
+    return STAGE_TOLERANCE.get(stage, DEFAULT_TOLERANCE)
+
+
+def compare(results: dict, baseline: dict, tolerance: float | None = None) -> list[str]:
+    """
+    Print a stage table against the baseline; returns the regressions found.
+    tolerance overrides the per-stage limits (STAGE_TOLERANCE, MEMORY_TOLERANCE).
+    """
+    regressions = []
+    print(f"{'stage':<24} {'seconds':>8} {'base':>8} {'ratio':>6} {'peak MB':>8} {'base':>8} {'ratio':>6}")
+    for stage, now in results["stages"].items():
+        base = baseline.get("stages", {}).get(stage, {})
+        cells = []
+        for metric in ("seconds", "peak_mb"):
+            a, b = now.get(metric), base.get(metric)
+            ratio = a / b if a is not None and b else None
+            cells += [f"{a:>8.2f}" if a is not None else f"{'-':>8}",
+                      f"{b:>8.2f}" if b is not None else f"{'-':>8}",
+                      f"{ratio:>5.2f}x" if ratio is not None else f"{'-':>6}"]
+            tol = _tolerance(stage, metric, tolerance)
+            if ratio is not None and tol is not None and ratio > 1 + tol and a - b > MIN_DELTA[metric]:
+                regressions.append(f"{stage} {metric}: {a:.2f} vs baseline {b:.2f} ({ratio:.2f}x)")
+        print(f"{stage:<24} " + " ".join(cells))
+    return regressions
+
+
+def run():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stores", type=int, default=20)
+    ap.add_argument("--days", type=int, default=28)
+    ap.add_argument("--orders-per-day", type=int, default=150)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per stage (the median is kept)")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--save", type=Path, help="write this run's results JSON here")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true",
+                    help="store this run as the baseline instead of comparing")
+    ap.add_argument("--tolerance", type=float,
+                    help="allowed slowdown / growth before a stage counts as a regression, for "
+                         "every stage (default: per stage, see STAGE_TOLERANCE)")
+    args = ap.parse_args()
+
+    baseline = None
+    if not args.update_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        wanted = {"stores": args.stores, "days": args.days, "orders_per_day": args.orders_per_day,
+                  "seed": args.seed, "repeat": args.repeat}
+        _check_params(wanted, {k: baseline.get("params", {}).get(k) for k in wanted})
+
+    results = run_suite(args.stores, args.days, args.orders_per_day, args.seed,
+                        memory=not args.no_memory, repeat=args.repeat)
+    text = json.dumps(results, indent=2) + "\n"
+    if args.save:
+        args.save.write_text(text)
+    if args.update_baseline:
+        args.baseline.write_text(text)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if baseline is None:
+        print(json.dumps(results["stages"], indent=2))
+        print(f"No baseline at {args.baseline}; create one with --update-baseline.")
+        return
+
+    _check_params(results["params"], baseline.get("params", {}))
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("No stage regressed beyond its tolerance.")
+
+
+def _check_params(params: dict, baseline_params: dict):
+    """Exit (status 2) when this run's params differ from the baseline's: timings would not compare."""
+    if params != baseline_params:
+        print(f"Baseline params {baseline_params} differ from this run's {params}; run with the "
+              "baseline's params, or store a new baseline with --update-baseline.", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,175 @@
+# report/artifacts.py
+"""
+Content-addressed artifact cache for report runs.
+
+Two levels, both keyed on sha256 digests of what the output depends on:
+
+  reports  key = input CSV contents + window/output parameters + code version
+           -> the XLSX/PDF paths a previous run wrote. A hit skips the run and
+           points at those files instead of writing duplicates.
+  kpis     key = one store's CSV contents + windows + code version
+           -> that store's kpis_for_windows result and reject records, so a
+           partial input change reloads and recomputes only the stores it touches.
+
+The code version is a digest of the report package's sources, so any code
+change misses both levels. Input digests reuse the CSV cache's content hashes
+when a file's size and mtime are unchanged.
+
+evict() bounds output/: report files (franchise_report_*, or the report_glob
+given) older than a maximum age are removed, then the oldest until the total fits a size budget. KPI
+entries are pruned after KPI_MAX_AGE_DAYS without use. discard() removes
+reports that a newer one supersedes (--watch rebuilds).
+"""
+import functools
+import hashlib
+import json
+import pickle
+import shutil
+import time
+from pathlib import Path
+from .config import ARTIFACT_DIR, OUTDIR
+from .csv_cache import file_digest
+
+KPI_MAX_AGE_DAYS = 14
+REPORT_GLOB = "franchise_report_*"
+
+
+@functools.lru_cache(maxsize=1)
+def code_version() -> str:
+    """Digest of the report package sources."""
+    h = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()[:16]
+
+
+def digest(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def input_digests(by_store: dict[str, list[Path]], cache=None) -> dict[str, dict[str, str]]:
+    """{store: {csv path: sha256}}, from the CSV cache manifest where the file is unchanged."""
+    out = {}
+    for store, files in by_store.items():
+        out[store] = {}
+        for f in files:
+            key = f.as_posix()
+            entry = cache.files.get(key) if cache is not None else None
+            st = f.stat()
+            if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                out[store][key] = entry["sha256"]
+            else:
+                out[store][key] = file_digest(f)
+    return out
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size
+
+
+class ArtifactCache:
+    """Report-level and per-store KPI cache under ARTIFACT_DIR."""
+
+    def __init__(self, cache_dir: Path = ARTIFACT_DIR, out_dir: Path = OUTDIR,
+                 report_glob: str = REPORT_GLOB):
+        self.cache_dir = cache_dir
+        self.report_glob = report_glob
+        self.kpi_dir = cache_dir / "kpis"
+        self.out_dir = out_dir
+        self.manifest_path = cache_dir / "reports.json"
+        self.reports: dict[str, dict] = {}
+        if self.manifest_path.exists():
+            self.reports = json.loads(self.manifest_path.read_text())
+
+    # ---- reports
+    def report_key(self, inputs: dict, params: dict) -> str:
+        return digest({"code": code_version(), "inputs": inputs, "params": params})
+
+    def lookup(self, key: str) -> list[Path] | None:
+        """The artifacts recorded for key, if every one of them still exists."""
+        entry = self.reports.get(key)
+        if entry is None:
+            return None
+        paths = [Path(p) for p in entry["paths"]]
+        if not paths or not all(p.exists() for p in paths):
+            del self.reports[key]
+            return None
+        return paths
+
+    def record(self, key: str, paths: list[Path]):
+        self.reports[key] = {"paths": [p.as_posix() for p in paths], "created": time.time()}
+
+    # ---- per-store KPIs
+    def store_key(self, store: str, inputs: dict[str, str], windows: dict, variant: str = "") -> str:
+        return digest({"code": code_version(), "store": store, "inputs": inputs,
+                       "windows": windows, "variant": variant})
+
+    def load_kpis(self, key: str):
+        """(kpis, reject records) for key, or None; a hit refreshes the entry's age."""
+        path = self.kpi_dir / f"{key}.pkl"
+        try:
+            with open(path, "rb") as fh:
+                entry = pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        path.touch()
+        return entry
+
+    def save_kpis(self, key: str, kpis: dict, rejects: list):
+        self.kpi_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.kpi_dir / f"{key}.pkl", "wb") as fh:
+            pickle.dump((kpis, rejects), fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # ---- housekeeping
+    def evict(self, max_mb: float | None = None, max_age_days: float | None = None,
+              keep: tuple[Path, ...] = ()) -> list[Path]:
+        """
+        Remove report files from out_dir over the age limit, then oldest-first
+        over the size budget; paths in (or inside) `keep` are never removed.
+        """
+        removed = []
+        now = time.time()
+        kept = {p.resolve() for p in keep} | {p.resolve().parent for p in keep}
+        found = sorted(self.out_dir.glob(self.report_glob), key=lambda p: p.stat().st_mtime)
+        sizes = {p: _size(p) for p in found}
+        total = sum(sizes.values())  # kept files count towards the budget too
+        found = [p for p in found if p.resolve() not in kept]
+        for p in found:
+            too_old = max_age_days is not None and now - p.stat().st_mtime > max_age_days * 86400
+            too_big = max_mb is not None and total > max_mb * 1e6
+            if not (too_old or too_big):
+                continue
+            shutil.rmtree(p) if p.is_dir() else p.unlink()
+            total -= sizes[p]
+            removed.append(p)
+
+        cutoff = now - KPI_MAX_AGE_DAYS * 86400
+        for p in self.kpi_dir.glob("*.pkl"):
+            if p.stat().st_mtime < cutoff:
+                p.unlink(missing_ok=True)
+        return removed
+
+    def _entry(self, path: Path) -> Path:
+        """The top-level item of out_dir holding path (a report file or shard folder)."""
+        return self.out_dir / path.resolve().relative_to(self.out_dir.resolve()).parts[0]
+
+    def discard(self, paths: list[Path], keep: tuple[Path, ...] = ()) -> list[Path]:
+        """Remove the report files or shard folders holding `paths`, except those holding `keep`."""
+        kept = {self._entry(p) for p in keep}
+        removed = []
+        for p in dict.fromkeys(self._entry(p) for p in paths):
+            if p in kept or not p.exists():
+                continue
+            shutil.rmtree(p) if p.is_dir() else p.unlink()
+            removed.append(p)
+        return removed
+
+    def save(self):
+        """Write the report manifest, dropping entries whose artifacts are gone."""
+        self.reports = {k: e for k, e in self.reports.items()
+                        if all(Path(p).exists() for p in e["paths"])}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps(self.reports, indent=1, sort_keys=True))
@@ -0,0 +1,156 @@
+# report/baskets.py
+"""
+Order (basket) index: the order x item and order x category incidence of a
+set of window rows, built once so every basket KPI is a lookup instead of a
+rescan of the window.
+
+Rows carry a group key g (store x window in kpis_for_windows, 0 for a single
+window); a basket is a distinct (g, order_id), so an order is counted once
+per group however many lines or days it spans. Each row may carry one
+category bit (bit k = k-th tracked category) and a unit count (1 per line
+item; the rollup stores several).
+
+  orders(g)                distinct orders in group g
+  category_orders(g, k)    orders with at least one line of category k
+  category_revenue(g, k)   revenue of category-k lines, summed in row order
+                           (bit-for-bit what Series.sum gives on those rows)
+  basket_sizes(g, labels)  orders and average units per order, by category
+  together(g, top)         item pairs bought in the same order, most frequent first
+
+Item pairs come from a self-join of the order x item incidence on the order,
+which stays small because baskets hold a handful of distinct items.
+"""
+import numpy as np
+import pandas as pd
+
+TOGETHER_COLUMNS = ["item", "with_item", "orders", "percent_of_orders", "attach_rate"]
+BASKET_COLUMNS = ["category", "orders", "avg_items"]
+
+
+def _name_codes(item) -> tuple[np.ndarray, np.ndarray]:
+    """Item codes ranked by item name (NaN -> -1), and the names in code order."""
+    codes, uniques = pd.factorize(item)
+    names = np.asarray(uniques, dtype=object)
+    rank = np.empty(len(names), dtype="int64")
+    order = sorted(range(len(names)), key=lambda i: str(names[i]))
+    rank[order] = np.arange(len(names))
+    out = np.full(len(codes), -1, dtype="int64")
+    out[codes >= 0] = rank[codes[codes >= 0]]  # rank is empty when every item is NaN
+    return out, names[order]
+
+
+class OrderIndex:
+    """Order x item / order x category incidence for grouped window rows."""
+
+    def __init__(self, group, order_id, item, cat_bits, n_cats: int, n_groups: int = 1,
+                 revenue=None, units=None):
+        group = np.asarray(group, dtype="int64")
+        cat_bits = np.asarray(cat_bits, dtype="int64")
+        units = np.ones(len(group), dtype="int64") if units is None else np.asarray(units, dtype="int64")
+        self.n_groups = n_groups
+        self.n_cats = n_cats
+
+        # Category revenue: rows of each (g, category) in row order, one contiguous slice each.
+        # Rows without an order_id still count here, as they do in a Series.sum.
+        self._cat_rev = None
+        if revenue is not None:
+            rev = np.where(np.isnan(revenue), 0.0, revenue)
+            tagged = np.flatnonzero(cat_bits)
+            key = group[tagged] * n_cats + np.log2(cat_bits[tagged]).astype("int64")
+            o = np.argsort(key, kind="stable")
+            vals = rev[tagged][o]
+            b = np.searchsorted(key[o], np.arange(n_groups * n_cats + 1))
+            self._cat_rev = [float(vals[b[i]:b[i + 1]].sum()) if b[i + 1] > b[i] else 0.0
+                             for i in range(n_groups * n_cats)]
+
+        # Baskets: one per distinct (g, order_id); rows without an order_id belong to
+        # none (nunique skips them too)
+        order_codes, order_uniques = pd.factorize(np.asarray(order_id))
+        valid = order_codes >= 0
+        group, cat_bits, units = group[valid], cat_bits[valid], units[valid]
+        basket, basket_keys = pd.factorize(group * len(order_uniques) + order_codes[valid])
+        n_baskets = len(basket_keys)
+        basket_g = np.zeros(n_baskets, dtype="int64")
+        basket_g[basket] = group
+        self._orders = np.bincount(basket_g, minlength=n_groups)
+
+        # Order x category incidence: orders holding category k, and their units
+        basket_units = np.bincount(basket, weights=units, minlength=n_baskets)
+        self._cat_orders = np.zeros((n_groups, n_cats), dtype="int64")
+        self._cat_units = np.zeros((n_groups, n_cats))
+        for k in range(n_cats):
+            has = np.bincount(basket[(cat_bits & (1 << k)) != 0], minlength=n_baskets) > 0
+            self._cat_orders[:, k] = np.bincount(basket_g[has], minlength=n_groups)
+            self._cat_units[:, k] = np.bincount(basket_g[has], weights=basket_units[has],
+                                                minlength=n_groups)
+
+        # Order x item incidence: distinct (basket, item) pairs, as basket * n_items + item
+        codes, self.item_names = _name_codes(item)
+        codes = codes[valid]
+        keep = codes >= 0
+        n_items = len(self.item_names)
+        cell = pd.unique(basket[keep] * n_items + codes[keep])
+        inc = pd.DataFrame({"b": cell // n_items, "i": cell % n_items})
+        inc["g"] = basket_g[inc["b"].to_numpy()]
+        self._inc = inc
+        self._item_orders = np.bincount(inc["g"].to_numpy() * n_items + inc["i"].to_numpy(),
+                                        minlength=n_groups * n_items).reshape(n_groups, n_items)
+        self._pairs = None
+
+    def orders(self, g: int = 0) -> int:
+        return int(self._orders[g])
+
+    def category_orders(self, g: int, k: int) -> int:
+        return int(self._cat_orders[g, k])
+
+    def category_revenue(self, g: int, k: int) -> float:
+        return self._cat_rev[g * self.n_cats + k]
+
+    def basket_sizes(self, g: int, labels: list[str]) -> pd.DataFrame:
+        """Orders containing each category and their average units per order."""
+        rows = []
+        for k, label in enumerate(labels):
+            o = self.category_orders(g, k)
+            rows.append([label, o, round(self._cat_units[g, k] / o, 2) if o else 0.0])
+        return pd.DataFrame(rows, columns=BASKET_COLUMNS)
+
+    def _pair_counts(self) -> tuple[pd.DataFrame, np.ndarray]:
+        """
+        (g, i_a, i_b, orders) for every item pair sharing an order (a < b by
+        name), most orders first within each group, and the group bounds.
+        """
+        if self._pairs is None:
+            inc = self._inc
+            b = inc["b"].to_numpy()
+            multi = inc[np.bincount(b)[b] > 1]
+            pairs = multi.merge(multi[["b", "i"]], on="b", suffixes=("_a", "_b"))
+            pairs = pairs[pairs["i_a"].to_numpy() < pairs["i_b"].to_numpy()]
+            pairs = pairs.groupby(["g", "i_a", "i_b"]).size().rename("orders").reset_index()
+            o = np.lexsort((pairs["i_b"], pairs["i_a"], -pairs["orders"].to_numpy(), pairs["g"]))
+            pairs = pairs.take(o).reset_index(drop=True)
+            bounds = np.searchsorted(pairs["g"].to_numpy(), np.arange(self.n_groups + 1))
+            self._pairs = (pairs, bounds)
+        return self._pairs
+
+    def together(self, g: int = 0, top: int = 5) -> pd.DataFrame:
+        """
+        The `top` item pairs by orders containing both (ties by item names).
+        Each pair is anchored on its item with more orders: attach_rate is the
+        share of that item's orders that also include with_item, and
+        percent_of_orders the share of all the group's orders holding both.
+        """
+        pairs, bounds = self._pair_counts()
+        lo = bounds[g]
+        hi = min(bounds[g + 1], lo + top)
+        a = pairs["i_a"].to_numpy()[lo:hi]
+        b = pairs["i_b"].to_numpy()[lo:hi]
+        both = pairs["orders"].to_numpy()[lo:hi]
+        oa, ob = self._item_orders[g, a], self._item_orders[g, b]
+        swap = ob > oa
+        return pd.DataFrame({
+            "item": self.item_names[np.where(swap, b, a)],
+            "with_item": self.item_names[np.where(swap, a, b)],
+            "orders": both,
+            "percent_of_orders": (both / max(self.orders(g), 1) * 100).round(1),
+            "attach_rate": (both / np.maximum(np.maximum(oa, ob), 1) * 100).round(1),
+        }, columns=TOGETHER_COLUMNS)
@@ -1,57 +1,482 @@
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
 import pandas as pd
-from .io_load import collect_store_frames
-from .metrics import kpis_for_window
-from .excel_report import write_excel
-from .pdf_export import export_excel_to_pdf
+from .config import OUTDIR
+from .io_load import _load_store, collect_store_frames, discover_store_files, store_rejects
+from .csv_cache import CsvCache, file_digest
+from .artifacts import ArtifactCache, input_digests
+from .parquet_store import ingest_to_parquet, load_store_frames_parquet
+from .metrics import kpis_for_windows, report_tables
+from .rollup import DailyRollup
+from .excel_report import ReportWorkbook, report_stem, write_excel
+from .hierarchy import hierarchy_summaries, load_hierarchy
+from .shared_frames import map_stores
+from .service import LRU_ENTRIES, KpiService, serve
+from .sharding import load_region_map, shard_stores, write_sharded_excel
+from .pdf_export import export_excel_to_pdf, export_report_pdf, native_pdf_available
+from .pipeline import StagedPipeline
+from .profiling import RunProfile
+from .schema import CHUNK_ROWS, REJECT_COLUMNS
+from .streaming import stream_kpis
+from .trends import TREND_DAYS, TREND_WINDOWS, trends_for_stores
+from .watch import ReportWatcher
+
+
+def _positive_int(text: str) -> int:
+    n = int(text)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {n}")
+    return n
 
 
 def run():
     ap = argparse.ArgumentParser()
     ap.add_argument("--days-week", type=int, default=7)
     ap.add_argument("--days-month", type=int, default=30)
+    ap.add_argument("--trend-days", nargs="?", type=int, const=TREND_DAYS, default=0,
+                    help="add trend sheets with trailing 7/30-day revenue, orders and AOV for "
+                         f"each of the last N days (default N {TREND_DAYS}; off unless given)")
     ap.add_argument("--no-pdf", action="store_true")
+    ap.add_argument("--pdf-engine", choices=["auto", "native", "excel"], default="auto",
+                    help="native renders with reportlab (no Excel needed); auto uses it when installed")
+    ap.add_argument("--source", choices=["csv", "parquet"], default="csv",
+                    help="parquet reads only the store/date partitions the windows need")
+    ap.add_argument("--ingest", action="store_true",
+                    help="convert new or changed CSVs into the Parquet store first")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="parse every CSV instead of reusing cached frames for unchanged files")
+    ap.add_argument("--rebuild-cache", action="store_true",
+                    help="ignore the CSV cache manifest and re-parse everything")
+    ap.add_argument("--no-rollup", action="store_true",
+                    help="compute KPIs from line items instead of the daily rollup")
+    ap.add_argument("--rebuild-rollup", action="store_true",
+                    help="rebuild the daily rollup for every closed day")
+    ap.add_argument("--stream", action="store_true",
+                    help="read CSVs in chunks into per-store window accumulators instead of loading "
+                         "every store's full history (memory bounded by the report's date span)")
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                    help="--stream: line items parsed at a time")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="load stores, and compute line-item KPIs from shared memory, in N "
+                         "processes (1 = serial, the fallback)")
+    ap.add_argument("--constant-memory", action="store_true",
+                    help="stream every sheet's rows to disk while writing the workbook")
+    ap.add_argument("--shard-by", choices=["size", "range", "region"],
+                    help="split store tabs across workbooks plus an index workbook")
+    ap.add_argument("--shard-size", type=_positive_int, default=50,
+                    help="stores per workbook (size) or store-ID bucket width (range)")
+    ap.add_argument("--region-map", type=Path,
+                    help="CSV with store,region columns for --shard-by region (default: --hierarchy)")
+    ap.add_argument("--hierarchy", type=Path,
+                    help="CSV with store,district,region (and optional chain) columns: adds "
+                         "summary sheets ranking districts, regions and chains")
+    ap.add_argument("--profile", nargs="?", type=Path, const=OUTDIR / "run_profile.json",
+                    help="record per-stage wall/CPU time, rows and peak memory, plus the slowest "
+                         "stores and files, as a JSON run log (default output/run_profile.json)")
+    ap.add_argument("--profile-stage", action="append", default=[], metavar="STAGE",
+                    help="also run STAGE under cProfile (repeatable; implies --profile)")
+    ap.add_argument("--watch", action="store_true",
+                    help="stay running: keep store frames in memory and rebuild the report when "
+                         "CSVs under data/ change, reloading only the stores affected; each "
+                         "rebuild replaces the previous one's report files")
+    ap.add_argument("--debounce", type=float, default=5.0,
+                    help="--watch: seconds without further changes before rebuilding")
+    ap.add_argument("--poll", type=float, default=1.0,
+                    help="--watch/--serve: seconds between scans of data/")
+    ap.add_argument("--serve", action="store_true",
+                    help="instead of a report, keep the data loaded and answer "
+                         "GET /kpis?store=&start=&end= on localhost (JSON)")
+    ap.add_argument("--port", type=int, default=8765, help="--serve: port on 127.0.0.1")
+    ap.add_argument("--lru-entries", type=int, default=LRU_ENTRIES,
+                    help="--serve: store/date-range results kept in memory")
+    ap.add_argument("--no-artifact-cache", action="store_true",
+                    help="always rebuild, even when inputs and parameters match an earlier report")
+    ap.add_argument("--output-max-mb", type=float,
+                    help="after the run, delete the oldest report files in output/ beyond this size")
+    ap.add_argument("--output-max-age-days", type=float,
+                    help="after the run, delete report files in output/ older than this")
+    ap.add_argument("--pipeline", action="store_true",
+                    help="load, compute and render store by store in overlapping stages, "
+                         "holding only a few stores' data at once (single workbook)")
+    ap.add_argument("--pipeline-depth", type=int, default=2,
+                    help="--pipeline: stores queued between stages (bounds memory)")
     args = ap.parse_args()
+    profile = RunProfile(enabled=args.profile is not None, cprofile=tuple(args.profile_stage))
+    try:
+        _report(args, profile)
+    finally:
+        if profile.enabled:
+            profile.write(args.profile or OUTDIR / "run_profile.json")
+
 
-    stores = collect_store_frames()
+def _report(args, profile: RunProfile):
+    if args.watch:
+        _watch(args, profile)
+        return
+    if args.serve:
+        _serve(args)
+        return
     today = pd.Timestamp.today().normalize()
     week_start = today - pd.Timedelta(days=args.days_week)
     month_start = today - pd.Timedelta(days=args.days_month)
 
-    weekly_rows, monthly_rows, weekly_tabs, monthly_tabs = [], [], {}, {}
-
-    for store, df in stores.items():
-        # Weekly KPIs
-        w = kpis_for_window(df, week_start, today)
-        weekly_rows.append({
-            "Store": store,
-            "Week Range": f"{week_start.date():%b %d} - {today.date():%b %d, %Y}",
-            **{k: v for k, v in w.items()
-               if k not in ["Category Revenue", "Daily Revenue", "Top 3 Items", "Bottom 3 Items", "AOV by Category"]},
-        })
-        weekly_tabs[store] = {k: w[k] for k in
-                              ["Category Revenue", "Top 3 Items", "Bottom 3 Items", "AOV by Category"]}
-
-        # Monthly KPIs
-        m = kpis_for_window(df, month_start, today)
-        monthly_rows.append({
-            "Store": store,
-            "Month Range": f"{month_start.date():%b %d} - {today.date():%b %d, %Y}",
-            **{k: v for k, v in m.items()
-               if k not in ["Category Revenue", "Daily Revenue", "Top 3 Items", "Bottom 3 Items", "AOV by Category"]},
-        })
-        monthly_tabs[store] = {k: m[k] for k in
-                               ["Category Revenue", "Top 3 Items", "Bottom 3 Items", "AOV by Category"]}
-
-    weekly_df = pd.DataFrame(weekly_rows, columns=[
-        "Store", "Week Range", "Revenue", "Orders", "AOV",
-        "Drinks %", "Food %", "Seasonal %", "% Orders w/ Food", "Peak Day",
-    ])
-    monthly_df = pd.DataFrame(monthly_rows, columns=[
-        "Store", "Month Range", "Revenue", "Orders", "AOV",
-        "Drinks %", "Food %", "Seasonal %", "% Orders w/ Food", "Peak Day",
-    ])
-
-    xlsx_path = write_excel(weekly_df, monthly_df, weekly_tabs, monthly_tabs)
-    if not args.no_pdf:
-        export_excel_to_pdf(xlsx_path, xlsx_path.with_suffix(".pdf"))
+    if args.ingest:
+        with profile.stage("ingest") as info:
+            info["files"] = ingested = ingest_to_parquet()
+        print(f"Ingested {ingested} CSV file(s) into the Parquet store.")
+    windows = {"week": (week_start, today), "month": (month_start, today)}
+    if args.source == "csv":
+        _report_csv(args, profile, today, windows)
+        return
+    start = min(week_start, month_start)
+    if args.trend_days:
+        start = min(start, today - pd.Timedelta(days=args.trend_days + max(TREND_WINDOWS.values())))
+    with profile.stage("load_parquet") as info:
+        stores = load_store_frames_parquet(start, today)
+        info["rows"] = sum(len(df) for df in stores.values())
+    profile.add_store_loads(stores)
+    write_rejects(store_rejects(stores))
+    publish(args, _compute_kpis(args, profile, stores, today, windows, since=start), today, profile)
+
+
+def _report_params(args, today: pd.Timestamp) -> dict:
+    """Everything besides the inputs and code that changes the report's content."""
+    region_map = None
+    if args.shard_by == "region" and args.region_map:
+        region_map = file_digest(args.region_map)
+    return {"today": today.date().isoformat(), "days_week": args.days_week,
+            "days_month": args.days_month, "trend_days": args.trend_days,
+            "rollup": not args.no_rollup and not args.stream, "stream": args.stream,
+            "pdf": None if args.no_pdf else _pdf_engine(args),
+            "shard_by": args.shard_by, "shard_size": args.shard_size if args.shard_by else None,
+            "region_map": region_map,
+            "hierarchy": file_digest(args.hierarchy) if args.hierarchy else None}
+
+
+def _report_csv(args, profile: RunProfile, today: pd.Timestamp, windows: dict):
+    """
+    CSV source through the artifact cache: an identical earlier report is
+    reused as is, and stores whose inputs are unchanged reuse their KPIs.
+    """
+    # --stream parses CSVs chunk by chunk; the CSV cache holds whole frames
+    cache = None if args.no_cache or args.stream else CsvCache(rebuild=args.rebuild_cache)
+    # --rebuild-* ask for recomputation, so they bypass reuse as well
+    reuse = not (args.no_artifact_cache or args.rebuild_cache or args.rebuild_rollup)
+    artifacts = ArtifactCache() if reuse else None
+    with profile.stage("discover") as info:
+        by_store = discover_store_files()
+        info.update(files=sum(map(len, by_store.values())), stores=len(by_store))
+
+    cached, keys = {}, {}
+    if artifacts is not None:
+        with profile.stage("artifact_lookup") as info:
+            digests = input_digests(by_store, cache)
+            report_key = artifacts.report_key(digests, _report_params(args, today))
+            existing = artifacts.lookup(report_key)
+            if existing is None:
+                source = "stream" if args.stream else "line-items" if args.no_rollup else "rollup"
+                variant = f"{source}/trend{args.trend_days}"
+                keys = {s: artifacts.store_key(s, digests[s], windows, variant) for s in by_store}
+                cached = {s: hit for s, k in keys.items() if (hit := artifacts.load_kpis(k)) is not None}
+            info.update(report_hit=existing is not None, store_hits=len(cached))
+        if existing is not None:
+            print("Inputs and parameters match an earlier run; reusing:")
+            for p in existing:
+                print(f"  {p}")
+            _evict(args, artifacts, existing)
+            return
+        if cached:
+            print(f"Artifact cache: KPIs reused for {len(cached)} of {len(by_store)} store(s)")
+
+    book = None
+    if args.pipeline and args.stream:
+        print("--pipeline loads stores whole; --stream computes every store's KPIs first instead.")
+    elif args.pipeline and args.shard_by:
+        print("--pipeline writes a single workbook; running in phases for --shard-by.")
+    todo = {s: files for s, files in by_store.items() if s not in cached}
+    if args.stream:
+        with profile.stage("stream") as info:
+            fresh, fresh_rejects = stream_kpis(todo, windows, today, args.trend_days,
+                                               rows=args.chunk_rows, workers=args.workers) if todo else ({}, {})
+            info.update(stores=len(fresh), files=sum(map(len, todo.values())), chunk_rows=args.chunk_rows)
+    elif args.pipeline and not args.shard_by:
+        fresh, fresh_rejects, book = _report_pipelined(args, profile, by_store, cached, cache, today, windows)
+    else:
+        stores = collect_store_frames(cache=cache, workers=args.workers, profile=profile,
+                                      by_store=todo) if todo else {}
+        fresh = _compute_kpis(args, profile, stores, today, windows) if stores else {}
+        fresh_rejects = {s: df.attrs.get("rejects", []) for s, df in stores.items()}
+    if cache is not None:
+        cache.retain([f for s in cached for f in by_store[s]])
+        with profile.stage("cache_save") as info:
+            cache.save()
+            info.update(hits=cache.hits, misses=cache.misses)
+        print(f"CSV cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+
+    if artifacts is not None:
+        for s in fresh:
+            artifacts.save_kpis(keys[s], fresh[s], fresh_rejects[s])
+    # Discovery order, as without the cache
+    write_rejects(pd.DataFrame(
+        [(s, *r) for s in by_store for r in (cached[s][1] if s in cached else fresh_rejects[s])],
+        columns=["store", *REJECT_COLUMNS]))
+    kpis = {s: cached[s][0] if s in cached else fresh[s] for s in by_store}
+    produced = publish(args, kpis, today, profile, book=book)
+    if artifacts is not None:
+        artifacts.record(report_key, produced)
+        _evict(args, artifacts, produced)
+
+
+def _report_pipelined(args, profile: RunProfile, by_store: dict, cached: dict, cache,
+                      today: pd.Timestamp, windows: dict):
+    """
+    --pipeline: each store is read, reduced to its KPIs and written as its
+    workbook tab in overlapping stages (StagedPipeline), so only a few stores'
+    frames are resident at once. With --workers > 1 the loads run in a process
+    pool (as collect_store_frames does), the rest in this process. Stores
+    with cached KPIs skip the load.
+    Returns ({store: kpis}, {store: reject records}) for the stores computed,
+    and the open workbook; publish() adds the summaries once all KPIs are in.
+    """
+    week_text, month_text = _range_texts(args, today)
+    book = ReportWorkbook(OUTDIR / f"{report_stem(None, week_text)}.xlsx",
+                          constant_memory=args.constant_memory, trends=args.trend_days > 0,
+                          hierarchy=args.hierarchy is not None)
+    rollup = None if args.no_rollup else DailyRollup(rebuild=args.rebuild_rollup)
+
+    def load(store, job):
+        if store in cached:
+            return None
+        if job is None:
+            return _load_store(by_store[store], cache)[0]
+        df, sub = job.result()
+        if cache is not None:
+            cache.merge(sub)
+        return df
+
+    def compute(store, df):
+        if df is None:
+            return cached[store][0], None
+        rejects = df.attrs.get("rejects", [])
+        df.attrs = {}  # pandas deep-copies attrs on every operation
+        if rollup is None:
+            kpis = kpis_for_windows({store: df}, windows)[store]
+            if args.trend_days:
+                kpis["trend"] = trends_for_stores({store: df}, today, args.trend_days)[store]
+        else:
+            rollup.update({store: df}, today)
+            rollup.save()
+            kpis = rollup.kpis_for_windows(windows)[store]
+            if args.trend_days:
+                kpis["trend"] = rollup.trends(today, args.trend_days)[store]
+            del rollup.stores[store]  # one store's rollup resident at a time
+        return kpis, rejects
+
+    def render(store, result):
+        one = {store: result[0]}
+        book.add_store(store, report_tables(one, "week", "Week Range", week_text)[1][store],
+                       report_tables(one, "month", "Month Range", month_text)[1][store])
+        return result
+
+    def jobs(ex):
+        # Tabs go out in the order write_excel uses; with a pool, loads are
+        # submitted as the pipeline pulls stores in, `workers` ahead at most
+        for s in sorted(by_store):
+            job = None
+            if ex is not None and s not in cached:
+                sub = cache.subset(by_store[s]) if cache is not None else None
+                job = ex.submit(_load_store, by_store[s], sub)
+            yield s, job
+
+    def attempt(ex):
+        pipeline = StagedPipeline([("load", load), ("compute", compute), ("render", render)],
+                                  depth=args.pipeline_depth, lookahead=max(args.workers, 1))
+        return dict(pipeline.run(jobs(ex))), pipeline
+
+    with profile.stage("pipeline") as info:
+        results = None
+        if args.workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=args.workers) as ex:
+                    results, pipeline = attempt(ex)
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                print(f"Process pool unavailable ({e}); loading stores in the pipeline thread.")
+                book.discard()  # may hold some stores' tabs already
+                book = ReportWorkbook(book.path, constant_memory=args.constant_memory,
+                                      trends=args.trend_days > 0, hierarchy=args.hierarchy is not None)
+                rollup = None if args.no_rollup else DailyRollup(rebuild=args.rebuild_rollup)
+        if results is None:
+            results, pipeline = attempt(None)
+        info.update(stores=len(results), peak_resident_stores=pipeline.peak_held,
+                    **{f"{name}_busy_s": round(t, 4) for name, t in pipeline.busy.items()})
+    if rollup is not None:
+        print(f"Daily rollup: {rollup.days_built} store-day(s) rolled up")
+    fresh = {s: r for s, r in results.items() if r[1] is not None}
+    return {s: r[0] for s, r in fresh.items()}, {s: r[1] for s, r in fresh.items()}, book
+
+
+def _evict(args, artifacts: ArtifactCache, keep: list):
+    removed = artifacts.evict(args.output_max_mb, args.output_max_age_days, keep=tuple(keep))
+    artifacts.save()
+    if removed:
+        print(f"Removed {len(removed)} old report file(s) from {OUTDIR}")
+
+
+def _compute_kpis(args, profile: RunProfile, stores: dict, today: pd.Timestamp, windows: dict,
+                  since=None) -> dict:
+    if args.no_rollup:
+        # One grouped pass over every store's line items for both windows; with
+        # --workers the stores are split across processes reading shared memory
+        with profile.stage("kpis") as info:
+            kpis = map_stores(kpis_for_windows, stores, args.workers, windows)
+            info.update(rows=sum(len(df) for df in stores.values()), stores=len(kpis))
+        if args.trend_days:
+            with profile.stage("trends") as info:
+                for s, trend in map_stores(trends_for_stores, stores, args.workers,
+                                           today, args.trend_days).items():
+                    kpis[s]["trend"] = trend
+                info.update(days=args.trend_days, stores=len(kpis))
+    else:
+        rollup = DailyRollup(rebuild=args.rebuild_rollup)
+        with profile.stage("rollup_update") as info:
+            rollup.update(stores, today, since)
+            rollup.save()
+            info["days_built"] = rollup.days_built
+        print(f"Daily rollup: {rollup.days_built} store-day(s) rolled up")
+        with profile.stage("kpis") as info:
+            kpis = rollup.kpis_for_windows(windows)
+            info.update(rows=sum(len(e["items"]) for e in rollup.stores.values()), stores=len(kpis))
+        if args.trend_days:
+            with profile.stage("trends") as info:
+                for s, trend in rollup.trends(today, args.trend_days).items():
+                    kpis[s]["trend"] = trend
+                info.update(days=args.trend_days, stores=len(kpis))
+    return kpis
+
+
+def _watch(args, profile: RunProfile):
+    """
+    --watch: line-item KPIs held in memory (no Parquet source or daily rollup).
+    Each rebuild removes the files of the one before it, and output/ limits
+    apply after every rebuild, so a long-running watcher does not fill output/.
+    """
+    if args.source == "parquet":
+        raise SystemExit("--watch reads the CSVs under data/; it cannot be combined with --source parquet.")
+    artifacts = ArtifactCache()
+    last: list[Path] = []
+
+    def rebuild(stores, kpis, today):
+        nonlocal last
+        write_rejects(store_rejects(stores))
+        produced = publish(args, kpis, today, profile)
+        artifacts.discard(last, keep=tuple(produced))
+        last = produced
+        _evict(args, artifacts, produced)
+
+    cache = None if args.no_cache else CsvCache(rebuild=args.rebuild_cache)
+    watcher = ReportWatcher({"week": args.days_week, "month": args.days_month}, rebuild,
+                            cache=cache, debounce=args.debounce, poll=args.poll,
+                            trend_days=args.trend_days)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+
+def _serve(args):
+    """--serve: line-item frames held in memory behind the local KPI service."""
+    if args.source == "parquet":
+        raise SystemExit("--serve reads the CSVs under data/; it cannot be combined with --source parquet.")
+    cache = None if args.no_cache else CsvCache(rebuild=args.rebuild_cache)
+    service = KpiService(cache=cache, workers=args.workers, max_entries=args.lru_entries)
+    try:
+        serve(service, port=args.port, poll=args.poll)
+    except KeyboardInterrupt:
+        print("Stopped serving.")
+
+
+def write_rejects(rejects: pd.DataFrame):
+    """Write the rows that failed validation (store_rejects) to OUTDIR/rejected_rows.csv, if any."""
+    if not rejects.empty:
+        rejects.to_csv(OUTDIR / "rejected_rows.csv", index=False)
+        print(f"{len(rejects)} row(s) failed validation and were skipped; "
+              f"see {OUTDIR / 'rejected_rows.csv'}")
+
+
+def _pdf_engine(args) -> str:
+    if args.pdf_engine == "auto":
+        return "native" if native_pdf_available() else "excel"
+    return args.pdf_engine
+
+
+def _range_texts(args, today: pd.Timestamp) -> tuple[str, str]:
+    week_start = today - pd.Timedelta(days=args.days_week)
+    month_start = today - pd.Timedelta(days=args.days_month)
+    return (f"{week_start.date():%b %d} - {today.date():%b %d, %Y}",
+            f"{month_start.date():%b %d} - {today.date():%b %d, %Y}")
+
+
+def publish(args, kpis: dict, today: pd.Timestamp, profile: RunProfile,
+            book: ReportWorkbook | None = None) -> list[Path]:
+    """
+    Report tables, workbook(s) and PDF(s) from {store: {"week"/"month": kpis}}
+    (plus "trend": trend frame with --trend-days); returns the files written.
+    `book` is a workbook whose store tabs are already written (--pipeline);
+    only its summaries are added.
+    """
+    week_text, month_text = _range_texts(args, today)
+    with profile.stage("report_tables"):
+        weekly_df, weekly_tabs = report_tables(kpis, "week", "Week Range", week_text)
+        monthly_df, monthly_tabs = report_tables(kpis, "month", "Month Range", month_text)
+        trends = {s: k["trend"] for s, k in kpis.items() if "trend" in k} if args.trend_days else None
+    hierarchy = None
+    if args.hierarchy:
+        with profile.stage("hierarchy") as info:
+            h = load_hierarchy(args.hierarchy)
+            hierarchy = (hierarchy_summaries(kpis, h, "week", "Week Range", week_text),
+                         hierarchy_summaries(kpis, h, "month", "Month Range", month_text))
+            info.update(stores=len(kpis), **{level.lower() + "s": len(df)
+                                             for level, df in hierarchy[0].items()})
+
+    with profile.stage("write_xlsx") as info:
+        if args.shard_by:
+            regions = load_region_map(args.region_map) if args.region_map else None
+            if regions is None and args.hierarchy:
+                regions = load_hierarchy(args.hierarchy)["Region"].to_dict()
+            shards = shard_stores(list(weekly_tabs), args.shard_by, args.shard_size, regions)
+            index, shard_paths = write_sharded_excel(
+                weekly_df, monthly_df, weekly_tabs, monthly_tabs, shards,
+                workers=args.workers, constant_memory=args.constant_memory, trends=trends,
+                hierarchy=hierarchy)
+            print(f"Wrote {index} and {len(shard_paths)} shard workbook(s).")
+            xlsx_paths = [index, *shard_paths]
+            pdf_jobs = [(index, {}, {}, True)] + [
+                (p, {s: weekly_tabs[s] for s in stores}, {s: monthly_tabs[s] for s in stores}, False)
+                for stores, p in zip(shards.values(), shard_paths)]
+        else:
+            if book is not None:
+                xlsx_paths = [book.close(weekly_df, monthly_df, trends, hierarchy)]
+            else:
+                xlsx_paths = [write_excel(weekly_df, monthly_df, weekly_tabs, monthly_tabs,
+                                          constant_memory=args.constant_memory, trends=trends,
+                                          hierarchy=hierarchy)]
+            pdf_jobs = [(xlsx_paths[0], weekly_tabs, monthly_tabs, True)]
+        info.update(workbooks=len(xlsx_paths), stores=len(weekly_tabs))
+    if args.no_pdf:
+        return xlsx_paths
+    engine = _pdf_engine(args)
+    with profile.stage("export_pdf") as info:
+        info.update(engine=engine, files=len(xlsx_paths))
+        if engine == "native":
+            # Straight from the frames; stores render in parallel with --workers
+            for xlsx_path, tabs_w, tabs_m, summaries in pdf_jobs:
+                export_report_pdf(weekly_df, monthly_df, tabs_w, tabs_m, xlsx_path.with_suffix(".pdf"),
+                                  workers=args.workers, summaries=summaries, trends=trends,
+                                  hierarchy=hierarchy)
+        else:
+            for xlsx_path in xlsx_paths:
+                export_excel_to_pdf(xlsx_path, xlsx_path.with_suffix(".pdf"))
+    # The Excel engine skips (with a message) when Excel is unavailable
+    return xlsx_paths + [p.with_suffix(".pdf") for p in xlsx_paths if p.with_suffix(".pdf").exists()]
@@ -2,4 +2,8 @@ from pathlib import Path
 
 DATA_DIR = Path("data")
 OUTDIR = Path("output")
+PARQUET_DIR = Path("parquet")
+CACHE_DIR = Path(".cache")
+ROLLUP_DIR = CACHE_DIR / "rollup"
+ARTIFACT_DIR = CACHE_DIR / "artifacts"
 OUTDIR.mkdir(exist_ok=True)
@@ -0,0 +1,99 @@
+# report/csv_cache.py
+"""
+Incremental ingestion cache for daily CSVs.
+
+A JSON manifest records path, size, mtime and content hash per CSV, and each
+file's normalized frame (from load_csv_normalized) is pickled next to it.
+Unchanged files are served from the pickle; new or modified ones are parsed.
+"""
+import copy
+import hashlib
+import json
+from pathlib import Path
+import pandas as pd
+from .config import CACHE_DIR
+from .io_load import load_csv_normalized
+
+# Bump when load_csv_normalized changes its output so old pickles are dropped
+CACHE_VERSION = 3
+
+
+def file_digest(path: Path) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.file_digest(fh, "sha256").hexdigest()
+
+
+class CsvCache:
+    """Manifest-backed cache of normalized CSV frames; counts hits and misses."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, rebuild: bool = False):
+        self.cache_dir = cache_dir
+        self.frames_dir = cache_dir / "frames"
+        self.manifest_path = cache_dir / "manifest.json"
+        self.hits = 0
+        self.misses = 0
+        self.files: dict[str, dict] = {}
+        self._seen: set[str] = set()
+        if not rebuild and self.manifest_path.exists():
+            data = json.loads(self.manifest_path.read_text())
+            if data.get("version") == CACHE_VERSION:
+                self.files = data.get("files", {})
+
+    def _frame_path(self, key: str) -> Path:
+        return self.frames_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.pkl"
+
+    def load(self, path: Path) -> pd.DataFrame:
+        """load_csv_normalized(path), reusing the cached frame when the file is unchanged."""
+        key = path.as_posix()
+        self._seen.add(key)
+        st = path.stat()
+        entry = self.files.get(key)
+        frame_path = self._frame_path(key)
+
+        if entry and frame_path.exists():
+            if entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                self.hits += 1
+                return pd.read_pickle(frame_path)
+            # Touched but maybe not changed: the content hash decides
+            digest = file_digest(path)
+            if entry["sha256"] == digest:
+                entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+                self.hits += 1
+                return pd.read_pickle(frame_path)
+        else:
+            digest = file_digest(path)
+
+        self.misses += 1
+        df = load_csv_normalized(path)
+        self.frames_dir.mkdir(parents=True, exist_ok=True)
+        df.to_pickle(frame_path)
+        self.files[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        return df
+
+    def subset(self, paths: list[Path]) -> "CsvCache":
+        """Copy holding only the manifest entries for `paths` (cheap to ship to a worker)."""
+        sub = copy.copy(self)
+        sub.hits, sub.misses, sub._seen = 0, 0, set()
+        keys = {p.as_posix() for p in paths}
+        sub.files = {k: dict(v) for k, v in self.files.items() if k in keys}
+        return sub
+
+    def merge(self, other: "CsvCache"):
+        """Fold a worker's subset back in: counters, seen files and updated entries."""
+        self.hits += other.hits
+        self.misses += other.misses
+        self._seen |= other._seen
+        self.files.update(other.files)
+
+    def retain(self, paths: list[Path]):
+        """Keep the entries for files that exist but were not loaded this run."""
+        self._seen.update(p.as_posix() for p in paths)
+
+    def save(self):
+        """Write the manifest, dropping entries (and frames) for files no longer present."""
+        for key in set(self.files) - self._seen:
+            self._frame_path(key).unlink(missing_ok=True)
+            del self.files[key]
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps({"version": CACHE_VERSION, "files": self.files},
+                                                 indent=1, sort_keys=True))
@@ -1,8 +1,16 @@
 # report/excel_report.py
 import datetime as dt
+import tempfile
 from pathlib import Path
+import numpy as np
 import pandas as pd
+from xlsxwriter.utility import xl_rowcol_to_cell
 from .config import OUTDIR
+from .metrics import TAB_SECTIONS
+from .trends import TREND_METRICS, trend_tables
+
+# Trend charts draw one line per store up to this many stores, else the franchise total
+TREND_CHART_STORES = 10
 
 
 def _prep(df: pd.DataFrame) -> pd.DataFrame:
@@ -35,136 +43,290 @@ def _freeze_and_page(ws, nrows: int, ncols: int):
         ws.print_area(0, 0, nrows - 1, ncols - 1)
 
 
-def write_excel(weekly_df: pd.DataFrame,
-                monthly_df: pd.DataFrame,
-                store_tabs_week: dict,
-                store_tabs_month: dict) -> Path:
-    """Build a polished XLSX with summaries, charts, and per-store tabs."""
-    # Output name
-    week_range = weekly_df["Week Range"].iloc[0] if not weekly_df.empty else "No_Week"
+def _pct_values(s: pd.Series) -> list:
+    """Percent column as fractions: values > 1 are divided by 100 (same rule as per cell)."""
+    if pd.api.types.is_float_dtype(s.dtype):
+        v = s.to_numpy(dtype="float64")
+        return np.where(v > 1, v / 100, v).tolist()
+    return [v / 100 if isinstance(v, (int, float)) and v > 1 else v for v in s.to_numpy()]
+
+
+def _write_rows(ws, r0: int, rows, formats: list):
+    """
+    Write rows starting at r0 with one format per column.
+    Rows go out strictly in order, so this is safe in constant_memory mode.
+    """
+    if len(set(map(id, formats))) == 1:
+        for i, row in enumerate(rows):
+            ws.write_row(r0 + i, 0, row, formats[0])
+        return
+    for i, row in enumerate(rows):
+        for j, v in enumerate(row):
+            ws.write(r0 + i, j, v, formats[j])
+
+
+def report_stem(weekly_df: pd.DataFrame, week_range: str | None = None) -> str:
+    """
+    franchise_report_<week range>_<timestamp>, the base name for report files.
+    week_range overrides the text taken from weekly_df.
+    """
+    if week_range is None:
+        week_range = weekly_df["Week Range"].iloc[0] if not weekly_df.empty else "No_Week"
     slug = week_range.replace(" ", "_").replace(",", "")
     ts = dt.datetime.now().strftime("%Y-%m-%d_%H%M%S")
-    out_xlsx = OUTDIR / f"franchise_report_{slug}_{ts}.xlsx"
+    return f"franchise_report_{slug}_{ts}"
 
-    weekly_ranked = _prep(weekly_df)
-    monthly_ranked = _prep(monthly_df)
 
-    with pd.ExcelWriter(out_xlsx, engine="xlsxwriter") as xw:
-        wb = xw.book
+class ReportWorkbook:
+    """
+    The report workbook built step by step: summary sheets, with
+    hierarchy=True weekly/monthly district -> region -> chain summaries, with
+    trends=True one trend sheet per TREND_METRICS entry (all filled in at
+    close(), once every store's KPIs are known), an optional shard list, then
+    one tab per store in the order add_store() is called. write_excel() is the
+    one-shot form; the pipelined run adds store tabs as their KPIs arrive.
+    constant_memory opens the workbook in xlsxwriter's constant_memory mode:
+    every sheet streams its rows to a temp file as they are written, and chart
+    caches are left empty for Excel to fill in on open. It pays off for tall
+    tabs, not short ones. The temp files live in a directory of the book's own,
+    removed on close() or discard() (xlsxwriter leaves those of empty sheets).
+    """
+
+    def __init__(self, out_xlsx: Path, constant_memory: bool = False, summaries: bool = True,
+                 trends: bool = False, hierarchy: bool = False):
+        self.path = out_xlsx
+        self.constant_memory = constant_memory
+        self._tmp = tempfile.TemporaryDirectory(prefix="xlsx_") if constant_memory else None
+        self._xw = pd.ExcelWriter(out_xlsx, engine="xlsxwriter", engine_kwargs={"options": {
+            "constant_memory": constant_memory, "tmpdir": self._tmp.name if self._tmp else None}})
+        wb = self.wb = self._xw.book
 
         # ---- Formats
-        f_hdr   = wb.add_format({"bold": True, "bg_color": "#F2F2F2", "border": 1,
-                                 "align": "center", "valign": "vcenter"})
-        f_cell  = wb.add_format({"border": 1, "valign": "vcenter"})
-        f_money = wb.add_format({"num_format": "$#,##0", "border": 1, "valign": "vcenter"})
-        f_aov   = wb.add_format({"num_format": "$#,##0.00", "border": 1, "valign": "vcenter"})
-        f_pct   = wb.add_format({"num_format": "0.0%", "border": 1, "valign": "vcenter"})
-        f_title = wb.add_format({"bold": True, "font_size": 14})
-        f_sub   = wb.add_format({"italic": True, "font_color": "#666666"})
-
-        # ---- Helpers
-        def write_table(ws, df, title=None,
-                        money=("Revenue",),
-                        pct=("Drinks %", "Food %", "Seasonal %", "% of Total", "% Orders w/ Food"),
-                        aov=("AOV",)):
-            """Write a DataFrame with header/body formats; return (last_row, ncols)."""
+        self.f_hdr   = wb.add_format({"bold": True, "bg_color": "#F2F2F2", "border": 1,
+                                      "align": "center", "valign": "vcenter"})
+        self.f_cell  = wb.add_format({"border": 1, "valign": "vcenter"})
+        self.f_money = wb.add_format({"num_format": "$#,##0", "border": 1, "valign": "vcenter"})
+        self.f_aov   = wb.add_format({"num_format": "$#,##0.00", "border": 1, "valign": "vcenter"})
+        self.f_pct   = wb.add_format({"num_format": "0.0%", "border": 1, "valign": "vcenter"})
+        self.f_title = wb.add_format({"bold": True, "font_size": 14})
+        self.f_sub   = wb.add_format({"italic": True, "font_color": "#666666"})
+        self.f_date  = wb.add_format({"num_format": "yyyy-mm-dd", "border": 1, "valign": "vcenter"})
+
+        # Summary sheets come first in the workbook but are written last
+        self.summary_sheets = None
+        if summaries:
+            self.summary_sheets = (wb.add_worksheet("Summary – Weekly"), wb.add_worksheet("Summary – Monthly"))
+        self.hierarchy_sheets = None
+        if hierarchy:
+            self.hierarchy_sheets = (wb.add_worksheet("Hierarchy – Weekly"), wb.add_worksheet("Hierarchy – Monthly"))
+        self.trend_sheets = None
+        if trends:
+            self.trend_sheets = {m: wb.add_worksheet(f"Trend – {m}") for m in TREND_METRICS}
+
+    def write_table(self, ws, df, title=None,
+                    money=("Revenue",),
+                    pct=("Drinks %", "Food %", "Seasonal %", "% of Total", "% Orders w/ Food"),
+                    aov=("AOV",), row=0):
+        """Write a DataFrame (title first, if any) from `row` down; return (last_row, ncols)."""
+        cols = list(df.columns)
+        r0 = row
+        if title:
+            ws.write(r0, 0, title, self.f_title)
+            r0 += 1
+        # header
+        ws.write_row(r0, 0, cols, self.f_hdr)
+        # body: pick each column's format (and pct scaling) once
+        values, formats = [], []
+        for c in cols:
+            fmt = (self.f_money if c in money else self.f_aov if c in aov
+                   else self.f_pct if c in pct else self.f_cell)
+            values.append(_pct_values(df[c]) if fmt is self.f_pct else df[c].tolist())
+            formats.append(fmt)
+        _write_rows(ws, r0 + 1, zip(*values), formats)
+
+        # sensible widths for summary tables
+        # [Rank, Store, Week/Month Range, Revenue, Orders, AOV, Drinks %, Food %, Seasonal %,
+        #  % Orders w/ Food, Peak Day, % of Total]
+        _set_col_widths(ws, [6, 16, 24, 12, 10, 10, 10, 10, 12, 16, 16, 11])
+
+        last_row = r0 + 1 + len(df)   # zero-based index of last written row
+        ncols = len(cols)
+        _freeze_and_page(ws, last_row, ncols)
+        return last_row, ncols
+
+    def add_bar(self, ws, title, cat_col, val_col, n, anchor, first_row=2):
+        if not n:
+            return
+        ch = self.wb.add_chart({"type": "column"})
+        ch.add_series({
+            "name": title,
+            "categories": [ws.get_name(), first_row, cat_col, first_row + n - 1, cat_col],
+            "values":     [ws.get_name(), first_row, val_col, first_row + n - 1, val_col],
+            "data_labels": {"value": True},
+        })
+        ch.set_title({"name": title})
+        ch.set_y_axis({"num_format": "$#,##0"})
+        ch.set_legend({"position": "none"})
+        ws.insert_chart(anchor, ch, {"x_scale": 1.25, "y_scale": 1.1})
+
+    def write_hierarchy(self, ws, period: str, levels: dict[str, pd.DataFrame]):
+        """
+        One period's hierarchy sheet: a ranked summary per level (top-down),
+        stacked, with revenue bar charts for the two lowest levels with more
+        than one row.
+        """
+        r, ncols, charts = 0, 1, []
+        for level, df in levels.items():
+            ranked = _prep(df)
+            last, n = self.write_table(ws, ranked, title=f"{period} Summary by {level}", row=r)
+            ncols = max(ncols, n)
+            if len(ranked) > 1:
+                charts.append((level, list(ranked.columns), r + 2, len(ranked)))
+            r = last + 2
+        _set_col_widths(ws, [6, 18, 16, 8, 24, 12, 10, 10, 10, 10, 12, 16, 16, 11])
+        for i, (level, cols, first, n) in enumerate(charts[-2:]):
+            self.add_bar(ws, f"{period} Revenue by {level}", cols.index(level), cols.index("Revenue"),
+                         n, xl_rowcol_to_cell(2 + 19 * i, ncols + 1), first_row=first)
+        ws.print_area(0, 0, max(r, 3 + 19 * len(charts[-2:])), ncols + 9)
+
+    def write_trend(self, ws, metric: str, tables: dict[str, pd.DataFrame]):
+        """
+        One trend sheet: a Date x (All Stores, stores...) block per trailing
+        window, stacked, with a line chart per block to the right.
+        """
+        fmt = {"Revenue": self.f_money, "AOV": self.f_aov}.get(metric, self.f_cell)
+        ws.write(0, 0, f"Trailing {metric} by Store", self.f_title)
+        r, ncols = 1, 1
+        for i, (label, df) in enumerate(tables.items()):
             cols = list(df.columns)
-            r0 = 0
-            if title:
-                ws.write(r0, 0, title, f_title)
-                r0 += 1
+            ncols = max(ncols, len(cols))
+            ws.write(r, 0, f"Trailing {label} {metric}", self.f_sub)
+            ws.write_row(r + 1, 0, cols, self.f_hdr)
+            _write_rows(ws, r + 2, df.to_numpy(dtype=object).tolist(), [self.f_date] + [fmt] * (len(cols) - 1))
+            first, last = r + 2, r + 1 + len(df)
+
+            ch = self.wb.add_chart({"type": "line"})
+            series = range(2, len(cols)) if len(cols) - 2 <= TREND_CHART_STORES else [1]
+            for c in series:
+                ch.add_series({
+                    "name":       [ws.get_name(), r + 1, c],
+                    "categories": [ws.get_name(), first, 0, last, 0],
+                    "values":     [ws.get_name(), first, c, last, c],
+                })
+            ch.set_title({"name": f"Trailing {label} {metric}"})
+            ch.set_x_axis({"date_axis": True, "num_format": "mmm d"})
+            ch.set_y_axis({"num_format": fmt.num_format or "General"})
+            ch.set_legend({"position": "right" if len(series) > 1 else "none"})
+            ws.insert_chart(1 + 20 * i, ncols + 1, ch, {"x_scale": 1.5, "y_scale": 1.2})
+            r = last + 3
+        _set_col_widths(ws, [12] * ncols)
+        _freeze_and_page(ws, r, ncols)
+        ws.freeze_panes(0, 1)
+
+    def add_shards(self, shards: pd.DataFrame):
+        """Sheet listing the shard files (index workbook); call before add_store()."""
+        ws_s = self.wb.add_worksheet("Shards")
+        self.write_table(ws_s, shards, title="Shard Workbooks")
+        _set_col_widths(ws_s, [16, 60, 10, 14, 14])
+
+    def add_store(self, store: str, tabs_week: dict, tabs_month: dict):
+        """One per-store tab with its weekly and monthly sections."""
+        ws = self.wb.add_worksheet(store[:31])
+        # give breathing room; Excel ignores extra if fewer cols exist
+        _set_col_widths(ws, [18, 12, 12, 12, 12, 12, 12, 12])
+
+        r = 0
+        max_cols = 1
+        sections = [(f"{store} – {period} • {name}", tabs[name])
+                    for period, tabs in (("WEEKLY", tabs_week), ("MONTHLY", tabs_month))
+                    for name in TAB_SECTIONS]
+        for label, df in sections:
+            ws.write(r, 0, label, self.f_sub)
+            r += 1
+            cols = list(df.columns)
+            max_cols = max(max_cols, len(cols))
             # header
-            for j, c in enumerate(cols):
-                ws.write(r0, j, c, f_hdr)
+            ws.write_row(r, 0, cols, self.f_hdr)
             # body
-            for i in range(len(df)):
-                for j, c in enumerate(cols):
-                    v = df.iloc[i, j]
-                    if c in money:
-                        ws.write(r0 + 1 + i, j, v, f_money)
-                    elif c in aov:
-                        ws.write(r0 + 1 + i, j, v, f_aov)
-                    elif c in pct:
-                        ws.write(r0 + 1 + i, j,
-                                 (v / 100 if isinstance(v, (int, float)) and v > 1 else v),
-                                 f_pct)
-                    else:
-                        ws.write(r0 + 1 + i, j, v, f_cell)
-
-            # sensible widths for summary tables
-            # [Rank, Store, Week/Month Range, Revenue, Orders, AOV, Drinks %, Food %, Seasonal %,
-            #  % Orders w/ Food, Peak Day, % of Total]
-            _set_col_widths(ws, [6, 16, 24, 12, 10, 10, 10, 10, 12, 16, 16, 11])
-
-            last_row = r0 + 1 + len(df)   # zero-based index of last written row
-            ncols = len(cols)
-            _freeze_and_page(ws, last_row, ncols)
-            return last_row, ncols
-
-        def add_bar(ws, title, cat_col, val_col, n, anchor):
-            if not n:
-                return
-            ch = wb.add_chart({"type": "column"})
-            ch.add_series({
-                "name": title,
-                "categories": [ws.get_name(), 2, cat_col, n + 1, cat_col],
-                "values":     [ws.get_name(), 2, val_col, n + 1, val_col],
-                "data_labels": {"value": True},
-            })
-            ch.set_title({"name": title})
-            ch.set_y_axis({"num_format": "$#,##0"})
-            ch.set_legend({"position": "none"})
-            ws.insert_chart(anchor, ch, {"x_scale": 1.25, "y_scale": 1.1})
-
-        # ---- Summary – Weekly
-        ws_w = wb.add_worksheet("Summary – Weekly")
-        t_end_w, t_cols_w = write_table(ws_w, weekly_ranked, title="Weekly Summary")
-        n_w = len(weekly_ranked)
-        add_bar(ws_w, "Weekly Revenue by Store", 1, 3, n_w, "J3")
-        add_bar(ws_w, "Weekly AOV by Store",     1, 5, n_w, "J22")
-        # extend print area to include charts (buffer ~30 rows, min 13 cols to capture charts)
-        ws_w.print_area(0, 0, max(t_end_w + 30, t_end_w), max(t_cols_w - 1, 12))
-
-        # ---- Summary – Monthly
-        ws_m = wb.add_worksheet("Summary – Monthly")
-        t_end_m, t_cols_m = write_table(ws_m, monthly_ranked, title="Monthly Summary")
-        n_m = len(monthly_ranked)
-        add_bar(ws_m, "Monthly Revenue by Store", 1, 3, n_m, "J3")
-        add_bar(ws_m, "Monthly AOV by Store",     1, 5, n_m, "J22")
-        ws_m.print_area(0, 0, max(t_end_m + 30, t_end_m), max(t_cols_m - 1, 12))
-
-        # ---- Per-store sheets
-        for store in sorted(store_tabs_week.keys()):
-            ws = wb.add_worksheet(store[:31])
-            # give breathing room; Excel ignores extra if fewer cols exist
-            _set_col_widths(ws, [18, 12, 12, 12, 12, 12, 12, 12])
-
-            r = 0
-            max_cols = 1
-            sections = [
-                (f"{store} – WEEKLY • Category Revenue", store_tabs_week[store]["Category Revenue"]),
-                (f"{store} – WEEKLY • Top 3 Items",      store_tabs_week[store]["Top 3 Items"]),
-                (f"{store} – WEEKLY • Bottom 3 Items",   store_tabs_week[store]["Bottom 3 Items"]),
-                (f"{store} – WEEKLY • AOV by Category",  store_tabs_week[store]["AOV by Category"]),
-                (f"{store} – MONTHLY • Category Revenue", store_tabs_month[store]["Category Revenue"]),
-                (f"{store} – MONTHLY • Top 3 Items",      store_tabs_month[store]["Top 3 Items"]),
-                (f"{store} – MONTHLY • Bottom 3 Items",   store_tabs_month[store]["Bottom 3 Items"]),
-                (f"{store} – MONTHLY • AOV by Category",  store_tabs_month[store]["AOV by Category"]),
-            ]
-            for label, df in sections:
-                ws.write(r, 0, label, f_sub)
-                r += 1
-                cols = list(df.columns)
-                max_cols = max(max_cols, len(cols))
-                # header
-                for j, c in enumerate(cols):
-                    ws.write(r, j, c, f_hdr)
-                # body
-                for i in range(len(df)):
-                    for j, c in enumerate(cols):
-                        ws.write(r + 1 + i, j, df.iloc[i, j], f_cell)
-                r += len(df) + 3
-
-            _freeze_and_page(ws, r, max_cols)
-
-    return out_xlsx
+            _write_rows(ws, r + 1, df.to_numpy(dtype=object).tolist(), [self.f_cell] * len(cols))
+            r += len(df) + 3
+
+        _freeze_and_page(ws, r, max_cols)
+
+    def _save(self):
+        self._xw.close()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+    def discard(self):
+        """Drop the workbook: saving releases its temp files, then the file is deleted."""
+        self._save()
+        self.path.unlink(missing_ok=True)
+
+    def close(self, weekly_df: pd.DataFrame, monthly_df: pd.DataFrame,
+              trends: dict[str, pd.DataFrame] | None = None,
+              hierarchy: tuple[dict, dict] | None = None) -> Path:
+        """
+        Fill in the summary sheets (ranked, with charts), the hierarchy sheets
+        from (weekly, monthly) {level: summary frame} (hierarchy.hierarchy_summaries)
+        and the trend sheets from {store: trend frame} (trends.trends_for_stores),
+        then save the workbook.
+        """
+        if self.summary_sheets is not None:
+            ws_w, ws_m = self.summary_sheets
+            # ---- Summary – Weekly
+            weekly_ranked = _prep(weekly_df)
+            t_end_w, t_cols_w = self.write_table(ws_w, weekly_ranked, title="Weekly Summary")
+            n_w = len(weekly_ranked)
+            self.add_bar(ws_w, "Weekly Revenue by Store", 1, 3, n_w, "J3")
+            self.add_bar(ws_w, "Weekly AOV by Store",     1, 5, n_w, "J22")
+            # extend print area to include charts (buffer ~30 rows, min 13 cols to capture charts)
+            ws_w.print_area(0, 0, max(t_end_w + 30, t_end_w), max(t_cols_w - 1, 12))
+
+            # ---- Summary – Monthly
+            monthly_ranked = _prep(monthly_df)
+            t_end_m, t_cols_m = self.write_table(ws_m, monthly_ranked, title="Monthly Summary")
+            n_m = len(monthly_ranked)
+            self.add_bar(ws_m, "Monthly Revenue by Store", 1, 3, n_m, "J3")
+            self.add_bar(ws_m, "Monthly AOV by Store",     1, 5, n_m, "J22")
+            ws_m.print_area(0, 0, max(t_end_m + 30, t_end_m), max(t_cols_m - 1, 12))
+        if self.hierarchy_sheets is not None and hierarchy is not None:
+            for ws, period, levels in zip(self.hierarchy_sheets, ("Weekly", "Monthly"), hierarchy):
+                self.write_hierarchy(ws, period, levels)
+        if self.trend_sheets is not None:
+            tables = trend_tables(trends or {})
+            for metric, ws in self.trend_sheets.items():
+                self.write_trend(ws, metric, tables[metric])
+        self._save()
+        return self.path
+
+
+def write_excel(weekly_df: pd.DataFrame,
+                monthly_df: pd.DataFrame,
+                store_tabs_week: dict,
+                store_tabs_month: dict,
+                constant_memory: bool = False,
+                out_dir: Path = OUTDIR,
+                out_path: Path | None = None,
+                summaries: bool = True,
+                shards: pd.DataFrame | None = None,
+                trends: dict[str, pd.DataFrame] | None = None,
+                hierarchy: tuple[dict, dict] | None = None) -> Path:
+    """
+    Build a polished XLSX with summaries, charts, and per-store tabs.
+    constant_memory streams every sheet's rows to temp files (see ReportWorkbook).
+    summaries=False leaves out the two summary sheets (shard workbooks); a
+    `shards` frame adds a "Shards" sheet listing the shard files (index workbook).
+    `trends` ({store: trend frame}) adds the trend sheets with line charts and
+    `hierarchy` (weekly and monthly {level: summary frame}) the hierarchy sheets.
+    """
+    # Output name
+    out_xlsx = out_path or out_dir / f"{report_stem(weekly_df)}.xlsx"
+
+    book = ReportWorkbook(out_xlsx, constant_memory=constant_memory, summaries=summaries,
+                          trends=trends is not None, hierarchy=hierarchy is not None)
+    if shards is not None:
+        book.add_shards(shards)
+    for store in sorted(store_tabs_week.keys()):
+        book.add_store(store, store_tabs_week[store], store_tabs_month[store])
+    return book.close(weekly_df, monthly_df, trends, hierarchy)
@@ -0,0 +1,137 @@
+# report/hierarchy.py
+"""
+Store hierarchy (district -> region -> chain) summaries.
+
+Each store's window KPIs are reduced once to additive parts -- revenue,
+orders, revenue per category and per day, and orders/revenue per AOV
+category -- and the parts are merged upward: stores into districts,
+districts into regions, regions into the chain. No line item is read twice.
+
+Distinct orders: an order belongs to one store (order_ids are only unique
+within a store), so a level's Orders is the sum of its stores' distinct
+orders, and "% Orders w/ Food" is summed food orders over summed orders
+rather than an average of store percentages. Peak Day is taken from the
+summed daily revenue.
+"""
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .metrics import AOV_CATEGORIES, SUMMARY_KPIS
+from .sharding import store_names
+
+HIERARCHY_LEVELS = ["Chain", "Region", "District"]  # top-down, as the sheets list them
+DEFAULT_CHAIN = "Franchise"
+UNASSIGNED = "Unassigned"
+
+
+def load_hierarchy(path: Path) -> pd.DataFrame:
+    """
+    CSV with store, district and region columns (chain optional) ->
+    frame indexed by store name (StoreNNN) with Chain, Region, District.
+    A row with a blank store raises ValueError.
+    """
+    df = pd.read_csv(path, dtype=str)
+    if not {"store", "district", "region"}.issubset(df.columns):
+        raise ValueError(f"{path} must include columns: store, district, region")
+    if "chain" not in df.columns:
+        df["chain"] = DEFAULT_CHAIN
+    df = df.fillna({"chain": DEFAULT_CHAIN, "region": UNASSIGNED, "district": UNASSIGNED})
+    names = store_names(path, df["store"])
+    out = pd.DataFrame({"Chain": df["chain"].str.strip().to_numpy(),
+                        "Region": df["region"].str.strip().to_numpy(),
+                        "District": df["district"].str.strip().to_numpy()}, index=names)
+    return out[~out.index.duplicated(keep="last")]
+
+
+def store_parts(k: dict) -> dict:
+    """Additive parts of one store's kpis_for_window result."""
+    cat = {}
+    for c, r in zip(k["Category Revenue"]["category"], k["Category Revenue"]["revenue"]):
+        if isinstance(c, str):
+            cat[c.lower()] = cat.get(c.lower(), 0.0) + float(r)
+    aov = k["AOV by Category"]
+    return {
+        "stores": 1,
+        "revenue": float(k["Revenue"]),
+        "orders": int(k["Orders"]),
+        "cat_revenue": cat,
+        "daily": dict(zip(k["Daily Revenue"]["day"], k["Daily Revenue"]["revenue"].astype(float))),
+        "aov_orders": aov["orders"].to_numpy(dtype="int64"),
+        "aov_revenue": aov["revenue"].to_numpy(dtype="float64"),
+    }
+
+
+def merge_parts(parts: list[dict]) -> dict:
+    """Parts of a group of stores (or of lower-level groups)."""
+    cat, daily = {}, {}
+    for p in parts:
+        for c, r in p["cat_revenue"].items():
+            cat[c] = cat.get(c, 0.0) + r
+        for d, r in p["daily"].items():
+            daily[d] = daily.get(d, 0.0) + r
+    return {
+        "stores": sum(p["stores"] for p in parts),
+        "revenue": sum(p["revenue"] for p in parts),
+        "orders": sum(p["orders"] for p in parts),
+        "cat_revenue": cat,
+        "daily": daily,
+        "aov_orders": np.sum([p["aov_orders"] for p in parts], axis=0),
+        "aov_revenue": np.sum([p["aov_revenue"] for p in parts], axis=0),
+    }
+
+
+def parts_summary(p: dict) -> dict:
+    """The SUMMARY_KPIS columns for merged parts."""
+    revenue, orders = p["revenue"], p["orders"]
+    total = revenue or 1.0
+    food = p["aov_orders"][AOV_CATEGORIES.index("Food")]
+    peak_day = ""
+    if p["daily"]:
+        day, rev = min(p["daily"].items(), key=lambda kv: (-kv[1], kv[0]))
+        peak_day = f"{pd.Timestamp(day).strftime('%a')} (${rev:.2f})"
+    return {
+        "Revenue": round(revenue, 2),
+        "Orders": orders,
+        "AOV": round(revenue / orders, 2) if orders else 0.0,
+        "Drinks %": round(p["cat_revenue"].get("drink", 0.0) / total * 100, 1),
+        "Food %": round(p["cat_revenue"].get("food", 0.0) / total * 100, 1),
+        "Seasonal %": round(p["cat_revenue"].get("seasonal", 0.0) / total * 100, 1),
+        "% Orders w/ Food": round(food / orders * 100, 1) if orders else 0.0,
+        "Peak Day": peak_day,
+    }
+
+
+def hierarchy_summaries(kpis: dict, hierarchy: pd.DataFrame, window: str,
+                        range_col: str, range_text: str) -> dict[str, pd.DataFrame]:
+    """
+    {level: summary frame} for one window of kpis_for_windows output, in
+    HIERARCHY_LEVELS order. Stores missing from the hierarchy go to an
+    "Unassigned" district and region of the default chain.
+    """
+    path = {}
+    for store in kpis:
+        if store in hierarchy.index:
+            row = hierarchy.loc[store]
+            path[store] = (row["Chain"], row["Region"], row["District"])
+        else:
+            path[store] = (DEFAULT_CHAIN, UNASSIGNED, UNASSIGNED)
+
+    # Store level once, then each level from the one below it
+    merged = {"District": {}}
+    for store, by_window in kpis.items():
+        merged["District"].setdefault(path[store], []).append(store_parts(by_window[window]))
+    merged["District"] = {key: merge_parts(ps) for key, ps in merged["District"].items()}
+    for level, below in (("Region", "District"), ("Chain", "Region")):
+        groups: dict = {}
+        for key, p in merged[below].items():
+            groups.setdefault(key[:-1], []).append(p)
+        merged[level] = {key: merge_parts(ps) for key, ps in groups.items()}
+
+    # Same columns at every level (Parent is the enclosing region / chain) so the tables line up
+    out = {}
+    for level in HIERARCHY_LEVELS:
+        rows = [{level: key[-1], "Parent": key[-2] if len(key) > 1 else "", "Stores": p["stores"],
+                 range_col: range_text, **parts_summary(p)}
+                for key, p in sorted(merged[level].items())]
+        out[level] = pd.DataFrame(rows, columns=[level, "Parent", "Stores", range_col, *SUMMARY_KPIS])
+    return out
@@ -1,42 +1,112 @@
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 import pandas as pd
 from .config import DATA_DIR
+from .profiling import RunProfile
+from .schema import REJECT_COLUMNS, concat_eod, read_eod_csv, shared_categories
 
 
-def pretty_store_name_from_path(p: Path) -> str:
-    # Prefer parent folder as the store id (store101). Fallback to filename.
-    stem = p.parent.name if p.parent != DATA_DIR else p.stem
+def pretty_store_name_from_path(p: Path, data_dir: Path = DATA_DIR) -> str:
+    # Prefer parent folder as the store id (store101). Fallback to filename
+    # for CSVs directly under data_dir.
+    stem = p.parent.name if p.parent != data_dir else p.stem
     m = re.search(r"store\s*[_-]?(\d+)", stem, re.IGNORECASE)
     return f"Store{m.group(1)}" if m else re.sub(r"[_\-]+", " ", stem).title()[:31]
 
 
 def load_csv_normalized(path: Path) -> pd.DataFrame:
-    df = pd.read_csv(path)
-    need = {"date", "order_id", "revenue"}
-    if not need.issubset(df.columns):
-        raise ValueError(f"{path} must include columns: {need}")
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    if "category" not in df.columns:
-        df["category"] = "Unknown"
-    if "item" not in df.columns:
-        df["item"] = "Unknown Item"
+    """
+    One EOD CSV typed per report.schema. Rows that fail validation are left
+    out and listed in df.attrs["rejects"] as (source, line, reason, row).
+    """
+    df, rejects = read_eod_csv(path)
+    df.attrs["rejects"] = rejects
     return df
 
 
-def collect_store_frames() -> dict[str, pd.DataFrame]:
+def _load_store(files: list[Path], cache=None):
     """
-    Returns dict: {store_name: concatenated DataFrame of all daily CSVs}
-    Accepts nested folders under data/ or flat CSVs inside data/.
+    Load, normalize and date-sort one store's CSVs; returns (frame, cache).
+    df.attrs["load_times"] lists (path, wall s, cpu s, rows) per file.
     """
-    all_csvs = list(DATA_DIR.rglob("*.csv"))
+    load = cache.load if cache is not None else load_csv_normalized
+    frames, times = [], []
+    for f in files:
+        wall, cpu = time.perf_counter(), time.process_time()
+        frames.append(load(f))
+        times.append((f.as_posix(), time.perf_counter() - wall, time.process_time() - cpu, len(frames[-1])))
+    df = concat_eod(frames).sort_values("date")
+    df.attrs["rejects"] = [r for f in frames for r in f.attrs.get("rejects", [])]
+    df.attrs["load_times"] = times
+    return df, cache
+
+
+def store_rejects(stores: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Every rejected row across the loaded stores, with its store."""
+    records = [(store, *r) for store, df in stores.items() for r in df.attrs.get("rejects", [])]
+    return pd.DataFrame(records, columns=["store", *REJECT_COLUMNS])
+
+
+def discover_store_files(data_dir: Path = DATA_DIR) -> dict[str, list[Path]]:
+    """{store_name: [csv paths]} for every CSV under data_dir (nested folders or flat)."""
+    all_csvs = list(data_dir.rglob("*.csv"))
     if not all_csvs:
         raise SystemExit("No CSVs found under ./data/. Add daily EOD files per store.")
-
-    stores: dict[str, list[pd.DataFrame]] = {}
+    by_store: dict[str, list[Path]] = {}
     for csv in all_csvs:
-        store = pretty_store_name_from_path(csv)
-        stores.setdefault(store, []).append(load_csv_normalized(csv))
+        by_store.setdefault(pretty_store_name_from_path(csv, data_dir), []).append(csv)
+    return by_store
+
+
+def collect_store_frames(cache=None, workers: int = 1, profile=None,
+                         by_store: dict[str, list[Path]] | None = None) -> dict[str, pd.DataFrame]:
+    """
+    Returns dict: {store_name: concatenated DataFrame of all daily CSVs}
+    Accepts nested folders under data/ or flat CSVs inside data/.
+    `cache` (a CsvCache) reuses frames for unchanged files.
+    With workers > 1 each store is loaded in a process pool; every store goes
+    through the same per-store step either way, so the result does not depend
+    on the worker count. workers <= 1, or a pool that cannot start, runs serially.
+    `profile` (a RunProfile) times discovery, parsing and category sharing.
+    `by_store` (from discover_store_files) limits loading to those stores.
+    """
+    profile = profile or RunProfile()
+    if by_store is None:
+        with profile.stage("discover") as info:
+            by_store = discover_store_files()
+            info.update(files=sum(map(len, by_store.values())), stores=len(by_store))
+
+    with profile.stage("parse") as info:
+        stores = None
+        if workers > 1 and len(by_store) > 1:
+            try:
+                stores = _collect_parallel(by_store, cache, workers)
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                print(f"Process pool unavailable ({e}); loading stores serially.")
+        if stores is None:
+            stores = {store: _load_store(files, cache)[0] for store, files in by_store.items()}
+        info.update(rows=sum(len(df) for df in stores.values()), workers=workers)
+
+    with profile.stage("share_categories"):
+        # One item/category dictionary across stores, so combined frames stay categorical
+        frames = shared_categories(list(stores.values()))
+        for df, old in zip(frames, stores.values()):
+            df.attrs = {k: old.attrs[k] for k in ("rejects", "load_times") if k in old.attrs}
+    stores = dict(zip(stores, frames))
+    profile.add_store_loads(stores)
+    return stores
+
 
-    return {k: pd.concat(v, ignore_index=True).sort_values("date") for k, v in stores.items()}
+def _collect_parallel(by_store: dict[str, list[Path]], cache, workers: int) -> dict[str, pd.DataFrame]:
+    # Each task carries only its own files' manifest entries; merged back afterwards
+    subsets = [cache.subset(files) if cache is not None else None for files in by_store.values()]
+    chunksize = max(1, len(by_store) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(_load_store, by_store.values(), subsets, chunksize=chunksize))
+    if cache is not None:
+        for _, sub in results:
+            cache.merge(sub)
+    return {store: df for store, (df, _) in zip(by_store, results)}
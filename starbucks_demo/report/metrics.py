@@ -1,4 +1,68 @@
+import numpy as np
 import pandas as pd
+from .baskets import OrderIndex
+
+AOV_CATEGORIES = ["Drink", "Food", "Seasonal"]
+FOOD = AOV_CATEGORIES.index("Food")
+TOP_PAIRS = 5
+# The rollup, stream and trend paths add up partial sums, so they sum revenue
+# in whole micro-units: float64 sums of integers are exact (up to 2**53
+# micros), so their totals do not depend on how rows were grouped or in which
+# order partial sums were added, and are the correctly rounded total. A plain
+# float sum of line items (kpis_for_window, kpis_for_windows) is not always
+# correctly rounded, so those paths can differ from it in the last digit, and
+# after rounding to cents on exact half-cent values.
+MICROS = 1_000_000
+
+
+def _category_bits(category: pd.Series) -> np.ndarray:
+    """Per-row bit of the row's AOV category (bit k = AOV_CATEGORIES[k]); 0 for other categories."""
+    lc = _lowered(category)
+    bits = np.zeros(len(lc), dtype="int64")
+    for k, c in enumerate(AOV_CATEGORIES):
+        bits[lc == c.lower()] = 1 << k
+    return bits
+
+
+def _revenue_values(revenue: pd.Series) -> np.ndarray:
+    rev = revenue.to_numpy(dtype="float64", na_value=np.nan)
+    return np.where(np.isnan(rev), 0.0, rev)
+
+
+def _micros(revenue: pd.Series) -> np.ndarray:
+    """Revenue (missing as 0) in whole micro-units, as float64."""
+    return np.round(_revenue_values(revenue) * MICROS)
+
+
+def order_index(win: pd.DataFrame, group=None, n_groups: int = 1) -> OrderIndex:
+    """Basket index over window rows (one group unless a per-row group key is given)."""
+    return OrderIndex(
+        np.zeros(len(win), dtype="int64") if group is None else group,
+        win["order_id"].to_numpy(), win["item"],
+        _category_bits(win["category"]), len(AOV_CATEGORIES), n_groups,
+        revenue=_revenue_values(win["revenue"]),
+    )
+
+
+def _basket_kpis(baskets: OrderIndex, g: int, cat_revenue: list | None = None) -> dict:
+    """Order-level KPIs of group g, all read from the basket index."""
+    orders = baskets.orders(g)
+
+    def aov_by(k: int, cat: str):
+        o = baskets.category_orders(g, k)
+        rev = cat_revenue[k] if cat_revenue is not None else baskets.category_revenue(g, k)
+        return [cat, o, rev, round(rev / o, 2) if o else 0.0]
+
+    return {
+        "Orders": orders,
+        "% Orders w/ Food": round(baskets.category_orders(g, FOOD) / orders * 100, 1) if orders else 0.0,
+        "AOV by Category": pd.DataFrame(
+            [aov_by(k, c) for k, c in enumerate(AOV_CATEGORIES)],
+            columns=["category", "orders", "revenue", "aov"],
+        ),
+        "Frequently Bought Together": baskets.together(g, TOP_PAIRS),
+        "Basket Size by Category": baskets.basket_sizes(g, AOV_CATEGORIES),
+    }
 
 
 def kpis_for_window(df: pd.DataFrame, start, end):
@@ -9,7 +73,7 @@ def kpis_for_window(df: pd.DataFrame, start, end):
     aov = round(revenue / orders, 2) if orders else 0.0
 
     cat_rev = (
-        win.groupby("category", dropna=False)["revenue"]
+        win.groupby("category", dropna=False, observed=True)["revenue"]
         .sum()
         .sort_values(ascending=False)
         .reset_index()
@@ -42,7 +106,7 @@ def kpis_for_window(df: pd.DataFrame, start, end):
 
     # Items
     items_rev = (
-        win.groupby("item", dropna=False)["revenue"]
+        win.groupby("item", dropna=False, observed=True)["revenue"]
         .sum()
         .sort_values(ascending=False)
         .reset_index()
@@ -57,6 +121,9 @@ def kpis_for_window(df: pd.DataFrame, start, end):
         rev = float(sub["revenue"].sum()) if not sub.empty else 0.0
         return [cat, o, rev, round(rev / o, 2) if o else 0.0]
 
+    # Item pairs and basket sizes
+    baskets = order_index(win)
+
     return {
         "Revenue": round(revenue, 2),
         "Orders": orders,
@@ -73,7 +140,183 @@ def kpis_for_window(df: pd.DataFrame, start, end):
         "Top 3 Items": items_rev.head(3),
         "Bottom 3 Items": items_rev.tail(3) if len(items_rev) >= 3 else items_rev,
         "AOV by Category": pd.DataFrame(
-            [aov_by(c) for c in ["Drink", "Food", "Seasonal"]],
+            [aov_by(c) for c in AOV_CATEGORIES],
             columns=["category", "orders", "revenue", "aov"],
         ),
+        "Frequently Bought Together": baskets.together(0, TOP_PAIRS),
+        "Basket Size by Category": baskets.basket_sizes(0, AOV_CATEGORIES),
     }
+
+
+# ---------------------------------------------------------------------------
+# Multi-store / multi-window engine
+# ---------------------------------------------------------------------------
+
+
+def _desc_order(values: np.ndarray) -> np.ndarray:
+    """Indexer for a descending sort with the same tie order as Series.sort_values."""
+    n = len(values)
+    return (n - 1 - values[::-1].argsort(kind="quicksort"))[::-1]
+
+
+def _assemble_kpis(revenue: float, cat_sum: tuple, daily_sum: tuple, items_sum: tuple,
+                   baskets: OrderIndex, g: int, cat_revenue: list | None = None) -> dict:
+    """
+    Build the kpis_for_window dict from pre-aggregated parts.
+    cat_sum / daily_sum / items_sum are (keys, revenue) pairs in groupby order;
+    order-level KPIs come from group g of the basket index, with per-category
+    revenue (in AOV_CATEGORIES order) from cat_revenue when the index has none.
+    """
+    basket = _basket_kpis(baskets, g, cat_revenue)
+    orders = basket["Orders"]
+    aov = round(revenue / orders, 2) if orders else 0.0
+    total = revenue or 1.0
+
+    keys, vals = cat_sum
+    o = _desc_order(vals)
+    pcts = (vals[o] / total * 100).round(1)
+    cat_rev = pd.DataFrame({"category": keys.take(o), "revenue": vals[o], "percent_of_total": pcts})
+    cat_pct = {}
+    for c, p in zip(keys.take(o), pcts):
+        if isinstance(c, str):
+            cat_pct.setdefault(c.lower(), float(p))
+
+    keys, vals = daily_sum
+    daily_rev = pd.DataFrame({"day": keys, "revenue": vals})
+    top = _desc_order(vals)[0]
+    peak_day = f"{pd.to_datetime(keys[top]).strftime('%a')} (${vals[top]:.2f})"
+
+    keys, vals = items_sum
+    o = _desc_order(vals)
+    items_rev = pd.DataFrame({"item": keys.take(o), "revenue": vals[o]})
+
+    return {
+        "Revenue": round(revenue, 2),
+        "Orders": orders,
+        "AOV": aov,
+        "Drinks %": cat_pct.get("drink", 0.0),
+        "Food %": cat_pct.get("food", 0.0),
+        "Seasonal %": cat_pct.get("seasonal", 0.0),
+        "% Orders w/ Food": basket["% Orders w/ Food"],
+        "Peak Day": peak_day,
+        "Category Revenue": cat_rev,
+        "Daily Revenue": daily_rev,
+        "Top 3 Items": items_rev.head(3),
+        "Bottom 3 Items": items_rev.tail(3) if len(items_rev) >= 3 else items_rev,
+        "AOV by Category": basket["AOV by Category"],
+        "Frequently Bought Together": basket["Frequently Bought Together"],
+        "Basket Size by Category": basket["Basket Size by Category"],
+    }
+
+
+def _bounds(keys: np.ndarray, n: int) -> np.ndarray:
+    """Start offsets (length n + 1) of each key 0..n-1 in a sorted key array."""
+    return np.searchsorted(keys, np.arange(n + 1))
+
+
+def _slice_sum(values: np.ndarray, lo: int, hi: int) -> float:
+    # Same reduction as Series.sum() on the window so totals match to the bit
+    return float(values[lo:hi].sum()) if hi > lo else 0.0
+
+
+def _window_rows(frames: list[pd.DataFrame], windows: dict, cols: list[str]) -> pd.DataFrame:
+    """
+    Rows of every frame inside every window, with a "_g" group key
+    (frame index * len(windows) + window index). One index slice per window,
+    then a stable sort on the key keeps each frame's row order within a group.
+    """
+    full = pd.concat([f[cols] for f in frames], ignore_index=True)
+    store_code = np.repeat(np.arange(len(frames)), [len(f) for f in frames])
+    idx_parts, win_parts = [], []
+    for w, (start, end) in enumerate(windows.values()):
+        hit = np.flatnonzero((full["date"] >= start).to_numpy() & (full["date"] < end).to_numpy())
+        idx_parts.append(hit)
+        win_parts.append(np.full(len(hit), w))
+    idx = np.concatenate(idx_parts)
+    gkey = store_code[idx] * len(windows) + np.concatenate(win_parts)
+    order = np.argsort(gkey, kind="stable")
+    win = full.take(idx[order]).reset_index(drop=True)
+    win["_g"] = gkey[order]
+    return win
+
+
+def _lowered(category: pd.Series) -> np.ndarray:
+    """Lower-cased categories (None for non-strings), computed once per distinct value."""
+    codes, uniques = pd.factorize(category)
+    lowered = np.array([u.lower() if isinstance(u, str) else None for u in uniques] + [None],
+                       dtype=object)
+    return lowered[codes]
+
+
+def kpis_for_windows(stores: dict[str, pd.DataFrame], windows: dict[str, tuple]) -> dict:
+    """
+    KPIs for every store and every window in one grouped pass.
+    windows maps a label to a (start, end) pair; windows may overlap.
+    Returns {store: {label: kpis}} where each kpis dict is identical to
+    kpis_for_window(stores[store], start, end).
+    """
+    names = list(stores)
+    labels = list(windows)
+    out: dict = {s: {} for s in names}
+    if not names or not labels:
+        return out
+
+    frames = [stores[s] for s in names]
+    n_groups = len(names) * len(labels)
+    win = _window_rows(frames, windows, ["date", "order_id", "item", "category", "revenue"])
+    gkey = win["_g"].to_numpy()
+    bounds = _bounds(gkey, n_groups)
+    win["_day"] = win["date"].dt.normalize()
+    rev = _revenue_values(win["revenue"])
+    baskets = order_index(win, gkey, n_groups)
+
+    cat_by_g = win.groupby(["_g", "category"], dropna=False, observed=True)["revenue"].sum()
+    day_by_g = win.groupby(["_g", "_day"])["revenue"].sum()
+    item_by_g = win.groupby(["_g", "item"], dropna=False, observed=True)["revenue"].sum()
+
+    def split(s: pd.Series, keys: pd.Index):
+        """Per-group slicer over a (_g, key) groupby result."""
+        b = _bounds(s.index.get_level_values(0).to_numpy(), n_groups)
+        vals = s.to_numpy()
+        return lambda g: (keys[b[g]:b[g + 1]], vals[b[g]:b[g + 1]])
+
+    cat_part = split(cat_by_g, cat_by_g.index.get_level_values(1))
+    day_part = split(day_by_g, pd.Index(day_by_g.index.get_level_values(1).date))
+    item_part = split(item_by_g, item_by_g.index.get_level_values(1))
+
+    for si, store in enumerate(names):
+        for wi, label in enumerate(labels):
+            g = si * len(labels) + wi
+            lo, hi = bounds[g], bounds[g + 1]
+            if lo == hi:
+                start, end = windows[label]
+                out[store][label] = kpis_for_window(frames[si].iloc[:0], start, end)
+                continue
+            out[store][label] = _assemble_kpis(
+                revenue=_slice_sum(rev, lo, hi),
+                cat_sum=cat_part(g),
+                daily_sum=day_part(g),
+                items_sum=item_part(g),
+                baskets=baskets,
+                g=g,
+            )
+    return out
+
+
+SUMMARY_KPIS = ["Revenue", "Orders", "AOV", "Drinks %", "Food %", "Seasonal %",
+                "% Orders w/ Food", "Peak Day"]
+TAB_SECTIONS = ["Category Revenue", "Top 3 Items", "Bottom 3 Items", "AOV by Category",
+                "Frequently Bought Together", "Basket Size by Category"]
+
+
+def report_tables(kpis: dict, window: str, range_col: str, range_text: str):
+    """
+    Summary frame and per-store tab sections for one window of kpis_for_windows output.
+    Returns (summary_df, {store: {section: DataFrame}}) as write_excel expects.
+    """
+    rows, tabs = [], {}
+    for store, by_window in kpis.items():
+        k = by_window[window]
+        rows.append({"Store": store, range_col: range_text, **{c: k[c] for c in SUMMARY_KPIS}})
+        tabs[store] = {c: k[c] for c in TAB_SECTIONS}
+    return pd.DataFrame(rows, columns=["Store", range_col, *SUMMARY_KPIS]), tabs
@@ -0,0 +1,148 @@
+# report/parquet_store.py
+"""
+Columnar (Parquet) store for daily EOD files.
+
+Layout: PARQUET_DIR/store=<Store>/date=<YYYY-MM-DD>/<csv stem>-<path hash>.parquet
+One part per source CSV and day, named after the CSV's path under DATA_DIR so
+CSVs with the same name in different folders do not collide. Re-ingesting a
+CSV replaces all of its parts (days it no longer holds included), and parts of
+CSVs that are gone are removed, so the loaded rows match collect_store_frames().
+
+Rows that fail validation are kept per part name in PARQUET_DIR/rejects.json
+and come back in df.attrs["rejects"], as the CSV loader reports them.
+"""
+import datetime as dt
+import hashlib
+import json
+from pathlib import Path
+import pandas as pd
+from .config import DATA_DIR, PARQUET_DIR
+from .io_load import load_csv_normalized, pretty_store_name_from_path
+
+COLUMNS = ["date", "order_id", "item", "category", "revenue"]
+REJECTS_MANIFEST = "rejects.json"  # {part name: {"store": store, "rejects": [reject record, ...]}}
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("pyarrow not installed; the Parquet store needs `pip install pyarrow`.")
+    return pa, pq
+
+
+def _schema(pa):
+    return pa.schema([
+        ("date", pa.timestamp("ns")),
+        ("order_id", pa.int64()),
+        ("item", pa.dictionary(pa.int32(), pa.string())),
+        ("category", pa.dictionary(pa.int32(), pa.string())),
+        ("revenue", pa.float64()),
+    ])
+
+
+def _is_stale(csv: Path, parts: list[Path]) -> bool:
+    """True if the CSV has no parts yet or was modified after they were written."""
+    if not parts:
+        return True
+    mtime = csv.stat().st_mtime
+    return any(p.stat().st_mtime < mtime for p in parts)
+
+
+def _part_name(csv: Path, data_dir: Path) -> str:
+    rel = csv.relative_to(data_dir).as_posix()
+    return f"{csv.stem}-{hashlib.sha1(rel.encode()).hexdigest()[:10]}.parquet"
+
+
+def _load_rejects(out_dir: Path) -> dict:
+    path = out_dir / REJECTS_MANIFEST
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _remove_part(part: Path):
+    part.unlink()
+    if not any(part.parent.iterdir()):
+        part.parent.rmdir()
+
+
+def ingest_to_parquet(data_dir: Path = DATA_DIR, out_dir: Path = PARQUET_DIR) -> int:
+    """
+    Convert new or modified CSVs under data_dir into store/date Parquet partitions.
+    Returns the number of CSVs converted.
+    """
+    pa, pq = _pyarrow()
+    schema = _schema(pa)
+    csvs = sorted(data_dir.rglob("*.csv"))
+    names = {_part_name(csv, data_dir) for csv in csvs}
+    for part in out_dir.glob("store=*/date=*/*.parquet"):
+        if part.name not in names:  # its CSV was removed or renamed
+            _remove_part(part)
+    rejects = {n: e for n, e in _load_rejects(out_dir).items() if n in names}
+
+    converted = 0
+    for csv in csvs:
+        store_dir = out_dir / f"store={pretty_store_name_from_path(csv, data_dir)}"
+        name = _part_name(csv, data_dir)
+        parts = list(store_dir.glob(f"date=*/{name}"))
+        if not _is_stale(csv, parts):
+            continue
+
+        df = load_csv_normalized(csv)
+        rejects.pop(name, None)
+        if df.attrs["rejects"]:
+            rejects[name] = {"store": store_dir.name.split("=", 1)[1], "rejects": df.attrs["rejects"]}
+        df = df[COLUMNS]
+        for part in parts:
+            _remove_part(part)
+        for day, day_df in df.groupby(df["date"].dt.date):
+            part = store_dir / f"date={day.isoformat()}" / name
+            part.parent.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(day_df, schema=schema, preserve_index=False)
+            pq.write_table(table, part)
+        converted += 1
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / REJECTS_MANIFEST).write_text(json.dumps(rejects, indent=1, sort_keys=True))
+    return converted
+
+
+def partitions_for_window(start, end, out_dir: Path = PARQUET_DIR) -> dict[str, list[Path]]:
+    """Part files per store whose date partition overlaps [start, end)."""
+    first = pd.Timestamp(start).date()
+    last = pd.Timestamp(end)
+    parts: dict[str, list[Path]] = {}
+    for store_dir in sorted(out_dir.glob("store=*")):
+        for day_dir in sorted(store_dir.glob("date=*")):
+            day = dt.date.fromisoformat(day_dir.name.split("=", 1)[1])
+            if first <= day and pd.Timestamp(day) < last:
+                parts.setdefault(store_dir.name.split("=", 1)[1], []).extend(sorted(day_dir.glob("*.parquet")))
+    return parts
+
+
+def load_store_frames_parquet(start, end, columns: list[str] | None = None,
+                              out_dir: Path = PARQUET_DIR) -> dict[str, pd.DataFrame]:
+    """
+    Like collect_store_frames(), but reads only the partitions that overlap
+    [start, end) and only the requested columns. item/category come back as
+    categoricals with sorted categories. df.attrs["rejects"] lists the rows of
+    the store's CSVs that failed validation at ingest.
+    """
+    pa, pq = _pyarrow()
+    columns = columns or COLUMNS
+    parts = partitions_for_window(start, end, out_dir)
+    if not parts:
+        raise SystemExit(f"No Parquet partitions under ./{out_dir}/ overlap the report window. "
+                         "Run with --ingest first.")
+
+    rejects: dict[str, list] = {}
+    for entry in _load_rejects(out_dir).values():
+        rejects.setdefault(entry["store"], []).extend(tuple(r) for r in entry["rejects"])
+    stores = {}
+    for store, files in parts.items():
+        df = pa.concat_tables([pq.read_table(f, columns=columns) for f in files]).to_pandas()
+        for c in ("item", "category"):
+            if c in df.columns:
+                df[c] = df[c].cat.reorder_categories(sorted(df[c].cat.categories))
+        stores[store] = df.sort_values("date") if "date" in df.columns else df
+        stores[store].attrs["rejects"] = sorted(rejects.get(store, []), key=lambda r: (r[0], r[1]))
+    return stores
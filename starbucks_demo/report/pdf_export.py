@@ -1,4 +1,9 @@
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from .metrics import TAB_SECTIONS
+from .trends import trend_tables
 
 
 def export_excel_to_pdf(xlsx_path: Path, pdf_path: Path):
@@ -32,3 +37,271 @@ def export_excel_to_pdf(xlsx_path: Path, pdf_path: Path):
         if excel is not None:
             excel.Quit()
         pythoncom.CoUninitialize()
+
+
+# ---------------------------------------------------------------------------
+# Native renderer (reportlab): builds the PDF straight from the report frames,
+# no Excel and no XLSX round-trip
+# ---------------------------------------------------------------------------
+
+MONEY_COLS = ("Revenue", "revenue")
+AOV_COLS = ("AOV", "aov")
+PCT_COLS = ("Drinks %", "Food %", "Seasonal %", "% of Total", "% Orders w/ Food")
+
+
+def native_pdf_available() -> bool:
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _fmt(col: str, v) -> str:
+    """Cell text using the same number formats as the workbook."""
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        if col in MONEY_COLS:
+            return f"${v:,.0f}"
+        if col in AOV_COLS:
+            return f"${v:,.2f}"
+        if col in PCT_COLS:
+            return f"{(v / 100 if v > 1 else v):.1%}"
+        if col in ("percent_of_total", "percent_of_orders", "attach_rate"):
+            return f"{v:.1f}%"
+    return str(v)
+
+
+def _table(df):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    cols = list(df.columns)
+    rows = [cols] + [[_fmt(c, v) for c, v in zip(cols, r)] for r in df.to_numpy(dtype=object).tolist()]
+    t = Table(rows, repeatRows=1, hAlign="LEFT")
+    t.setStyle(TableStyle([
+        ("FONT", (0, 0), (-1, -1), "Helvetica", 7.5),
+        ("FONT", (0, 0), (-1, 0), "Helvetica-Bold", 7.5),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#F2F2F2")),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+    ]))
+    return t
+
+
+def _bar_chart(title: str, labels: list, values: list, money_fmt: str):
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    from reportlab.graphics.shapes import Drawing, String
+
+    d = Drawing(700, 230)
+    d.add(String(350, 215, title, textAnchor="middle", fontName="Helvetica-Bold", fontSize=10))
+    ch = VerticalBarChart()
+    ch.x, ch.y, ch.width, ch.height = 50, 45, 630, 160
+    ch.data = [values or [0]]
+    ch.categoryAxis.categoryNames = [str(x) for x in labels] or [""]
+    ch.categoryAxis.labels.angle = 90 if len(labels) > 12 else 0
+    ch.categoryAxis.labels.boxAnchor = "e" if len(labels) > 12 else "n"
+    ch.categoryAxis.labels.fontSize = 6 if len(labels) > 12 else 7
+    ch.valueAxis.valueMin = 0
+    ch.valueAxis.labelTextFormat = money_fmt
+    ch.valueAxis.labels.fontSize = 7
+    if len(labels) <= 30:
+        ch.barLabelFormat = money_fmt
+        ch.barLabels.fontSize = 6
+        ch.barLabels.nudge = 6
+    d.add(ch)
+    return d
+
+
+def _line_chart(title: str, dates: list, series: dict[str, list], value_fmt: str):
+    from reportlab.graphics.charts.legends import Legend
+    from reportlab.graphics.charts.linecharts import HorizontalLineChart
+    from reportlab.graphics.shapes import Drawing, String
+    from reportlab.lib import colors
+
+    d = Drawing(700, 230)
+    d.add(String(350, 215, title, textAnchor="middle", fontName="Helvetica-Bold", fontSize=10))
+    ch = HorizontalLineChart()
+    ch.x, ch.y, ch.width, ch.height = 50, 30, 520 if len(series) > 1 else 630, 170
+    ch.data = [list(v) for v in series.values()] or [[0]]
+    step = max(1, len(dates) // 12)
+    ch.categoryAxis.categoryNames = [f"{x:%b %d}" if i % step == 0 else "" for i, x in enumerate(dates)] or [""]
+    ch.categoryAxis.labels.fontSize = 6
+    ch.categoryAxis.tickUp = ch.categoryAxis.tickDown = 0
+    ch.valueAxis.valueMin = 0
+    ch.valueAxis.labelTextFormat = value_fmt
+    ch.valueAxis.labels.fontSize = 7
+    palette = [colors.HexColor(c) for c in ("#1F77B4", "#FF7F0E", "#2CA02C", "#D62728", "#9467BD",
+                                            "#8C564B", "#E377C2", "#7F7F7F", "#BCBD22", "#17BECF")]
+    for i in range(len(series)):
+        ch.lines[i].strokeColor = palette[i % len(palette)]
+    d.add(ch)
+    if len(series) > 1:
+        legend = Legend()
+        legend.x, legend.y = 585, 200
+        legend.fontSize = 6
+        legend.colorNamePairs = [(palette[i % len(palette)], name) for i, name in enumerate(series)]
+        d.add(legend)
+    return d
+
+
+def _summary_story(title: str, ranked, period: str):
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, Spacer
+
+    styles = getSampleStyleSheet()
+    story = [Paragraph(title, styles["Title"]), _table(ranked), Spacer(1, 12)]
+    if not ranked.empty:
+        labels = ranked["Store"].tolist()
+        story.append(_bar_chart(f"{period} Revenue by Store", labels, ranked["Revenue"].tolist(), "$%d"))
+        story.append(_bar_chart(f"{period} AOV by Store", labels, ranked["AOV"].tolist(), "$%.2f"))
+    story.append(PageBreak())
+    return story
+
+
+def _hierarchy_story(period: str, levels: dict):
+    """The hierarchy sheet: a ranked table per level, then charts for the two lowest levels."""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, Spacer
+    from .excel_report import _prep
+
+    styles = getSampleStyleSheet()
+    story, charts = [Paragraph(f"{period} Hierarchy", styles["Title"])], []
+    for level, df in levels.items():
+        ranked = _prep(df)
+        story += [Paragraph(f"{period} Summary by {level}", styles["Italic"]), _table(ranked), Spacer(1, 8)]
+        if len(ranked) > 1:
+            charts.append(_bar_chart(f"{period} Revenue by {level}", ranked[level].tolist(),
+                                     ranked["Revenue"].tolist(), "$%d"))
+    story += charts[-2:]
+    story.append(PageBreak())
+    return story
+
+
+def _trend_story(metric: str, tables: dict):
+    """
+    A trend sheet: per trailing window, a line chart and the Date x (All
+    Stores, stores...) table. Past TREND_CHART_STORES stores only the All
+    Stores series is drawn and listed; the workbook keeps every store's column.
+    """
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, Spacer
+    from .excel_report import TREND_CHART_STORES
+
+    styles = getSampleStyleSheet()
+    value_fmt = {"Revenue": "$%d", "AOV": "$%.2f"}.get(metric, "%d")
+    story = [Paragraph(f"Trailing {metric} by Store", styles["Title"])]
+    for label, df in tables.items():
+        cols = list(df.columns)
+        shown = cols if len(cols) - 2 <= TREND_CHART_STORES else cols[:2]
+        lines = shown[2:] or shown[1:]
+        cells = df[shown].copy()
+        for c in shown[1:]:
+            cells[c] = [_fmt(metric, v) for v in df[c].tolist()]
+        story += [_line_chart(f"Trailing {label} {metric}", df["Date"].tolist(),
+                              {c: df[c].tolist() for c in lines}, value_fmt),
+                  Paragraph(f"Trailing {label} {metric}", styles["Italic"]), _table(cells), Spacer(1, 12)]
+    story.append(PageBreak())
+    return story
+
+
+def _store_story(store: str, tabs_week: dict, tabs_month: dict):
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, Spacer
+
+    sub = getSampleStyleSheet()["Italic"]
+    story = []
+    for period, tabs in (("WEEKLY", tabs_week), ("MONTHLY", tabs_month)):
+        for section in TAB_SECTIONS:
+            story += [Paragraph(f"{store} – {period} • {section}", sub), _table(tabs[section]), Spacer(1, 8)]
+    story.append(PageBreak())
+    return story
+
+
+def _render_part(pdf_path: Path, weekly_ranked, monthly_ranked, tabs_week: dict, tabs_month: dict,
+                 hierarchy: tuple | None = None, trends: dict | None = None) -> Path:
+    """
+    One PDF: the summary pages (if frames given), hierarchy and trend pages
+    (if given), then a page per store, in the workbook's sheet order.
+    """
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate
+
+    story = []
+    if weekly_ranked is not None:
+        story += _summary_story("Weekly Summary", weekly_ranked, "Weekly")
+        story += _summary_story("Monthly Summary", monthly_ranked, "Monthly")
+    if hierarchy is not None:
+        story += _hierarchy_story("Weekly", hierarchy[0])
+        story += _hierarchy_story("Monthly", hierarchy[1])
+    for metric, tables in (trends or {}).items():
+        story += _trend_story(metric, tables)
+    for store in sorted(tabs_week):
+        story += _store_story(store, tabs_week[store], tabs_month[store])
+    if story:
+        story.pop()  # no blank page after the last section
+    doc = SimpleDocTemplate(str(pdf_path), pagesize=landscape(letter),
+                            leftMargin=0.5 * inch, rightMargin=0.5 * inch,
+                            topMargin=0.6 * inch, bottomMargin=0.6 * inch)
+    doc.build(story)
+    return pdf_path
+
+
+def export_report_pdf(weekly_df, monthly_df, store_tabs_week: dict, store_tabs_month: dict,
+                      pdf_path: Path, workers: int = 1, summaries: bool = True,
+                      trends: dict | None = None, hierarchy: tuple | None = None) -> Path | None:
+    """
+    Render the franchise report PDF directly from the frames write_excel receives,
+    including its trend ({store: trend frame}) and hierarchy ((weekly, monthly)
+    {level: frame}) sheets when given; those go with the summaries.
+    With workers > 1 stores are rendered in batches in a process pool and the
+    parts are merged in order with pypdf (see requirements.txt); without pypdf,
+    one serial pass. Returns the PDF path, or None if reportlab is not installed.
+    """
+    if not native_pdf_available():
+        print("reportlab not installed; skipping PDF export.")
+        return None
+    from .excel_report import _prep
+
+    weekly_ranked = _prep(weekly_df) if summaries else None
+    monthly_ranked = _prep(monthly_df) if summaries else None
+    trends = trend_tables(trends) if summaries and trends else None
+    hierarchy = hierarchy if summaries else None
+    stores = sorted(store_tabs_week)
+
+    merger = None
+    if workers > 1 and len(stores) > 1:
+        try:
+            from pypdf import PdfWriter
+            merger = PdfWriter()
+        except ImportError:
+            print("pypdf not installed (see requirements.txt); rendering PDF serially.")
+    if merger is None:
+        _render_part(pdf_path, weekly_ranked, monthly_ranked, store_tabs_week, store_tabs_month,
+                     hierarchy, trends)
+        print("PDF exported:", pdf_path)
+        return pdf_path
+
+    size = -(-len(stores) // workers)
+    batches = [stores[i:i + size] for i in range(0, len(stores), size)]
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs = [(Path(tmp) / "summary.pdf", weekly_ranked, monthly_ranked, {}, {}, hierarchy, trends)] \
+            if summaries else []
+        jobs += [(Path(tmp) / f"stores_{i:04d}.pdf", None, None,
+                  {s: store_tabs_week[s] for s in batch}, {s: store_tabs_month[s] for s in batch},
+                  None, None)
+                 for i, batch in enumerate(batches)]
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                parts = list(ex.map(_render_part, *zip(*jobs)))
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"Process pool unavailable ({e}); rendering PDF serially.")
+            parts = [_render_part(*job) for job in jobs]
+        for part in parts:
+            merger.append(str(part))
+        merger.write(str(pdf_path))
+    print("PDF exported:", pdf_path)
+    return pdf_path
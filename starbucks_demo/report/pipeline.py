@@ -0,0 +1,131 @@
+# report/pipeline.py
+"""
+Staged pipeline: items flow through a chain of functions, one thread per
+stage, with a bounded queue between neighbouring stages.
+
+With the report's load -> compute -> render chain, store N+1 is read while
+store N's KPIs are computed and store N-1's tab is written. A full queue
+blocks the stage feeding it (backpressure), so at most depth + 2 loaded
+frames exist at once (a full queue, the one being computed and the one
+waiting for a free slot), however many stores there are.
+Threads suffice for the overlap: CSV parsing (Arrow) and file writes release
+the GIL, and each stage is otherwise sequential.
+
+Results come back in input order. The first exception raised by any stage
+stops the pipeline and is re-raised in the caller.
+"""
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+class StagedPipeline:
+    """
+    stages: [(name, fn(key, value) -> value), ...]; the last runs on the caller's
+    thread. `lookahead` sizes the queue in front of the first stage (default
+    `depth`), i.e. how far the input iterable is consumed ahead -- useful when
+    it submits background work. After run(), `busy` holds seconds spent in
+    each stage and `peak_held` the most first-stage outputs (e.g. loaded
+    frames) alive at once.
+    """
+
+    def __init__(self, stages: list[tuple[str, object]], depth: int = 2, lookahead: int | None = None):
+        self.stages = stages
+        self.depth = max(1, depth)
+        self.lookahead = max(1, lookahead or depth)
+        self.busy = {name: 0.0 for name, _ in stages}
+        self.peak_held = 0
+        self._held = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._error: BaseException | None = None
+
+    def _hold(self, delta: int):
+        with self._lock:
+            self._held += delta
+            self.peak_held = max(self.peak_held, self._held)
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up once the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """Blocking get that returns _DONE once the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _call(self, i: int, key, value):
+        name, fn = self.stages[i]
+        t0 = time.perf_counter()
+        out = fn(key, value)
+        self.busy[name] += time.perf_counter() - t0
+        if i == 0:
+            self._hold(+1)
+        elif i == 1:
+            self._hold(-1)
+        return out
+
+    def _worker(self, i: int, inbox: queue.Queue, outbox: queue.Queue):
+        while True:
+            item = self._get(inbox)
+            if item is _DONE:
+                self._put(outbox, item)
+                return
+            key, value = item
+            try:
+                item = (key, self._call(i, key, value))
+            except BaseException as e:  # re-raised on the caller's thread
+                self._error = e
+                self._stop.set()
+                return
+            if not self._put(outbox, item):
+                return
+
+    def _feed(self, items, outbox: queue.Queue):
+        try:
+            for item in items:
+                if not self._put(outbox, item):
+                    return
+        except BaseException as e:
+            self._error = e
+            self._stop.set()
+            return
+        self._put(outbox, _DONE)
+
+    def run(self, items) -> list[tuple]:
+        """Push (key, value) pairs through every stage; returns [(key, result), ...] in order."""
+        queues = [queue.Queue(maxsize=self.lookahead)]
+        queues += [queue.Queue(maxsize=self.depth) for _ in self.stages[1:]]
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)]
+        threads += [threading.Thread(target=self._worker, args=(i, queues[i], queues[i + 1]), daemon=True)
+                    for i in range(len(self.stages) - 1)]
+        for t in threads:
+            t.start()
+
+        results, last = [], len(self.stages) - 1
+        try:
+            while True:
+                item = self._get(queues[last])
+                if item is _DONE:
+                    if self._error is not None:
+                        raise self._error
+                    break
+                key, value = item
+                results.append((key, self._call(last, key, value)))
+        finally:
+            self._stop.set()
+            for t in threads:
+                t.join()
+        return results
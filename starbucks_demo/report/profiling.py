@@ -0,0 +1,171 @@
+# report/profiling.py
+"""
+Per-stage instrumentation for a report run (--profile).
+
+Each stage records wall time, CPU time (this process, plus worker processes
+reaped during the stage), peak RSS and whatever counts the caller adds, e.g.
+
+    with profile.stage("load") as info:
+        stores = collect_store_frames(...)
+        info["rows"] = ...
+
+Peak RSS is per stage on Linux, where the kernel's high-water mark can be
+reset between stages; elsewhere it is the process high-water mark so far
+("peak_rss_scope": "process"). Stages named in `cprofile` also run under
+cProfile: their stats are dumped next to the run log, with the top
+functions by cumulative time copied into it.
+
+A disabled RunProfile (the default) hands out one shared no-op context, so
+instrumented code costs a method call per stage when --profile is off.
+"""
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from pathlib import Path
+
+_TOP_FUNCTIONS = 15
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark (Linux); False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float | None:
+    """RSS high-water mark in MB since the last reset (or process start); None if unknown."""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _children_cpu() -> float:
+    t = os.times()
+    return t.children_user + t.children_system
+
+
+class _NoStage:
+    """Shared context for a disabled profile; the yielded dict is thrown away."""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+class RunProfile:
+    """Stage timings, per-store/per-file load stats and optional cProfile dumps for one run."""
+
+    def __init__(self, enabled: bool = False, cprofile: tuple[str, ...] = ()):
+        self.enabled = enabled or bool(cprofile)
+        self.cprofile = set(cprofile)
+        self.stages: list[dict] = []
+        self.stores: list[dict] = []
+        self.files: list[dict] = []
+        self._profilers: dict[str, cProfile.Profile] = {}
+        self._started = time.time()
+
+    def stage(self, name: str):
+        """Context manager timing one stage; yields a dict for extra fields (rows, ...)."""
+        if not self.enabled:
+            return _NO_STAGE
+        return self._stage(name)
+
+    @contextlib.contextmanager
+    def _stage(self, name: str):
+        info: dict = {}
+        scope = "stage" if _reset_peak_rss() else "process"
+        profiler = cProfile.Profile() if name in self.cprofile else None
+        wall, cpu, children = time.perf_counter(), time.process_time(), _children_cpu()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield info
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._profilers[name] = profiler
+            record = {
+                "stage": name,
+                "wall_s": round(time.perf_counter() - wall, 4),
+                "cpu_s": round(time.process_time() - cpu, 4),
+                "worker_cpu_s": round(_children_cpu() - children, 4),
+            }
+            peak = peak_rss_mb()
+            if peak is not None:
+                record.update(peak_rss_mb=round(peak, 1), peak_rss_scope=scope)
+            self.stages.append({**record, **info})
+
+    def add_store_loads(self, stores: dict):
+        """Per-store and per-file load stats from the frames' attrs["load_times"]."""
+        if not self.enabled:
+            return
+        for store, df in stores.items():
+            times = df.attrs.get("load_times", [])
+            for path, wall, cpu, rows in times:
+                self.files.append({"store": store, "file": path, "wall_s": round(wall, 4),
+                                   "cpu_s": round(cpu, 4), "rows": rows})
+            self.stores.append({
+                "store": store,
+                "files": len(times),
+                "rows": len(df),
+                "rejects": len(df.attrs.get("rejects", [])),
+                "wall_s": round(sum(t[1] for t in times), 4),
+                "cpu_s": round(sum(t[2] for t in times), 4),
+            })
+
+    def _cprofile_stats(self, log_path: Path) -> dict:
+        out = {}
+        for name, profiler in self._profilers.items():
+            dump = log_path.with_name(f"{log_path.stem}.{name}.prof")
+            profiler.dump_stats(dump)
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(_TOP_FUNCTIONS)
+            out[name] = {"stats_file": str(dump), "top_cumulative": text.getvalue().strip().splitlines()}
+        return out
+
+    def write(self, log_path: Path, top: int = 10) -> dict:
+        """Write the run log as JSON (slowest stores/files first) and print a stage summary."""
+        by_wall = lambda r: -r["wall_s"]  # noqa: E731
+        log_path.parent.mkdir(parents=True, exist_ok=True)  # cProfile dumps go there too
+        log = {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started)),
+            "argv": sys.argv[1:],
+            "total_wall_s": round(sum(s["wall_s"] for s in self.stages), 4),
+            "stages": self.stages,
+            "slowest_stores": sorted(self.stores, key=by_wall)[:top],
+            "slowest_files": sorted(self.files, key=by_wall)[:top],
+            "stores": self.stores,
+            "cprofile": self._cprofile_stats(log_path),
+        }
+        log_path.write_text(json.dumps(log, indent=2, default=str) + "\n")
+
+        print(f"{'stage':<20} {'wall s':>8} {'cpu s':>8} {'peak MB':>8}")
+        for s in self.stages:
+            peak = f"{s['peak_rss_mb']:>8.1f}" if "peak_rss_mb" in s else f"{'-':>8}"
+            print(f"{s['stage']:<20} {s['wall_s']:>8.3f} {s['cpu_s'] + s['worker_cpu_s']:>8.3f} {peak}")
+        print(f"Run profile written to {log_path}")
+        return log
@@ -0,0 +1,232 @@
+# report/rollup.py
+"""
+Daily rollup: per-store tables built once per closed day so report KPIs are
+computed from (store, day, category, item) totals instead of line items.
+
+Each store keeps two tables, pickled under ROLLUP_DIR/<store>.pkl:
+
+  items    date (day), category, item, revenue         -- revenue summed per key
+  baskets  date (day), order_id, item, cats, units     -- line items counted per order,
+                                                          item and AOV category bit
+
+Order-level KPIs stay exact: the basket rows of a window's days feed the same
+order index (baskets.OrderIndex) as line items do, so Orders counts distinct
+order_ids across days (an order spanning two days is still counted once), and
+"% Orders w/ Food", "AOV by Category" orders, basket sizes and item pairs
+match a line-item run.
+
+Revenue is summed in whole micro-units (metrics.MICROS), per key and again
+per window, so revenue figures are the correctly rounded totals whatever the
+grouping. A line-item run adds floats in row order and can differ from them
+in the last floating-point digit; after the report's rounding to cents / 0.1%
+this only shows on exact half-way values, or as a different order among
+categories/items whose revenue ties exactly.
+
+A day is rolled up once it has closed (day < today). Each rolled-up day stores
+a fingerprint of its line items' content (row count and a sum of row hashes);
+when late rows or corrections change a closed day's fingerprint the day is
+rebuilt, and days no longer in the loaded data are dropped. A load limited to
+a date range (--source parquet) only drops days inside that range.
+"""
+import hashlib
+import pickle
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .config import ROLLUP_DIR
+from .baskets import OrderIndex
+from .metrics import (AOV_CATEGORIES, MICROS, _assemble_kpis, _bounds, _category_bits, _lowered,
+                      _micros, _window_rows, kpis_for_window)
+from .trends import TREND_DAYS, TREND_WINDOWS, trend_series
+
+# Bump when the table layout changes so old rollups are rebuilt
+ROLLUP_VERSION = 3
+
+ITEM_COLS = ["date", "category", "item", "revenue"]
+BASKET_COLS = ["date", "order_id", "item", "cats", "units"]
+_WANTED = [c.lower() for c in AOV_CATEGORIES]
+_EMPTY = pd.DataFrame({
+    "date": pd.Series(dtype="datetime64[ns]"), "order_id": pd.Series(dtype="int64"),
+    "item": pd.Series(dtype=object), "category": pd.Series(dtype=object),
+    "revenue": pd.Series(dtype="float64"),
+})
+
+
+def day_fingerprints(df: pd.DataFrame) -> dict:
+    """
+    {day: (rows, content hash)} for the line items of each calendar day; the
+    hash sums per-row hashes of the rolled-up columns (independent of row order).
+    """
+    if df.empty:
+        return {}
+    rows = pd.util.hash_pandas_object(df[["date", "order_id", "item", "category", "revenue"]], index=False)
+    g = rows.groupby(df["date"].dt.normalize().to_numpy()).agg(["size", "sum"])  # the sum wraps at 2**64
+    return {day: (int(n), int(h)) for day, (n, h) in zip(g.index, g.to_numpy())}
+
+
+def rollup_days(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(items, baskets) rollup tables for the line items in df."""
+    day = df["date"].dt.normalize()
+    items = (
+        df.assign(date=day, revenue=_micros(df["revenue"]))
+        .groupby(["date", "category", "item"], dropna=False, observed=True)["revenue"]
+        .sum()
+        .div(MICROS)
+        .reset_index()
+    )
+    baskets = (
+        pd.DataFrame({"date": day.to_numpy(), "order_id": df["order_id"].to_numpy(),
+                      "item": df["item"].to_numpy(dtype=object), "cats": _category_bits(df["category"])})
+        .groupby(["date", "order_id", "item", "cats"], dropna=False)
+        .size()
+        .rename("units")
+        .reset_index()
+    )
+    return items[ITEM_COLS], baskets[BASKET_COLS]
+
+
+def kpis_from_tables(tables: dict[str, tuple[pd.DataFrame, pd.DataFrame]], windows: dict[str, tuple]) -> dict:
+    """
+    metrics.kpis_for_windows from each store's (items, baskets) rollup tables
+    instead of its line items; the tables must cover every window's days and
+    windows must be day-aligned.
+    """
+    names = list(tables)
+    labels = list(windows)
+    out: dict = {s: {} for s in names}
+    if not names or not labels:
+        return out
+
+    n_groups = len(names) * len(labels)
+    items = _window_rows([tables[s][0] for s in names], windows, ITEM_COLS)
+    rows = _window_rows([tables[s][1] for s in names], windows, BASKET_COLS)
+    baskets = OrderIndex(rows["_g"].to_numpy(), rows["order_id"].to_numpy(),
+                         rows["item"].to_numpy(dtype=object), rows["cats"].to_numpy(),
+                         len(AOV_CATEGORIES), n_groups, units=rows["units"].to_numpy())
+    bounds = _bounds(items["_g"].to_numpy(), n_groups)
+
+    # Per-key totals back to the whole micro-units they were summed in
+    items["revenue"] = _micros(items["revenue"])
+    rev_by_g = np.bincount(items["_g"].to_numpy(), weights=items["revenue"].to_numpy(),
+                           minlength=n_groups)
+    cat_by_g = items.groupby(["_g", "category"], dropna=False, observed=True)["revenue"].sum() / MICROS
+    day_by_g = items.groupby(["_g", "date"])["revenue"].sum() / MICROS
+    item_by_g = items.groupby(["_g", "item"], dropna=False, observed=True)["revenue"].sum() / MICROS
+
+    items["_lc"] = _lowered(items["category"])
+    lc_revenue = items[items["_lc"].isin(_WANTED)].groupby(["_g", "_lc"])["revenue"].sum().to_dict()
+
+    def split(s: pd.Series, keys: pd.Index):
+        b = _bounds(s.index.get_level_values(0).to_numpy(), n_groups)
+        vals = s.to_numpy()
+        return lambda g: (keys[b[g]:b[g + 1]], vals[b[g]:b[g + 1]])
+
+    cat_part = split(cat_by_g, cat_by_g.index.get_level_values(1))
+    day_part = split(day_by_g, pd.Index(day_by_g.index.get_level_values(1).date))
+    item_part = split(item_by_g, item_by_g.index.get_level_values(1))
+
+    for si, store in enumerate(names):
+        for wi, label in enumerate(labels):
+            g = si * len(labels) + wi
+            if bounds[g] == bounds[g + 1]:
+                start, end = windows[label]
+                out[store][label] = kpis_for_window(_EMPTY, start, end)
+                continue
+            out[store][label] = _assemble_kpis(
+                revenue=float(rev_by_g[g]) / MICROS,
+                cat_sum=cat_part(g),
+                daily_sum=day_part(g),
+                items_sum=item_part(g),
+                baskets=baskets,
+                g=g,
+                cat_revenue=[float(lc_revenue.get((g, c), 0.0)) / MICROS for c in _WANTED],
+            )
+    return out
+
+
+class DailyRollup:
+    """Per-store daily rollup tables, updated incrementally for closed days."""
+
+    def __init__(self, rollup_dir: Path = ROLLUP_DIR, rebuild: bool = False):
+        self.rollup_dir = rollup_dir
+        self.rebuild = rebuild
+        self.stores: dict[str, dict] = {}
+        self.days_built = 0
+
+    def _path(self, store: str) -> Path:
+        return self.rollup_dir / f"{hashlib.sha1(store.encode()).hexdigest()[:16]}.pkl"
+
+    def _load(self, store: str) -> dict:
+        path = self._path(store)
+        if not self.rebuild and path.exists():
+            with open(path, "rb") as fh:
+                entry = pickle.load(fh)
+            if entry.get("version") == ROLLUP_VERSION and entry.get("store") == store:
+                return entry
+        items, baskets = rollup_days(_EMPTY)
+        return {"version": ROLLUP_VERSION, "store": store, "days": {}, "items": items, "baskets": baskets}
+
+    def update(self, stores: dict[str, pd.DataFrame], today: pd.Timestamp, since=None):
+        """
+        Roll up every closed day (before today) that is new or changed since the
+        last run. `since` is the first day the frames were loaded from when the
+        load was limited to a date range; rolled-up days before it are kept.
+        """
+        today = pd.Timestamp(today).normalize()
+        since = None if since is None else pd.Timestamp(since).normalize()
+        for store, df in stores.items():
+            entry = self._load(store)
+            closed = df[df["date"] < today]
+            prints = day_fingerprints(closed)
+            if since is not None:
+                prints = {**{d: fp for d, fp in entry["days"].items() if d < since}, **prints}
+            stale = {d for d, fp in prints.items() if entry["days"].get(d) != fp}
+            gone = set(entry["days"]) - set(prints)
+            if stale or gone:
+                drop = stale | gone
+                keep_items = entry["items"][~entry["items"]["date"].isin(drop)]
+                keep_baskets = entry["baskets"][~entry["baskets"]["date"].isin(drop)]
+                items, baskets = rollup_days(closed[closed["date"].dt.normalize().isin(stale)])
+                entry["items"] = pd.concat([keep_items, items], ignore_index=True) \
+                    .sort_values("date", kind="stable", ignore_index=True)
+                entry["baskets"] = pd.concat([keep_baskets, baskets], ignore_index=True) \
+                    .sort_values("date", kind="stable", ignore_index=True)
+                entry["days"] = prints
+                entry["dirty"] = True
+                self.days_built += len(stale)
+            entry["through"] = today
+            self.stores[store] = entry
+
+    def save(self):
+        """Write the rollups that changed in update()."""
+        self.rollup_dir.mkdir(parents=True, exist_ok=True)
+        for store, entry in self.stores.items():
+            if entry.pop("dirty", False):
+                with open(self._path(store), "wb") as fh:
+                    pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def kpis_for_windows(self, windows: dict[str, tuple]) -> dict:
+        """
+        Same contract as metrics.kpis_for_windows, read from the rollup of the
+        stores passed to update(). Windows must start and end on day boundaries
+        and end no later than the `today` given to update().
+        """
+        for label, (start, end) in windows.items():
+            start, end = pd.Timestamp(start), pd.Timestamp(end)
+            if start != start.normalize() or end != end.normalize():
+                raise ValueError(f"Window {label!r} is not day-aligned; use metrics.kpis_for_windows")
+            if any(end > e["through"] for e in self.stores.values()):
+                raise ValueError(f"Window {label!r} reaches past the last closed day of the rollup")
+        return kpis_from_tables({s: (e["items"], e["baskets"]) for s, e in self.stores.items()}, windows)
+
+    def trends(self, end, days: int = TREND_DAYS, lengths: dict[str, int] = TREND_WINDOWS) -> dict:
+        """
+        trends.trends_for_stores read from the rollup of the stores passed to
+        update(); `end` must be no later than the `today` given to update().
+        """
+        if any(pd.Timestamp(end) > e["through"] for e in self.stores.values()):
+            raise ValueError("Trend points reach past the last closed day of the rollup")
+        entries = list(self.stores.values())
+        frames = trend_series([e["items"] for e in entries], [e["baskets"] for e in entries],
+                              end, days, lengths)
+        return dict(zip(self.stores, frames))
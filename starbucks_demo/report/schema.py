@@ -0,0 +1,258 @@
+# report/schema.py
+"""
+Declared schema for the EOD CSV format (date, order_id, item, category, revenue).
+
+Files are read as text and each column is converted as declared here; with
+pyarrow installed both steps run in Arrow (multithreaded reader, vectorized
+strptime/casts), otherwise in pandas. Both apply the same rules, to values
+with surrounding whitespace stripped:
+
+  date      ISO 8601 without a zone (2025-09-15, 2025-09-15T10:11:12.5 or
+            with a space; at most 6 decimals) or US m/d/Y, datetime64
+  order_id  integer literal of at most 18 digits ("2000.0", "1e3" are
+            rejected); int32 when every id fits, else int64
+  item      categorical (defaults to "Unknown Item" if the column is absent)
+  category  categorical (defaults to "Unknown" if the column is absent)
+  revenue   finite decimal number, float64 (kept wide so totals match to the cent)
+
+NULL_VALUES are missing in every column, for both readers.
+
+Rows whose required fields are missing or do not parse are not dropped
+silently: they are returned as reject records (source, line, reason, row).
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["date", "order_id", "item", "category", "revenue"]
+REQUIRED = ["date", "order_id", "revenue"]
+DEFAULTS = {"category": "Unknown", "item": "Unknown Item"}
+CATEGORICAL = ["item", "category"]
+# Daily exports are ISO (2025-09-15), the weekly exports US style (9/15/2025)
+_ISO_RE = r"^\d{4}-\d{2}-\d{2}([T ]([01]\d|2[0-3]):[0-5]\d(:[0-5]\d(\.\d{1,6})?)?)?$"
+_US_RE = r"^\d{1,2}/\d{1,2}/\d{4}$"
+_US_FORMAT = "%m/%d/%Y"
+_INT_RE = r"^[+-]?\d{1,18}$"
+_FLOAT_RE = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+# pandas' default NA strings, given to the Arrow reader as well
+NULL_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+               "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+REJECT_COLUMNS = ["source", "line", "reason", "row"]
+CHUNK_ROWS = 100_000  # read_eod_chunks
+_ARROW_BLOCK = 1 << 18  # read_eod_chunks: bytes per Arrow read block
+
+_INT32 = np.iinfo(np.int32)
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pv
+    except ImportError:
+        return None
+    return pa, pc, pv
+
+
+def read_text(path, **kwargs) -> pd.DataFrame:
+    """The raw CSV with every column as text (NULL_VALUES as NA)."""
+    return pd.read_csv(path, dtype=str, na_values=NULL_VALUES, keep_default_na=False, **kwargs)
+
+
+def parse_dates(text: pd.Series) -> pd.Series:
+    """ISO or US dates (see the module docstring) as datetime64[us]; NaT otherwise."""
+    text = text.str.strip()
+    out = pd.Series(pd.NaT, index=text.index, dtype="datetime64[us]")
+    iso = text.str.match(_ISO_RE, na=False)
+    if iso.any():
+        out[iso] = pd.to_datetime(text[iso], format="ISO8601", errors="coerce").astype("datetime64[us]")
+    us = text.str.match(_US_RE, na=False)
+    if us.any():
+        out[us] = pd.to_datetime(text[us], format=_US_FORMAT, errors="coerce").astype("datetime64[us]")
+    return out
+
+
+def normalize_eod(raw: pd.DataFrame, source: str) -> tuple[pd.DataFrame, list[tuple]]:
+    """
+    Typed frame for one text-read EOD file (or chunk of it), plus reject
+    records for the rows that fail validation. Line numbers assume the
+    default RangeIndex of read_csv (chunks keep counting).
+    """
+    if not set(REQUIRED).issubset(raw.columns):
+        raise ValueError(f"{source} must include columns: {set(REQUIRED)}")
+
+    date = parse_dates(raw["date"])
+    ids_text = raw["order_id"].str.strip()
+    ids_ok = ids_text.str.match(_INT_RE, na=False)
+    rev_text = raw["revenue"].str.strip()
+    revenue = pd.to_numeric(rev_text.where(rev_text.str.match(_FLOAT_RE, na=False)),
+                            errors="coerce").astype("float64")
+
+    problems = {
+        "date": date.isna(),
+        "order_id": ~ids_ok,
+        "revenue": ~np.isfinite(revenue),
+    }
+    bad = problems["date"] | problems["order_id"] | problems["revenue"]
+
+    rejects = [
+        _reject(source, int(raw.index[pos]) + 2, raw.iloc[pos].to_dict(),
+                [c for c, mask in problems.items() if mask.iloc[pos]])
+        for pos in np.flatnonzero(bad.to_numpy())
+    ]
+
+    keep = ~bad.to_numpy()
+    typed = {"date": date[keep].to_numpy(), "order_id": ids_text[keep].to_numpy(dtype="int64"),
+             "revenue": revenue[keep].to_numpy()}
+    text = {c: raw[c][keep].to_numpy(dtype=object) for c in raw.columns if c not in typed}
+    return _assemble(list(raw.columns), typed, text), rejects
+
+
+def _reject(source: str, line: int, row: dict, failed: list[str]) -> tuple:
+    reason = "; ".join(f"{c} {'missing' if pd.isna(row[c]) else f'invalid {row[c]!r}'}" for c in failed)
+    return source, line, reason, ",".join("" if pd.isna(v) else str(v) for v in row.values())
+
+
+def _assemble(names: list[str], typed: dict, text: dict) -> pd.DataFrame:
+    """Typed frame in file column order (defaults appended); text columns become categoricals."""
+    ids = typed["order_id"]
+    fits = ids.size == 0 or (_INT32.min <= ids.min() and ids.max() <= _INT32.max)
+    typed = {**typed, "order_id": ids.astype("int32" if fits else "int64")}
+    n = len(ids)
+    columns = {}
+    for c in names:
+        if c in typed:
+            columns[c] = typed[c]
+        elif c in CATEGORICAL:
+            cat = text[c] if isinstance(text[c], pd.Categorical) else pd.Categorical(text[c])
+            columns[c] = cat if cat.categories.is_monotonic_increasing else \
+                cat.reorder_categories(sorted(cat.categories))
+        else:
+            columns[c] = pd.array(text[c], dtype="str")  # also when no rows are left
+    for c in CATEGORICAL:
+        if c not in columns:
+            columns[c] = pd.Categorical([DEFAULTS[c]] * n)
+    return pd.DataFrame(columns)
+
+
+def _arrow_convert(arrow):
+    pa, pc, pv = arrow
+    return pv.ConvertOptions(column_types={c: pa.string() for c in COLUMNS},
+                             null_values=NULL_VALUES, strings_can_be_null=True)
+
+
+def _read_eod_arrow(path, arrow) -> tuple[pd.DataFrame, list[tuple]]:
+    """read_eod_csv with the Arrow CSV reader and compute kernels."""
+    pa, pc, pv = arrow
+    return _normalize_arrow(pv.read_csv(path, convert_options=_arrow_convert(arrow)), str(path), 0, arrow)
+
+
+def _normalize_arrow(table, source: str, first_row: int, arrow) -> tuple[pd.DataFrame, list[tuple]]:
+    """normalize_eod for an Arrow table of text columns; its rows start at data row first_row."""
+    pa, pc, pv = arrow
+    names = table.column_names
+    if not set(REQUIRED).issubset(names):
+        raise ValueError(f"{source} must include columns: {set(REQUIRED)}")
+
+    date_text = pc.utf8_trim_whitespace(table["date"])
+    # The ISO cast raises on a day that does not exist (strptime rolls it over),
+    # so the day must format back to itself first
+    day = pc.utf8_slice_codeunits(date_text, 0, 10)
+    parsed = pc.strptime(day, format="%Y-%m-%d", unit="us", error_is_null=True)
+    iso = pc.and_(pc.match_substring_regex(date_text, _ISO_RE),
+                  pc.equal(pc.strftime(parsed, format="%Y-%m-%d"), day))
+    # Same for US dates, against the text with month and day zero-padded
+    us_text = pc.if_else(pc.match_substring_regex(date_text, _US_RE), date_text, None)
+    us_parsed = pc.strptime(us_text, format=_US_FORMAT, unit="us", error_is_null=True)
+    padded = pc.replace_substring_regex(pc.replace_substring_regex(us_text, r"^(\d)/", r"0\1/"),
+                                        r"/(\d)/", r"/0\1/")
+    us = pc.fill_null(pc.equal(pc.strftime(us_parsed, format=_US_FORMAT), padded), False)
+    date = pc.coalesce(pc.cast(pc.if_else(iso, date_text, None), pa.timestamp("us")),
+                       pc.if_else(us, us_parsed, None))
+    ids_text = pc.utf8_trim_whitespace(table["order_id"])
+    ids = pc.cast(pc.utf8_ltrim(pc.if_else(pc.match_substring_regex(ids_text, _INT_RE), ids_text, None),
+                                characters="+"), pa.int64())  # the cast rejects a "+" sign
+    rev_text = pc.utf8_trim_whitespace(table["revenue"])
+    revenue = pc.cast(pc.if_else(pc.match_substring_regex(rev_text, _FLOAT_RE), rev_text, None),
+                      pa.float64())
+
+    problems = {"date": pc.is_null(date), "order_id": pc.is_null(ids),
+                "revenue": pc.invert(pc.fill_null(pc.is_finite(revenue), False))}
+    bad = pc.or_(pc.or_(problems["date"], problems["order_id"]), problems["revenue"])
+    rejects = []
+    if pc.any(bad).as_py():
+        flags = {c: m.to_numpy(zero_copy_only=False) for c, m in problems.items()}
+        for pos in np.flatnonzero(bad.to_numpy(zero_copy_only=False)):
+            row = {c: v for c, v in zip(names, table.slice(pos, 1).to_pylist()[0].values())}
+            row = {c: (np.nan if v is None else v) for c, v in row.items()}
+            rejects.append(_reject(source, first_row + int(pos) + 2, row, [c for c in flags if flags[c][pos]]))
+
+    keep = pc.invert(bad)
+    typed = {"date": pc.filter(date, keep).to_numpy(zero_copy_only=False).astype("datetime64[us]"),
+             "order_id": pc.filter(ids, keep).to_numpy(zero_copy_only=False),
+             "revenue": pc.filter(revenue, keep).to_numpy(zero_copy_only=False)}
+    text = {c: (pc.filter(table[c], keep).combine_chunks().dictionary_encode().to_pandas().array
+                if c in CATEGORICAL else pc.filter(table[c], keep).to_pandas().to_numpy())
+            for c in names if c not in typed}
+    return _assemble(names, typed, text), rejects
+
+
+def read_eod_csv(path) -> tuple[pd.DataFrame, list[tuple]]:
+    """Read and validate one EOD CSV; returns (typed frame, reject records)."""
+    arrow = _pyarrow()
+    if arrow is not None:
+        return _read_eod_arrow(path, arrow)
+    return normalize_eod(read_text(path), str(path))
+
+
+def read_eod_chunks(path, rows: int = CHUNK_ROWS):
+    """
+    read_eod_csv in pieces of about `rows` rows, yielding (typed frame, reject
+    records) per piece; only one piece is in memory at a time. Reject line
+    numbers count from the top of the file.
+    """
+    arrow = _pyarrow()
+    if arrow is None:
+        with read_text(path, chunksize=rows) as reader:
+            for raw in reader:
+                yield normalize_eod(raw, str(path))
+        return
+    pa, pc, pv = arrow
+    # Small read blocks (the reader buffers several ahead), regrouped into pieces
+    reader = pv.open_csv(path, read_options=pv.ReadOptions(block_size=_ARROW_BLOCK),
+                         convert_options=_arrow_convert(arrow))
+    first_row, batches = 0, []
+    for batch in reader:
+        batches.append(batch)
+        if sum(b.num_rows for b in batches) >= rows:
+            table = pa.Table.from_batches(batches)
+            yield _normalize_arrow(table, str(path), first_row, arrow)
+            first_row, batches = first_row + table.num_rows, []
+    if batches or not first_row:
+        yield _normalize_arrow(pa.Table.from_batches(batches, schema=reader.schema), str(path), first_row, arrow)
+
+
+def shared_categories(frames: list[pd.DataFrame], columns: list[str] = CATEGORICAL) -> list[pd.DataFrame]:
+    """
+    Recode the categorical (or text) `columns` of every frame to one sorted
+    dictionary, so concatenating them stays categorical and groupby order
+    matches plain strings.
+    """
+    for c in columns:
+        values = set()
+        for f in frames:
+            if isinstance(f[c].dtype, pd.CategoricalDtype):
+                values.update(f[c].cat.categories)
+            else:
+                values.update(f[c].dropna().unique())
+        dtype = pd.CategoricalDtype(sorted(values))
+        frames = [f.assign(**{c: f[c].astype(dtype)}) for f in frames]
+    return frames
+
+
+def concat_eod(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """pd.concat for typed EOD frames that keeps item/category categorical."""
+    return pd.concat(shared_categories(frames), ignore_index=True)
+
+
+def rejects_frame(records: list[tuple]) -> pd.DataFrame:
+    return pd.DataFrame(records, columns=REJECT_COLUMNS)
@@ -0,0 +1,257 @@
+# report/service.py
+"""
+Local KPI query service: store frames stay loaded and any store's KPIs for
+any date range are answered over HTTP/JSON, without building a workbook.
+
+  GET /kpis?store=Store101&start=2026-09-01&end=2026-09-30
+      kpis_for_window for that store, days start..end inclusive
+      (store=101 works too)
+  GET /stores
+      loaded stores with their rows and first/last dates, plus cache stats
+
+Frames come from collect_store_frames at startup. After that DATA_DIR is
+polled as --watch does (watch.scan), and only changed stores are reloaded.
+
+Concurrency: requests run on their own threads (ThreadingHTTPServer) and
+never wait for a reload. A reload builds the new frames off to the side,
+then swaps in a new {store: (version, frame)} mapping with one assignment.
+Each request works on whichever mapping it picked up. Results are cached per
+(store, version, start, end) as encoded JSON in a bounded LRU. A store's
+entries are dropped when it reloads, and a result computed from the old
+frame while the swap happened can never match the new version.
+
+Binds to 127.0.0.1 by default; nothing leaves the machine.
+"""
+import datetime as dt
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+from .config import DATA_DIR
+from .io_load import _load_store, collect_store_frames, discover_store_files, pretty_store_name_from_path
+from .metrics import kpis_for_window
+from .sharding import store_number
+from .watch import changed_stores, scan
+
+LRU_ENTRIES = 256
+
+
+def _jsonable(v):
+    """kpis_for_window values -> JSON types (frames as lists of records)."""
+    if isinstance(v, dict):
+        return {str(k): _jsonable(x) for k, x in v.items()}
+    if isinstance(v, pd.DataFrame):
+        return [{c: _jsonable(x) for c, x in zip(v.columns, row)} for row in v.itertuples(index=False)]
+    if isinstance(v, np.generic):
+        v = v.item()
+    if v is None or v is pd.NaT:
+        return None
+    if isinstance(v, float):
+        return None if math.isnan(v) else v
+    if isinstance(v, (dt.date, pd.Timestamp)):
+        return v.isoformat()
+    if isinstance(v, (str, int, bool)):
+        return v
+    return None if pd.isna(v) else str(v)
+
+
+class LruCache:
+    """Thread-safe bounded mapping; the least recently used entry goes first."""
+
+    def __init__(self, max_entries: int = LRU_ENTRIES):
+        self.max_entries = max_entries
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def drop(self, stores: set[str]):
+        """Forget every entry of these stores (keys start with the store)."""
+        with self._lock:
+            for key in [k for k in self._items if k[0] in stores]:
+                del self._items[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._items), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class KpiService:
+    """Resident store frames, reloaded per changed store, with cached window KPIs."""
+
+    def __init__(self, cache=None, workers: int = 1, data_dir: Path = DATA_DIR,
+                 max_entries: int = LRU_ENTRIES):
+        self.cache = cache
+        self.workers = workers
+        self.data_dir = data_dir
+        self.results = LruCache(max_entries)
+        self.frames: dict[str, tuple[int, pd.DataFrame]] = {}
+        self.snapshot: dict[Path, tuple[int, int]] = {}
+        self._version = 0
+        self._reload_lock = threading.Lock()
+
+    def load(self):
+        """Initial load of every store."""
+        self.snapshot = scan(self.data_dir)
+        stores = collect_store_frames(cache=self.cache, workers=self.workers,
+                                      by_store=discover_store_files(self.data_dir))
+        if self.cache is not None:
+            self.cache.save()
+        self._version += 1
+        self.frames = {s: (self._version, df) for s, df in stores.items()}
+
+    def reload(self) -> set[str]:
+        """Reload the stores whose CSVs changed since the last scan; returns them."""
+        with self._reload_lock:
+            snap = scan(self.data_dir)
+            todo = changed_stores(self.snapshot, snap, self.data_dir)
+            if not todo:
+                return set()
+            by_store: dict[str, list[Path]] = {}
+            for csv in snap:
+                by_store.setdefault(pretty_store_name_from_path(csv, self.data_dir), []).append(csv)
+
+            frames = dict(self.frames)
+            self._version += 1
+            for store in sorted(todo):
+                if store not in by_store:
+                    frames.pop(store, None)
+                    continue
+                try:
+                    frames[store] = (self._version, _load_store(by_store[store], self.cache)[0])
+                except (OSError, ValueError, pd.errors.ParserError) as e:
+                    print(f"{store}: could not load ({e}); keeping the previous data.")
+                    todo.discard(store)
+            if self.cache is not None:
+                self.cache.save()
+            self.snapshot = snap
+            self.frames = frames  # readers switch over here
+            self.results.drop(todo)
+            return todo
+
+    def kpis_json(self, store: str, start: dt.date, end: dt.date) -> tuple[bytes, bool]:
+        """(encoded KPIs for days start..end inclusive, served from cache?); KeyError if unknown."""
+        frames = self.frames
+        if store not in frames and store_number(store) is not None:
+            store = f"Store{store_number(store)}"  # "101", "store101"
+        version, df = frames[store]
+        key = (store, version, start, end)
+        body = self.results.get(key)
+        if body is not None:
+            return body, True
+        k = kpis_for_window(df, pd.Timestamp(start), pd.Timestamp(end) + pd.Timedelta(days=1))
+        body = json.dumps({"store": store, "start": start.isoformat(), "end": end.isoformat(),
+                           "kpis": _jsonable(k)}).encode()
+        self.results.put(key, body)
+        return body, False
+
+    def stores_json(self) -> bytes:
+        stores = {}
+        for s, (_, df) in sorted(self.frames.items()):
+            first = df["date"].min() if len(df) else None
+            last = df["date"].max() if len(df) else None
+            stores[s] = {"rows": len(df), "first": _jsonable(first), "last": _jsonable(last)}
+        return json.dumps({"stores": stores, "cache": self.results.stats()}).encode()
+
+    def poll(self, interval: float, stop: threading.Event):
+        while not stop.wait(interval):
+            started = time.perf_counter()
+            reloaded = self.reload()
+            if reloaded:
+                print(f"Reloaded {', '.join(sorted(reloaded))} in {time.perf_counter() - started:.2f}s.")
+
+
+def _parse_day(value: str | None, name: str) -> dt.date:
+    if not value:
+        raise ValueError(f"missing {name}")
+    try:
+        return dt.date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be YYYY-MM-DD, got {value!r}") from None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: KpiService  # set by serve()
+
+    def _send(self, status: int, body: bytes, cached: bool | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if cached is not None:
+            self.send_header("X-Cache", "hit" if cached else "miss")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        self._send(status, json.dumps({"error": message}).encode())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/stores":
+            return self._send(200, self.service.stores_json())
+        if url.path != "/kpis":
+            return self._error(404, "use /kpis?store=&start=&end= or /stores")
+        try:
+            start = _parse_day(query.get("start"), "start")
+            end = _parse_day(query.get("end"), "end")
+        except ValueError as e:
+            return self._error(400, str(e))
+        if end < start:
+            return self._error(400, "end is before start")
+        store = query.get("store", "")
+        try:
+            body, cached = self.service.kpis_json(store, start, end)
+        except KeyError:
+            return self._error(404, f"unknown store {store!r}")
+        self._send(200, body, cached)
+
+    def log_message(self, format, *args):
+        pass  # one line per reload is enough on the console
+
+
+def make_server(service: KpiService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """An HTTP server answering from `service` (port 0 picks a free port)."""
+    handler = type("KpiHandler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(service: KpiService, host: str = "127.0.0.1", port: int = 8765, poll: float = 1.0):
+    """Load, then answer requests (and reload changed stores) until interrupted."""
+    started = time.perf_counter()
+    service.load()
+    server = make_server(service, host, port)
+    stop = threading.Event()
+    poller = threading.Thread(target=service.poll, args=(poll, stop), daemon=True)
+    poller.start()
+    print(f"Loaded {len(service.frames)} store(s) in {time.perf_counter() - started:.1f}s; "
+          f"serving http://{host}:{server.server_address[1]}/kpis?store=&start=&end=")
+    try:
+        server.serve_forever()
+    finally:
+        stop.set()
+        server.server_close()
@@ -0,0 +1,129 @@
+# report/sharding.py
+"""
+Sharded report output: per-store tabs split across several workbooks
+(by region, store-ID range, or N stores each), written concurrently, plus an
+index workbook with the summary sheets and the list of shard files.
+"""
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+import pandas as pd
+from .config import OUTDIR
+from .excel_report import report_stem, write_excel
+
+
+def store_number(store: str) -> int | None:
+    m = re.search(r"store\s*[_-]?(\d+)", store, re.IGNORECASE) or re.fullmatch(r"\s*(\d+)\s*", store)
+    return int(m.group(1)) if m else None
+
+
+def store_names(path: Path, stores: pd.Series) -> list[str]:
+    """
+    Report store names (StoreNNN, else the stripped text) for the `store`
+    column of a mapping CSV; a blank store raises, naming the file and line.
+    """
+    names = []
+    for i, store in enumerate(stores):
+        if pd.isna(store) or not store.strip():
+            raise ValueError(f"{path} line {i + 2}: store is empty")
+        n = store_number(store)
+        names.append(f"Store{n}" if n is not None else store.strip())
+    return names
+
+
+def load_region_map(path: Path) -> dict[str, str]:
+    """
+    CSV with `store` and `region` columns -> {StoreNNN: region}; stores with
+    a blank region are left out (unassigned).
+    """
+    df = pd.read_csv(path, dtype=str)
+    if not {"store", "region"}.issubset(df.columns):
+        raise ValueError(f"{path} must include columns: store, region")
+    return {store: region.strip() for store, region in zip(store_names(path, df["store"]), df["region"])
+            if isinstance(region, str) and region.strip()}
+
+
+def shard_stores(stores: list[str], by: str = "size", size: int = 50,
+                 regions: dict[str, str] | None = None) -> dict[str, list[str]]:
+    """
+    Group store names into shards: {shard label: sorted stores}.
+    by="size":   consecutive runs of `size` stores (in sorted order)
+    by="range":  store-ID buckets of width `size` (Store100-149, ...)
+    by="region": `regions` mapping; unmapped stores go to "Unassigned"
+    """
+    if by in ("size", "range") and size < 1:
+        raise ValueError(f"Shard size must be a positive integer, got {size}")
+    stores = sorted(stores)
+    shards: dict[str, list[str]] = {}
+    if by == "size":
+        for i in range(0, len(stores), size):
+            shards[f"part{i // size + 1:03d}"] = stores[i:i + size]
+    elif by == "range":
+        for s in stores:
+            n = store_number(s)
+            label = f"Store{n // size * size}-{n // size * size + size - 1}" if n is not None else "Other"
+            shards.setdefault(label, []).append(s)
+    elif by == "region":
+        regions = regions or {}
+        for s in stores:
+            shards.setdefault(regions.get(s, "Unassigned"), []).append(s)
+    else:
+        raise ValueError(f"Unknown shard mode: {by}")
+    return shards
+
+
+def _file_label(label: str) -> str:
+    return re.sub(r"[^\w\-]+", "_", label).strip("_") or "shard"
+
+
+def _write_shard(path: Path, weekly_df, monthly_df, tabs_week, tabs_month, constant_memory):
+    return write_excel(weekly_df, monthly_df, tabs_week, tabs_month,
+                       constant_memory=constant_memory, out_path=path, summaries=False)
+
+
+def write_sharded_excel(weekly_df: pd.DataFrame, monthly_df: pd.DataFrame,
+                        store_tabs_week: dict, store_tabs_month: dict,
+                        shards: dict[str, list[str]], workers: int = 1,
+                        constant_memory: bool = False, out_dir: Path = OUTDIR,
+                        trends: dict[str, pd.DataFrame] | None = None,
+                        hierarchy: tuple[dict, dict] | None = None) -> tuple[Path, list[Path]]:
+    """
+    Write one workbook per shard (in a process pool when workers > 1, serially
+    otherwise or if the pool cannot start) into out_dir/<report stem>/, then
+    index.xlsx with both summaries, the hierarchy and trend sheets (if
+    `hierarchy` / `trends`) and a "Shards" sheet.
+    Returns (index path, shard paths).
+    """
+    folder = out_dir / report_stem(weekly_df)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    jobs, used = [], set()
+    for label, stores in shards.items():
+        name = _file_label(label)
+        while name.lower() in used:  # e.g. "North East" vs "North/East"
+            name += "_"
+        used.add(name.lower())
+        path = folder / f"{name}.xlsx"
+        jobs.append((path, weekly_df.iloc[:0], monthly_df.iloc[:0],
+                     {s: store_tabs_week[s] for s in stores},
+                     {s: store_tabs_month[s] for s in stores}, constant_memory))
+
+    paths = None
+    if workers > 1 and len(jobs) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                paths = list(ex.map(_write_shard, *zip(*jobs)))
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"Process pool unavailable ({e}); writing shards serially.")
+    if paths is None:
+        paths = [_write_shard(*job) for job in jobs]
+
+    listing = pd.DataFrame(
+        [(label, p.name, len(stores), stores[0] if stores else "", stores[-1] if stores else "")
+         for (label, stores), p in zip(shards.items(), paths)],
+        columns=["Shard", "File", "Stores", "First Store", "Last Store"],
+    )
+    index = write_excel(weekly_df, monthly_df, {}, {}, out_path=folder / "index.xlsx", shards=listing,
+                        trends=trends, hierarchy=hierarchy)
+    return index, paths
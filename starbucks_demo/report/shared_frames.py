@@ -0,0 +1,166 @@
+# report/shared_frames.py
+"""
+Store frames in shared memory, so process-pool workers read them without
+pickling.
+
+SharedFrames packs {store: frame} into one shared-memory segment, column by
+column with the stores back to back:
+
+  numeric / datetime columns   the raw values
+  item, category, text         dictionary-encoded: integer codes in the
+                               segment, one sorted dictionary per column
+                               (schema.shared_categories) in the handle
+
+The handle (segment name, column layout, dictionaries, each store's row
+range) is small and picklable. A worker calls attach_frames(handle, stores)
+and gets those stores' frames as zero-copy views of the segment: a store is
+a row slice of each column, and string columns come back categorical over
+the shared dictionary, as the loader produces them.
+
+Lifecycle: only the creating process owns the segment. It unlinks it when
+the `with` block ends, however the block ends (a worker that crashes breaks
+the pool, but it cannot leak the segment). If the creator itself dies, the
+multiprocessing resource tracker unlinks the segment. Workers only attach,
+and keep their mapping until they exit.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from .schema import COLUMNS, shared_categories
+
+_ALIGN = 64
+_attached: dict[str, shared_memory.SharedMemory] = {}  # per worker process
+
+
+def _numeric(dtype) -> bool:
+    return isinstance(dtype, np.dtype) and dtype.kind in "biufmM"
+
+
+def _shares_dictionary(dtypes: list) -> bool:
+    """Numeric everywhere, or categorical with one dictionary (no recoding needed)."""
+    if all(_numeric(d) for d in dtypes):
+        return True
+    first = dtypes[0]
+    return isinstance(first, pd.CategoricalDtype) and all(
+        isinstance(d, pd.CategoricalDtype) and d.categories.equals(first.categories) for d in dtypes)
+
+
+def _encode(col: pd.Series) -> tuple[np.ndarray, pd.Index | None]:
+    """(values to store, dictionary or None) for one column of the packed frame."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(), col.cat.categories
+    if _numeric(col.dtype):
+        return col.to_numpy(), None
+    raise TypeError(f"column {col.name!r} ({col.dtype}) cannot be placed in shared memory")
+
+
+class SharedFrames:
+    """
+    {store: frame} copied once into a shared-memory segment; use as a context
+    manager. `handle` is what workers need to attach.
+    """
+
+    def __init__(self, stores: dict[str, pd.DataFrame]):
+        names = list(stores)
+        # Shallow views without attrs (rejects, load_times), which pandas would
+        # otherwise deep-copy on every column access
+        frames = [pd.DataFrame(stores[s], copy=False) for s in names]
+        # One column order for all (files may reorder or lack columns; a
+        # column a store lacks is missing there)
+        extra = set().union(*[f.columns for f in frames]) - set(COLUMNS)
+        columns = [c for c in COLUMNS if any(c in f.columns for f in frames)] + sorted(extra)
+        frames = [f if list(f.columns) == columns else f.reindex(columns=columns) for f in frames]
+        recode = [c for c in columns if not _shares_dictionary([f[c].dtype for f in frames])]
+        frames = shared_categories(frames, recode) if recode else frames
+        rows = np.cumsum([0] + [len(f) for f in frames])
+
+        encoded, layout, offset = [], [], 0
+        for c in columns:
+            parts = [_encode(f[c]) for f in frames]
+            dtype = np.result_type(*[v.dtype for v, _ in parts])
+            layout.append((c, offset, dtype.str, parts[0][1]))
+            encoded.append((offset, dtype, [v for v, _ in parts]))
+            offset += -(-int(rows[-1]) * dtype.itemsize // _ALIGN) * _ALIGN
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for start, dtype, values in encoded:
+            column = np.ndarray((int(rows[-1]),), dtype, self.shm.buf, start)
+            for i, v in enumerate(values):
+                column[rows[i]:rows[i + 1]] = v
+            del column
+        self.handle = {"name": self.shm.name, "rows": int(rows[-1]), "columns": layout,
+                       "stores": {s: (int(rows[i]), int(rows[i + 1])) for i, s in enumerate(names)}}
+
+    def close(self):
+        """Unmap and unlink the segment (idempotent)."""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _segment(name: str) -> shared_memory.SharedMemory:
+    # Attach once per worker. Pool workers share their creator's resource
+    # tracker, so registering the segment again here does not get it unlinked
+    # when the worker exits.
+    if name not in _attached:
+        _attached[name] = shared_memory.SharedMemory(name=name)
+    return _attached[name]
+
+
+def attach_frames(handle: dict, stores: list[str] | None = None) -> dict[str, pd.DataFrame]:
+    """{store: frame} viewing the shared segment, for `stores` (default all)."""
+    shm = _segment(handle["name"])
+    n = handle["rows"]
+    columns = {}
+    for c, offset, values_dtype, dictionary in handle["columns"]:
+        values = np.ndarray((n,), np.dtype(values_dtype), shm.buf, offset)
+        values.flags.writeable = False
+        dtype = pd.CategoricalDtype(dictionary) if dictionary is not None else None
+        columns[c] = (values, dtype)
+
+    out = {}
+    for store in stores if stores is not None else handle["stores"]:
+        lo, hi = handle["stores"][store]
+        data = {}
+        for c, (values, dtype) in columns.items():
+            data[c] = values[lo:hi] if dtype is None else \
+                pd.Categorical.from_codes(values[lo:hi], dtype=dtype, validate=False)
+        out[store] = pd.DataFrame(data, copy=False)
+    return out
+
+
+def _run_slice(fn, handle: dict, stores: list[str], args: tuple) -> dict:
+    return fn(attach_frames(handle, stores), *args)
+
+
+def map_stores(fn, stores: dict[str, pd.DataFrame], workers: int, *args) -> dict:
+    """
+    fn(stores, *args) -> {store: result}, with the stores split across a
+    process pool of `workers` that reads them from shared memory (fn must be
+    importable, e.g. metrics.kpis_for_windows). workers <= 1, a single store,
+    or a pool that cannot start or breaks, runs fn once in this process.
+    """
+    if workers <= 1 or len(stores) <= 1:
+        return fn(stores, *args)
+    names = list(stores)
+    size = -(-len(names) // (workers * 4))
+    slices = [names[i:i + size] for i in range(0, len(names), size)]
+    try:
+        with SharedFrames(stores) as shared, ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = [ex.submit(_run_slice, fn, shared.handle, part, args) for part in slices]
+            out = {}
+            for f in futures:
+                out.update(f.result())
+            return {s: out[s] for s in names}
+    except (OSError, NotImplementedError, BrokenProcessPool) as e:
+        print(f"Process pool unavailable ({e}); computing in this process.")
+    return fn(stores, *args)
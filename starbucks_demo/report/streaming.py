@@ -0,0 +1,159 @@
+# report/streaming.py
+"""
+Out-of-core KPIs: CSV chunks stream through per-store accumulators and the
+raw line items are never held, so memory depends on the report's span
+(windows plus trend days) and on one chunk, not on how much history the
+files hold.
+
+An accumulator is the daily rollup (rollup.py) of the rows seen so far that
+fall in the span [start, end):
+
+  items    date (day), category, item -> revenue    per-day, -category and -item totals
+  baskets  date (day), order_id, item, cats -> units  exact distinct orders, baskets, pairs
+
+Added chunks are batched until they hold about a chunk's worth of rows in
+the span, then rolled up together and appended (many small files, such as
+one CSV per day, are not rolled up one by one); merging two accumulators
+concatenates their tables. Once the appended rows pass a threshold the tables
+are compacted by summing rows with equal keys, so chunks (and files) can be
+reduced independently and merged in any order. Revenue is summed in whole
+micro-units (metrics.MICROS), so partial sums add up exactly. Orders stay
+exact too: an order spread over several chunks, files or days is still one
+distinct order_id in the order index built at the end.
+
+KPIs come from rollup.kpis_from_tables, the same path as a rollup run, so
+they equal a rollup run's and differ from kpis_for_window's only as a rollup
+run's revenue figures do.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+import pandas as pd
+from .metrics import MICROS, _micros
+from .rollup import _EMPTY, BASKET_COLS, ITEM_COLS, kpis_from_tables, rollup_days
+from .schema import CHUNK_ROWS, read_eod_chunks
+from .trends import TREND_WINDOWS, trend_series
+
+# Compact once appended rows exceed this (and twice the compacted size)
+COMPACT_ROWS = 1_000_000
+
+
+class WindowAccumulator:
+    """Mergeable rollup tables of the line items whose day is in [start, end)."""
+
+    def __init__(self, start, end, batch_rows: int = CHUNK_ROWS):
+        self.start = pd.Timestamp(start).normalize()
+        self.end = pd.Timestamp(end).normalize()
+        self.batch_rows = batch_rows
+        self._batch: list[pd.DataFrame] = []  # line items in the span, not rolled up yet
+        self._batched = 0
+        self._items: list[pd.DataFrame] = []
+        self._baskets: list[pd.DataFrame] = []
+        self._compacted = 0
+        self.rows_seen = 0
+
+    def _pending(self) -> int:
+        return sum(len(t) for t in self._baskets)
+
+    def add(self, chunk: pd.DataFrame):
+        """Fold in a chunk of typed line items (rows outside the span are skipped)."""
+        self.rows_seen += len(chunk)
+        chunk = chunk[(chunk["date"] >= self.start) & (chunk["date"] < self.end)]
+        if chunk.empty:
+            return
+        self._batch.append(chunk)
+        self._batched += len(chunk)
+        if self._batched >= self.batch_rows:
+            self._roll_up()
+
+    def _roll_up(self):
+        """Roll up the batched line items and append their tables."""
+        if not self._batch:
+            return
+        batch = self._batch[0] if len(self._batch) == 1 else pd.concat(self._batch, ignore_index=True)
+        self._batch, self._batched = [], 0
+        items, baskets = rollup_days(batch)
+        self._items.append(items)
+        self._baskets.append(baskets)
+        self._maybe_compact()
+
+    def merge(self, other: "WindowAccumulator"):
+        """Fold in another accumulator over the same span."""
+        if (other.start, other.end) != (self.start, self.end):
+            raise ValueError("accumulators cover different spans")
+        self.rows_seen += other.rows_seen
+        other._roll_up()
+        self._items += other._items
+        self._baskets += other._baskets
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._pending() > max(COMPACT_ROWS, 2 * self._compacted):
+            self.compact()
+
+    def compact(self):
+        """Sum rows with equal keys so each table holds one row per key."""
+        items, baskets = self.tables()
+        self._items, self._baskets = [items], [baskets]
+        self._compacted = len(baskets)
+
+    def tables(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """(items, baskets), one row per key, in date order."""
+        self._roll_up()
+        if not self._items:
+            return rollup_days(_EMPTY)
+        if len(self._items) == 1:  # a single rollup (or compaction) has unique keys already
+            return self._items[0], self._baskets[0]
+        items = pd.concat(self._items, ignore_index=True)
+        items = (items.assign(revenue=_micros(items["revenue"]))
+                 .groupby(ITEM_COLS[:-1], dropna=False, observed=True)["revenue"].sum()
+                 .div(MICROS).reset_index())
+        baskets = (pd.concat(self._baskets, ignore_index=True)
+                   .groupby(BASKET_COLS[:-1], dropna=False)["units"].sum().reset_index())
+        return items[ITEM_COLS], baskets[BASKET_COLS]
+
+
+def stream_store(files: list[Path], start, end, rows: int = CHUNK_ROWS) -> tuple[WindowAccumulator, list]:
+    """One store's accumulator over all its files, and reject records."""
+    acc, rejects = WindowAccumulator(start, end, rows), []
+    for f in files:
+        for chunk, bad in read_eod_chunks(f, rows):
+            acc.add(chunk)
+            rejects += bad
+    return acc, rejects
+
+
+def stream_kpis(by_store: dict[str, list[Path]], windows: dict[str, tuple], today,
+                trend_days: int = 0, rows: int = CHUNK_ROWS, workers: int = 1) -> tuple[dict, dict]:
+    """
+    ({store: {label: kpis}}, {store: reject records}) without loading whole
+    stores; with trend_days each store's kpis also carry "trend" (as
+    trends.trends_for_stores). Windows must be day-aligned. With workers > 1
+    stores stream in a process pool (serially if it cannot start).
+    """
+    today = pd.Timestamp(today).normalize()
+    start = min(pd.Timestamp(s) for s, _ in windows.values())
+    if trend_days:
+        start = min(start, today - pd.Timedelta(days=trend_days + max(TREND_WINDOWS.values())))
+    end = max(pd.Timestamp(e) for _, e in windows.values())
+
+    names = list(by_store)
+    results = None
+    if workers > 1 and len(names) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                results = list(ex.map(stream_store, by_store.values(), [start] * len(names),
+                                      [end] * len(names), [rows] * len(names)))
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"Process pool unavailable ({e}); streaming stores serially.")
+    if results is None:
+        results = [stream_store(by_store[s], start, end, rows) for s in names]
+
+    tables = {s: acc.tables() for s, (acc, _) in zip(names, results)}
+    kpis = kpis_from_tables(tables, windows)
+    if trend_days:
+        frames = trend_series([t[0] for t in tables.values()], [t[1] for t in tables.values()],
+                              today, trend_days)
+        for s, trend in zip(names, frames):
+            kpis[s]["trend"] = trend
+    return kpis, {s: bad for s, (_, bad) in zip(names, results)}
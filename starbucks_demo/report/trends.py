@@ -0,0 +1,143 @@
+# report/trends.py
+"""
+Rolling trend series: trailing-window revenue, orders and AOV for every day
+of a period (the last `days` days before `end`) and every store.
+
+Per-store daily aggregates are built once, then every point is O(1):
+
+  revenue  a prefix sum over daily revenue; trailing L days ending on day t
+           is P[t + 1] - P[t + 1 - L]
+  orders   a difference array: each distinct (order, day) adds +1 on its day
+           and -1 L days later, or on the order's next day if that comes
+           first, so its prefix sum counts every order seen on any day of
+           the trailing window exactly once, as order_id.nunique() would
+
+The point for day t covers days t - L + 1 .. t, so the last point (the day
+before `end`) matches the report's "week"/"month" KPIs for those lengths.
+Revenue is summed in whole micro-units (metrics.MICROS), so the difference
+of running sums is exact and gives the correctly rounded window total; it is
+rounded to cents like Revenue.
+
+Inputs are line items (trends_for_stores) or the daily rollup's items and
+baskets tables (DailyRollup.trends); both reduce to (store, day, revenue)
+rows and (store, order, day) rows.
+"""
+import numpy as np
+import pandas as pd
+from .metrics import MICROS
+
+TREND_DAYS = 90
+TREND_WINDOWS = {"7-day": 7, "30-day": 30}
+TREND_METRICS = {"Revenue": "revenue", "Orders": "orders", "AOV": "aov"}
+
+
+def trend_points(end, days: int = TREND_DAYS) -> pd.DatetimeIndex:
+    """The `days` calendar days before `end` (exclusive), oldest first."""
+    end = pd.Timestamp(end).normalize()
+    return pd.date_range(end - pd.Timedelta(days=days), periods=days, freq="D")
+
+
+def _day_offsets(dates: pd.Series, origin: pd.Timestamp) -> np.ndarray:
+    days = dates.to_numpy().astype("datetime64[D]")
+    return (days - np.datetime64(origin.date(), "D")).astype("int64")
+
+
+def _trends(n_stores: int, points: pd.DatetimeIndex, lengths: dict[str, int],
+            rev_store, rev_day, revenue, order_store, order_id, order_day) -> list[pd.DataFrame]:
+    """
+    One trend frame per store from revenue rows (store code, day offset,
+    revenue) and order rows (store code, order_id, day offset). Offsets count
+    from the first day any point can see; rows outside the span are ignored.
+    """
+    n = len(points)
+    span = n + max(lengths.values()) - 1
+    t = np.arange(span - n, span)
+
+    keep = (rev_day >= 0) & (rev_day < span)
+    rev = np.round(np.where(np.isnan(revenue[keep]), 0.0, revenue[keep]) * MICROS)
+    daily = np.bincount(rev_store[keep] * span + rev_day[keep], weights=rev,
+                        minlength=n_stores * span).reshape(n_stores, span)
+    prefix = np.zeros((n_stores, span + 1))
+    np.cumsum(daily, axis=1, out=prefix[:, 1:])
+
+    # Distinct (store, order, day), sorted so each order's days are consecutive
+    keep = (order_day >= 0) & (order_day < span)
+    codes, uniques = pd.factorize(order_id[keep])
+    ok = codes >= 0  # nunique skips missing order_ids
+    cell = np.sort(pd.unique((order_store[keep][ok] * len(uniques) + codes[ok]) * span + order_day[keep][ok]))
+    order, day = cell // span, cell % span
+    store = order // max(len(uniques), 1)
+    nxt = np.full(len(cell), span, dtype="int64")
+    same = order[1:] == order[:-1]
+    nxt[:-1][same] = day[1:][same]
+
+    columns = {"date": points}
+    per_store = [dict(columns) for _ in range(n_stores)]
+    for label, length in lengths.items():
+        stop = np.minimum(np.minimum(day + length, nxt), span)
+        diff = np.bincount(store * (span + 1) + day, minlength=n_stores * (span + 1)) \
+            - np.bincount(store * (span + 1) + stop, minlength=n_stores * (span + 1))
+        active = np.cumsum(diff.reshape(n_stores, span + 1), axis=1)
+        rev_l = (prefix[:, t + 1] - prefix[:, t + 1 - length]) / MICROS
+        orders_l = active[:, t]
+        aov_l = np.where(orders_l > 0, rev_l / np.maximum(orders_l, 1), 0.0).round(2)
+        for s, cols in enumerate(per_store):
+            cols[f"revenue_{label}"] = rev_l[s].round(2)
+            cols[f"orders_{label}"] = orders_l[s]
+            cols[f"aov_{label}"] = aov_l[s]
+    return [pd.DataFrame(cols) for cols in per_store]
+
+
+def _stacked(frames: list[pd.DataFrame], cols: list[str], origin: pd.Timestamp):
+    """(store code, day offset, columns...) arrays over the rows of every frame."""
+    store = np.repeat(np.arange(len(frames)), [len(f) for f in frames]).astype("int64")
+    full = pd.concat([f[cols] for f in frames], ignore_index=True)
+    return store, _day_offsets(full["date"], origin), full
+
+
+def trend_series(revenue_frames: list[pd.DataFrame], order_frames: list[pd.DataFrame], end,
+                 days: int = TREND_DAYS, lengths: dict[str, int] = TREND_WINDOWS) -> list[pd.DataFrame]:
+    """
+    Trend frames for stores given as (date, revenue) rows and (date, order_id)
+    rows, one frame of each per store; the two may be the same line items.
+    """
+    if not revenue_frames:
+        return []
+    points = trend_points(end, days)
+    origin = points[0] - pd.Timedelta(days=max(lengths.values()) - 1)
+    rev_store, rev_day, rev = _stacked(revenue_frames, ["date", "revenue"], origin)
+    order_store, order_day, orders = _stacked(order_frames, ["date", "order_id"], origin)
+    return _trends(len(revenue_frames), points, lengths,
+                   rev_store, rev_day, rev["revenue"].to_numpy(dtype="float64", na_value=np.nan),
+                   order_store, orders["order_id"].to_numpy(), order_day)
+
+
+def trends_for_stores(stores: dict[str, pd.DataFrame], end, days: int = TREND_DAYS,
+                      lengths: dict[str, int] = TREND_WINDOWS) -> dict[str, pd.DataFrame]:
+    """{store: trend frame} from line items; points end the day before `end`."""
+    frames = list(stores.values())
+    return dict(zip(stores, trend_series(frames, frames, end, days, lengths)))
+
+
+def trend_tables(trends: dict[str, pd.DataFrame],
+                 lengths: dict[str, int] = TREND_WINDOWS) -> dict[str, dict[str, pd.DataFrame]]:
+    """
+    {metric: {window label: frame}} for the trend sheets: a Date column, the
+    franchise total ("All Stores") and one column per store (sorted).
+    """
+    stores = sorted(trends)
+    dates = next(iter(trends.values()))["date"].dt.date if trends else []
+    out: dict = {metric: {} for metric in TREND_METRICS}
+    for label in lengths:
+        rev = pd.DataFrame({s: trends[s][f"revenue_{label}"].to_numpy() for s in stores})
+        orders = pd.DataFrame({s: trends[s][f"orders_{label}"].to_numpy() for s in stores})
+        total_rev = rev.sum(axis=1).round(2)
+        total_orders = orders.sum(axis=1)
+        total_aov = (total_rev / total_orders.where(total_orders > 0)).fillna(0.0).round(2)
+        totals = {"Revenue": total_rev, "Orders": total_orders, "AOV": total_aov}
+        for metric, col in TREND_METRICS.items():
+            out[metric][label] = pd.DataFrame({
+                "Date": list(dates), "All Stores": totals[metric].to_numpy(),
+                **{s: trends[s][f"{col}_{label}"].to_numpy() for s in stores},
+            })
+    return out
@@ -0,0 +1,147 @@
+# report/watch.py
+"""
+Watch mode: keep every store's frame and KPIs in memory and rebuild the
+report shortly after new EOD files land, instead of a full run per cron tick.
+
+DATA_DIR is polled (a stat of each CSV; no inotify dependency, and it works
+on network shares). A change to a store's files -- new, modified or removed
+CSVs -- marks that store; once no further change has been seen for
+`debounce` seconds (or `max_wait` after the first change, for a steady
+trickle of uploads) only the marked stores are reloaded and their KPIs
+recomputed, then the report is published once for the whole burst.
+
+Unchanged files of a reloaded store come from the CSV cache when one is
+given. When the date rolls over every store's KPIs are recomputed, since the
+windows move. A store whose file fails to load (e.g. caught mid-upload)
+keeps its previous frame and is retried on the next change. With
+trend_days, each recomputed store's KPIs also carry its trend frame
+(kpis[store]["trend"], see trends.py).
+"""
+import time
+from pathlib import Path
+import pandas as pd
+from .config import DATA_DIR
+from .io_load import _load_store, pretty_store_name_from_path
+from .metrics import kpis_for_windows
+from .trends import trends_for_stores
+
+
+def scan(data_dir: Path = DATA_DIR) -> dict[Path, tuple[int, int]]:
+    """{csv path: (size, mtime_ns)} for every CSV under data_dir."""
+    found = {}
+    for p in data_dir.rglob("*.csv"):
+        try:
+            st = p.stat()
+        except FileNotFoundError:  # removed between listing and stat
+            continue
+        found[p] = (st.st_size, st.st_mtime_ns)
+    return found
+
+
+def changed_stores(old: dict, new: dict, data_dir: Path = DATA_DIR) -> set[str]:
+    """Stores with a CSV added, removed or modified between two scans of data_dir."""
+    paths = {p for p in old.keys() | new.keys() if old.get(p) != new.get(p)}
+    return {pretty_store_name_from_path(p, data_dir) for p in paths}
+
+
+class ReportWatcher:
+    """
+    Resident store frames and KPIs, refreshed per changed store.
+    `publish(stores, kpis, today)` is called after every rebuild.
+    """
+
+    def __init__(self, window_days: dict[str, int], publish, cache=None, data_dir: Path = DATA_DIR,
+                 debounce: float = 5.0, poll: float = 1.0, max_wait: float = 60.0, trend_days: int = 0):
+        self.window_days = window_days
+        self.publish = publish
+        self.cache = cache
+        self.data_dir = data_dir
+        self.debounce = debounce
+        self.poll = poll
+        self.max_wait = max_wait
+        self.trend_days = trend_days
+        self.snapshot: dict[Path, tuple[int, int]] = {}
+        self.stores: dict[str, pd.DataFrame] = {}
+        self.kpis: dict[str, dict] = {}
+        self.today: pd.Timestamp | None = None
+
+    def windows(self, today: pd.Timestamp) -> dict[str, tuple]:
+        return {w: (today - pd.Timedelta(days=d), today) for w, d in self.window_days.items()}
+
+    def refresh(self, pending: set[str] | None = None) -> set[str]:
+        """
+        Reload the pending stores (None = all) plus any changed since the last
+        scan, recompute their KPIs and publish; returns the stores reloaded.
+        """
+        snap = scan(self.data_dir)
+        todo = set() if pending is None else set(pending)
+        todo |= changed_stores(self.snapshot, snap, self.data_dir)
+        self.snapshot = snap
+
+        by_store: dict[str, list[Path]] = {}
+        for csv in snap:
+            by_store.setdefault(pretty_store_name_from_path(csv, self.data_dir), []).append(csv)
+        if pending is None:
+            todo = set(by_store)
+
+        loaded = set()
+        for store in sorted(todo):
+            if store not in by_store:
+                self.stores.pop(store, None)
+                self.kpis.pop(store, None)
+                continue
+            try:
+                self.stores[store] = _load_store(by_store[store], self.cache)[0]
+                loaded.add(store)
+            except (OSError, ValueError, pd.errors.ParserError) as e:
+                print(f"{store}: could not load ({e}); keeping the previous data.")
+        if self.cache is not None:
+            self.cache.save()
+
+        today = pd.Timestamp.today().normalize()
+        recompute = set(self.stores) if today != self.today else loaded
+        if recompute:
+            frames = {s: self.stores[s] for s in sorted(recompute)}
+            self.kpis.update(kpis_for_windows(frames, self.windows(today)))
+            if self.trend_days:
+                for s, trend in trends_for_stores(frames, today, self.trend_days).items():
+                    self.kpis[s]["trend"] = trend
+        self.today = today
+        # Discovery order, as a full run would see it
+        order = [s for s in by_store if s in self.stores]
+        stores = {s: self.stores[s] for s in order}
+        if stores:
+            self.publish(stores, {s: self.kpis[s] for s in order}, today)
+        return loaded
+
+    def run(self, once: bool = False):
+        """Initial full load and publish, then poll until interrupted."""
+        started = time.perf_counter()
+        self.refresh(None)
+        print(f"Loaded {len(self.stores)} store(s) in {time.perf_counter() - started:.1f}s; "
+              f"watching {self.data_dir} (debounce {self.debounce:g}s).")
+        if once:
+            return
+        pending: set[str] = set()
+        first = last = 0.0
+        while True:
+            time.sleep(self.poll)
+            now = time.monotonic()
+            snap = scan(self.data_dir)
+            changed = changed_stores(self.snapshot, snap)
+            if changed:
+                if not pending:
+                    first = now
+                pending |= changed
+                last = now
+                self.snapshot = snap
+            if pending and (now - last >= self.debounce or now - first >= self.max_wait):
+                started = time.perf_counter()
+                loaded = self.refresh(pending)
+                print(f"Rebuilt after changes to {len(pending)} store(s) "
+                      f"({', '.join(sorted(loaded)) or 'none loaded'}) in "
+                      f"{time.perf_counter() - started:.1f}s.")
+                pending = set()
+            elif not pending and pd.Timestamp.today().normalize() != self.today:
+                print("Date rolled over; recomputing every store's windows.")
+                self.refresh(set())
@@ -1,8 +1,14 @@
+import argparse
+import time
+from collections import OrderedDict
 from pathlib import Path
 import pandas as pd
 import re
+from report.profiling import peak_rss_mb
+from report.schema import normalize_eod, read_eod_csv, read_text
 
 DATA_DIR = Path("data")
+DAY_NS = 86_400 * 10**9
 
 def store_folder_from_name(name: str) -> str:
     # works for names like "starbucks_store101_week (1).csv" or "store101_sales.csv"
@@ -21,16 +27,9 @@ def split_weekly_to_daily():
 
     for f in csvs:
         print(f"Processing {f.name} ...")
-        df = pd.read_csv(f)
-        # normalize required columns
-        required = {"date", "order_id", "revenue"}
-        if not required.issubset(df.columns):
-            raise ValueError(f"{f.name} must include columns: {required}")
-        if "category" not in df.columns: df["category"] = "Unknown"
-        if "item" not in df.columns:     df["item"] = "Unknown Item"
-
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df = df.dropna(subset=["date"])
+        # typed and validated per report.schema (defaults for category/item)
+        df, rejects = read_eod_csv(f)
+        _print_rejects(rejects)
 
         store_folder = DATA_DIR / store_folder_from_name(f.name)
         store_folder.mkdir(exist_ok=True)
@@ -43,5 +42,117 @@ def split_weekly_to_daily():
 
     print("Done splitting weekly files.")
 
+
+# ---------------------------------------------------------------------------
+# Streaming mode (bounded memory)
+# ---------------------------------------------------------------------------
+
+class _HandlePool:
+    """At most max_open append handles; least recently used is closed first."""
+
+    def __init__(self, max_open: int):
+        self.max_open = max(1, max_open)
+        self.handles: OrderedDict[Path, object] = OrderedDict()
+        self.started: set[Path] = set()
+
+    def get(self, path: Path):
+        """Return (handle, is_new_file). The first open of a path truncates it."""
+        fh = self.handles.pop(path, None)
+        if fh is None:
+            if len(self.handles) >= self.max_open:
+                self.handles.popitem(last=False)[1].close()
+            fh = open(path, "a" if path in self.started else "w", newline="", encoding="utf-8")
+        self.handles[path] = fh
+        is_new = path not in self.started
+        self.started.add(path)
+        return fh, is_new
+
+    def close(self):
+        for fh in self.handles.values():
+            fh.close()
+        self.handles.clear()
+
+
+def _print_rejects(rejects: list[tuple]):
+    for source, line, reason, _ in rejects:
+        print(f"  !! {Path(source).name} line {line} skipped: {reason}")
+
+
+def _scan(path: Path, chunksize: int):
+    """
+    First pass: per-day witness timestamps (first non-midnight / sub-second
+    values) so each day's dates are formatted as they would be for the whole day.
+    """
+    witnesses = {}
+    for chunk in read_text(path, chunksize=chunksize):
+        dates, _ = normalize_eod(chunk, str(path))
+        dates = dates["date"]
+        ns = dates.dt.as_unit("ns").astype("int64")
+        tod = ns % DAY_NS
+        for kind, mask in enumerate([tod != 0, tod % 10**9 != 0, tod % 10**6 != 0, tod % 10**3 != 0]):
+            if mask.any():
+                for day, ts in dates[mask].groupby(ns[mask] // DAY_NS).first().items():
+                    witnesses.setdefault(day, {}).setdefault(kind, ts)
+    return {d: pd.Series(list(w.values())) for d, w in witnesses.items()}
+
+
+def split_weekly_to_daily_streaming(chunksize: int = 200_000, max_open: int = 64):
+    """
+    Same output as split_weekly_to_daily(), reading each weekly export in
+    chunks and appending rows to per-day files through a bounded handle pool.
+    Each file is read twice (a light scan, then the split) so date formatting
+    matches a full in-memory read.
+    """
+    csvs = list(DATA_DIR.glob("*.csv"))
+    if not csvs:
+        print("No weekly CSVs found in ./data/")
+        return
+
+    t0 = time.perf_counter()
+    total_rows = 0
+    for f in csvs:
+        print(f"Processing {f.name} (streaming) ...")
+        witnesses = _scan(f, chunksize)
+        store_folder = DATA_DIR / store_folder_from_name(f.name)
+        store_folder.mkdir(exist_ok=True)
+
+        pool = _HandlePool(max_open)
+        try:
+            for chunk in read_text(f, chunksize=chunksize):
+                chunk, rejects = normalize_eod(chunk, str(f))
+                _print_rejects(rejects)
+                total_rows += len(chunk)
+
+                day_key = chunk["date"].dt.as_unit("ns").astype("int64") // DAY_NS
+                for key, day_df in chunk.groupby(day_key):
+                    day_df = day_df.copy()
+                    # Format this slice's dates as the whole day would be formatted
+                    w = witnesses.get(key, pd.Series(dtype=day_df["date"].dtype))
+                    text = pd.concat([day_df["date"], w], ignore_index=True).astype(str)
+                    day_df["date"] = text.iloc[:len(day_df)].to_numpy()
+
+                    d = pd.Timestamp(key * DAY_NS).date()
+                    fh, is_new = pool.get(store_folder / f"{d.isoformat()}.csv")
+                    day_df.to_csv(fh, index=False, header=is_new)
+        finally:
+            pool.close()
+        print(f"  -> wrote daily files to {store_folder}")
+
+    elapsed = time.perf_counter() - t0
+    peak = peak_rss_mb()
+    print(f"Done splitting weekly files: {total_rows:,} rows in {elapsed:.1f}s "
+          f"({total_rows / elapsed if elapsed else 0:,.0f} rows/s)"
+          + (f", peak RSS {peak:,.0f} MB" if peak is not None else ""))
+
 if __name__ == "__main__":
-    split_weekly_to_daily()
\ No newline at end of file
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stream", action="store_true",
+                    help="read exports in chunks with bounded memory")
+    ap.add_argument("--chunksize", type=int, default=200_000)
+    ap.add_argument("--max-open", type=int, default=64,
+                    help="max per-day output files held open at once (--stream)")
+    args = ap.parse_args()
+    if args.stream:
+        split_weekly_to_daily_streaming(args.chunksize, args.max_open)
+    else:
+        split_weekly_to_daily()
@@ -0,0 +1,79 @@
+import argparse
+import os
+import time
+import pandas as pd
+from report import cli
+from report.artifacts import ArtifactCache
+from report.profiling import RunProfile
+
+
+def _report(out, name, size=10, age_days=0):
+    path = out / name
+    if path.suffix:
+        path.write_bytes(b"x" * size)
+    else:
+        path.mkdir()
+        (path / "shard_1.xlsx").write_bytes(b"x" * size)
+    then = time.time() - age_days * 86400
+    os.utime(path, (then, then))
+    return path
+
+
+def test_evict_by_age_then_size(tmp_path):
+    out = tmp_path / "output"
+    out.mkdir()
+    old = _report(out, "franchise_report_a.xlsx", age_days=30)
+    mid = _report(out, "franchise_report_b", size=600_000, age_days=2)
+    new = _report(out, "franchise_report_c.xlsx", size=600_000, age_days=1)
+    other = _report(out, "rejected_rows.csv", age_days=30)
+    cache = ArtifactCache(tmp_path / "cache", out)
+    assert cache.evict(max_mb=1.0, max_age_days=7, keep=(new,)) == [old, mid]
+    assert new.exists() and other.exists()
+
+
+def test_discard_keeps_what_a_rebuild_wrote(tmp_path):
+    out = tmp_path / "output"
+    out.mkdir()
+    first = [_report(out, "franchise_report_1.xlsx"), _report(out, "franchise_report_1.pdf")]
+    shards = _report(out, "franchise_report_2")
+    cache = ArtifactCache(tmp_path / "cache", out)
+    assert cache.discard(first + [shards / "shard_1.xlsx"], keep=(first[1],)) == [first[0], shards]
+    assert first[1].exists()
+
+
+def test_watch_rebuilds_replace_previous_reports(tmp_path, monkeypatch):
+    out = tmp_path / "output"
+    out.mkdir()
+    monkeypatch.setattr(cli, "OUTDIR", out)
+    monkeypatch.setattr(cli, "ArtifactCache", lambda: ArtifactCache(tmp_path / "cache", out))
+    written = iter(range(3))
+
+    def publish(args, kpis, today, profile):
+        n = next(written)
+        return [_report(out, f"franchise_report_{n}.xlsx"), _report(out, f"franchise_report_{n}.pdf")]
+
+    class Watcher:
+        def __init__(self, window_days, rebuild, **kwargs):
+            self.rebuild = rebuild
+
+        def run(self):
+            for _ in range(3):
+                self.rebuild({}, {}, pd.Timestamp("2025-09-20"))
+
+    monkeypatch.setattr(cli, "publish", publish)
+    monkeypatch.setattr(cli, "ReportWatcher", Watcher)
+    args = argparse.Namespace(source="csv", no_cache=True, rebuild_cache=False, days_week=7,
+                              days_month=30, debounce=0, poll=0, trend_days=0,
+                              output_max_mb=None, output_max_age_days=None)
+    cli._watch(args, RunProfile())
+    assert sorted(p.name for p in out.iterdir()) == ["franchise_report_2.pdf", "franchise_report_2.xlsx"]
+
+
+def test_evict_other_report_names(tmp_path):
+    out = tmp_path / "output"
+    out.mkdir()
+    old = _report(out, "weekly_report_1.xlsx", age_days=30)
+    franchise = _report(out, "franchise_report_1.xlsx", age_days=30)
+    cache = ArtifactCache(tmp_path / "cache", out, report_glob="weekly_*")
+    assert cache.evict(max_age_days=7) == [old]
+    assert franchise.exists()
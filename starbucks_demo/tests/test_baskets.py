@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+from report.baskets import _name_codes
+from report.metrics import kpis_for_window, kpis_for_windows
+
+START, END = pd.Timestamp("2025-09-15"), pd.Timestamp("2025-09-16")
+
+
+def test_name_codes_all_missing():
+    codes, names = _name_codes(pd.Series([np.nan, np.nan], dtype="category"))
+    assert codes.tolist() == [-1, -1]
+    assert len(names) == 0
+
+
+def test_window_of_blank_items():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2025-09-15", "2025-09-15", "2025-09-16"]),
+        "order_id": [1, 2, 3],
+        "item": pd.Categorical([np.nan, np.nan, "Latte"]),
+        "category": pd.Categorical(["Food", "Drink", "Drink"]),
+        "revenue": [2.0, 3.0, 4.0],
+    })
+    k = kpis_for_window(df, START, END)
+    assert k["Orders"] == 2
+    assert k["% Orders w/ Food"] == 50.0
+    assert k["Frequently Bought Together"].empty
+    assert k["Top 3 Items"]["revenue"].tolist() == [5.0]
+    many = kpis_for_windows({"Store1": df}, {"Day": (START, END)})["Store1"]["Day"]
+    assert many["Orders"] == 2
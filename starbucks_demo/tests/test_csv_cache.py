@@ -0,0 +1,86 @@
+import json
+import os
+import pandas as pd
+from report import csv_cache
+from report.csv_cache import CsvCache
+from report.io_load import load_csv_normalized
+
+HEADER = "date,order_id,item,category,revenue\n"
+
+
+def _csv(path, *rows):
+    path.write_text(HEADER + "".join(f"{r}\n" for r in rows))
+    return path
+
+
+def test_unchanged_files_are_not_parsed(tmp_path, monkeypatch):
+    a = _csv(tmp_path / "a.csv", "2025-09-01,1,Latte,Drink,4.75", "2025-09-01,1,Bagel,Food,2.45")
+    b = _csv(tmp_path / "b.csv", "2025-09-02,2,Mocha,Drink,5.25", "bad,3,Tea,Drink,1")
+    first = CsvCache(tmp_path / "cache")
+    frames = [first.load(a), first.load(b)]
+    first.save()
+    assert (first.hits, first.misses) == (0, 2)
+
+    parsed = []
+    monkeypatch.setattr(csv_cache, "load_csv_normalized", lambda p: parsed.append(p))
+    cache = CsvCache(tmp_path / "cache")
+    for path, want in zip((a, b), frames):
+        got = cache.load(path)
+        pd.testing.assert_frame_equal(got, want)
+        assert got.attrs["rejects"] == want.attrs["rejects"]
+    assert (cache.hits, cache.misses, parsed) == (2, 0, [])
+
+
+def test_touched_file_is_hashed_and_changed_file_reparsed(tmp_path):
+    a = _csv(tmp_path / "a.csv", "2025-09-01,1,Latte,Drink,4.75")
+    b = _csv(tmp_path / "b.csv", "2025-09-02,2,Mocha,Drink,5.25")
+    first = CsvCache(tmp_path / "cache")
+    first.load(a), first.load(b)
+    first.save()
+
+    later = os.stat(a).st_mtime_ns + 5_000_000_000
+    os.utime(a, ns=(later, later))  # same content
+    _csv(b, "2025-09-02,2,Mocha,Drink,6.25")  # same size, new content
+    os.utime(b, ns=(later, later))
+    cache = CsvCache(tmp_path / "cache")
+    cache.load(a)
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert cache.files[a.as_posix()]["mtime_ns"] == later
+    pd.testing.assert_frame_equal(cache.load(b), load_csv_normalized(b))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_save_drops_missing_files_and_version_change_rebuilds(tmp_path, monkeypatch):
+    a = _csv(tmp_path / "a.csv", "2025-09-01,1,Latte,Drink,4.75")
+    b = _csv(tmp_path / "b.csv", "2025-09-02,2,Mocha,Drink,5.25")
+    first = CsvCache(tmp_path / "cache")
+    first.load(a), first.load(b)
+    first.save()
+
+    cache = CsvCache(tmp_path / "cache")
+    cache.load(a)
+    cache.save()  # b was not loaded (or retained) this run
+    manifest = json.loads((tmp_path / "cache" / "manifest.json").read_text())
+    assert list(manifest["files"]) == [a.as_posix()]
+    assert len(list((tmp_path / "cache" / "frames").iterdir())) == 1
+
+    monkeypatch.setattr(csv_cache, "CACHE_VERSION", csv_cache.CACHE_VERSION + 1)
+    assert CsvCache(tmp_path / "cache").files == {}
+
+
+def test_retain_keeps_entries_and_subsets_merge_back(tmp_path):
+    a = _csv(tmp_path / "a.csv", "2025-09-01,1,Latte,Drink,4.75")
+    b = _csv(tmp_path / "b.csv", "2025-09-02,2,Mocha,Drink,5.25")
+    first = CsvCache(tmp_path / "cache")
+    first.load(a), first.load(b)
+    first.save()
+
+    cache = CsvCache(tmp_path / "cache")
+    sub = cache.subset([b])
+    assert list(sub.files) == [b.as_posix()]
+    sub.load(b)
+    cache.merge(sub)
+    cache.retain([a])
+    cache.save()
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert sorted(CsvCache(tmp_path / "cache").files) == sorted([a.as_posix(), b.as_posix()])
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from report.hierarchy import hierarchy_summaries, load_hierarchy
+from report.metrics import SUMMARY_KPIS, kpis_for_window, kpis_for_windows
+
+TODAY = pd.Timestamp("2025-09-20")
+WINDOWS = {"week": (pd.Timestamp("2025-09-13"), TODAY), "month": (pd.Timestamp("2025-08-21"), TODAY)}
+HIERARCHY = pd.DataFrame({"Chain": ["Coffee Co"] * 4 + ["Tea Co"],
+                          "Region": ["East", "East", "East", "West", "North"],
+                          "District": ["D1", "D1", "D2", "D3", "D4"]},
+                         index=["Store1", "Store2", "Store3", "Store4", "Store5"])
+
+
+def _store(seed, days=35, per_day=20):
+    rng = np.random.default_rng(seed)
+    n = days * per_day
+    return pd.DataFrame({
+        "date": TODAY - pd.Timedelta(days=days) + pd.to_timedelta(np.sort(rng.integers(0, days * 86400, n)), "s"),
+        "order_id": seed * 1_000_000 + np.arange(n) // 3,  # order_ids never repeat across stores
+        "item": rng.choice(["Latte", "Bagel", "Mocha"], n),
+        "category": rng.choice(["Drink", "Food", "Seasonal"], n),
+        "revenue": rng.integers(100, 900, n) / 100,
+    })
+
+
+@pytest.mark.parametrize("window", list(WINDOWS))
+def test_levels_match_their_pooled_line_items(window):
+    stores = {f"Store{i}": _store(i) for i in range(1, 7)}  # Store6 is not in the hierarchy
+    kpis = kpis_for_windows(stores, WINDOWS)
+    out = hierarchy_summaries(kpis, HIERARCHY, window, "Range", "text")
+    assert list(out) == ["Chain", "Region", "District"]
+
+    path = {s: tuple(HIERARCHY.loc[s]) if s in HIERARCHY.index else ("Franchise", "Unassigned", "Unassigned")
+            for s in stores}
+    start, end = WINDOWS[window]
+    for depth, level in enumerate(out, start=1):
+        df = out[level]
+        assert list(df.columns) == [level, "Parent", "Stores", "Range", *SUMMARY_KPIS]
+        assert df["Revenue"].sum() == pytest.approx(sum(k[window]["Revenue"] for k in kpis.values()))
+        for row in df.to_dict("records"):
+            members = [s for s, p in path.items() if p[depth - 1] == row[level]
+                       and (depth == 1 or p[depth - 2] == row["Parent"])]
+            assert row["Stores"] == len(members)
+            want = kpis_for_window(pd.concat([stores[s] for s in members]), start, end)
+            for col in SUMMARY_KPIS:
+                assert row[col] == want[col], (level, row[level], col)
+
+
+def test_load_hierarchy(tmp_path):
+    path = tmp_path / "h.csv"
+    path.write_text("store,district,region\nstore 101, D1 ,East\nStore102,,West\nKiosk,D9,\nstore101,D2,East\n")
+    h = load_hierarchy(path)
+    assert h.to_dict("index") == {
+        "Store102": {"Chain": "Franchise", "Region": "West", "District": "Unassigned"},
+        "Kiosk": {"Chain": "Franchise", "Region": "Unassigned", "District": "D9"},
+        "Store101": {"Chain": "Franchise", "Region": "East", "District": "D2"},
+    }
+    path.write_text("store,region\n101,East\n")
+    with pytest.raises(ValueError):
+        load_hierarchy(path)
+    for blank in ("", "  "):
+        path.write_text(f"store,district,region\n101,D1,East\n{blank},D2,West\n")
+        with pytest.raises(ValueError, match=r"h\.csv line 3: store is empty"):
+            load_hierarchy(path)
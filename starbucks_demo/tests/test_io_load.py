@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from report import io_load
+from report.csv_cache import CsvCache
+from report.io_load import collect_store_frames, store_rejects
+
+
+def _write_stores(root, n=4, days=5):
+    rng = np.random.default_rng(0)
+    by_store = {}
+    for i in range(n):
+        folder = root / f"store{101 + i}"
+        folder.mkdir()
+        for d in range(days):
+            rows = 20
+            df = pd.DataFrame({
+                "date": f"2025-09-{d + 1:02d}",
+                "order_id": i * 1000 + d * 10 + np.arange(rows) // 3,
+                "item": rng.choice(["Latte", "Bagel", f"Special{i}"], rows),
+                "category": rng.choice(["Drink", "Food"], rows),
+                "revenue": rng.integers(100, 900, rows) / 100,
+            }).astype({"revenue": object})
+            df.loc[d, "revenue"] = "n/a"  # one reject per file
+            df.to_csv(folder / f"2025-09-{d + 1:02d}.csv", index=False)
+        by_store[f"Store{101 + i}"] = sorted(folder.glob("*.csv"))
+    return by_store
+
+
+def _assert_same(got, want):
+    assert list(got) == list(want)
+    for store in want:
+        pd.testing.assert_frame_equal(got[store], want[store])
+    pd.testing.assert_frame_equal(store_rejects(got), store_rejects(want))
+
+
+def test_pool_matches_serial(tmp_path):
+    by_store = _write_stores(tmp_path)
+    serial = collect_store_frames(by_store=by_store)
+    assert len(store_rejects(serial)) == 4 * 5
+    _assert_same(collect_store_frames(by_store=by_store, workers=3), serial)
+
+
+def test_pool_merges_worker_cache_entries(tmp_path):
+    by_store = _write_stores(tmp_path)
+    serial = collect_store_frames(by_store=by_store)
+    cache = CsvCache(tmp_path / "cache")
+    _assert_same(collect_store_frames(cache=cache, by_store=by_store, workers=2), serial)
+    assert (cache.hits, cache.misses, len(cache.files)) == (0, 20, 20)
+    cache.save()
+
+    again = CsvCache(tmp_path / "cache")
+    _assert_same(collect_store_frames(cache=again, by_store=by_store, workers=2), serial)
+    assert (again.hits, again.misses) == (20, 0)
+
+
+def test_pool_failure_falls_back_to_serial(tmp_path, monkeypatch, capsys):
+    by_store = _write_stores(tmp_path)
+    serial = collect_store_frames(by_store=by_store)
+
+    def broken(*args, **kwargs):
+        raise OSError("no processes")
+
+    monkeypatch.setattr(io_load, "ProcessPoolExecutor", broken)
+    _assert_same(collect_store_frames(by_store=by_store, workers=2), serial)
+    assert "loading stores serially" in capsys.readouterr().out
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from report.metrics import kpis_for_window, kpis_for_windows
+
+TODAY = pd.Timestamp("2025-09-20")
+WINDOWS = {
+    "week": (pd.Timestamp("2025-09-13"), TODAY),
+    "month": (pd.Timestamp("2025-08-21"), TODAY),
+    "hours": (pd.Timestamp("2025-09-15 06:00"), pd.Timestamp("2025-09-17 18:30")),
+    "future": (TODAY, TODAY + pd.Timedelta(days=7)),
+}
+
+
+def _store(seed, days=40, per_day=30):
+    rng = np.random.default_rng(seed)
+    n = days * per_day
+    return pd.DataFrame({
+        "date": TODAY - pd.Timedelta(days=days) + pd.to_timedelta(np.sort(rng.integers(0, days * 86400, n)), "s"),
+        "order_id": seed * 100_000 + np.arange(n) // rng.integers(1, 4),
+        "item": pd.Categorical(rng.choice(["Latte", "Bagel", "Mocha", "Scone", "Tea"], n)),
+        "category": pd.Categorical(rng.choice(["Drink", "Food", "Seasonal", "Merch"], n)),
+        "revenue": rng.choice([0.1, 0.2, 0.35, 1.15, 4.75, 5.25], n),
+    })
+
+
+def _assert_kpis_equal(got, want):
+    assert got.keys() == want.keys()
+    for k, v in want.items():
+        if isinstance(v, pd.DataFrame):
+            pd.testing.assert_frame_equal(got[k], v, check_exact=True)
+        else:
+            assert got[k] == v, k
+
+
+@pytest.mark.parametrize("seeds", [(1,), (1, 2, 3), (4, 5, 6, 7, 8)])
+def test_kpis_for_windows_matches_per_window(seeds):
+    stores = {f"Store{s}": _store(s) for s in seeds}
+    stores["Store0"] = _store(9, days=3)  # nothing in the month's older days
+    kpis = kpis_for_windows(stores, WINDOWS)
+    assert list(kpis) == list(stores)
+    for store, df in stores.items():
+        assert list(kpis[store]) == list(WINDOWS)
+        for label, (a, b) in WINDOWS.items():
+            _assert_kpis_equal(kpis[store][label], kpis_for_window(df, a, b))
+
+
+def test_kpis_for_windows_empty_store():
+    empty = _store(1).iloc[:0]
+    kpis = kpis_for_windows({"Store1": _store(1), "Store2": empty}, WINDOWS)
+    for label, (a, b) in WINDOWS.items():
+        _assert_kpis_equal(kpis["Store2"][label], kpis_for_window(empty, a, b))
+
+
+def test_kpis_for_window_keeps_the_baseline_float_sums():
+    # 0.1 + 0.35 sums to 0.44999999999999996 in float64: the report has always
+    # shown that day's AOV as 0.22, and kpis_for_windows must keep doing so
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2025-09-15 08:00", "2025-09-15 08:05", "2025-09-16 09:00", "2025-09-16 09:30"]),
+        "order_id": [1, 1, 2, 3],
+        "item": ["Latte", "Bagel", "Latte", "Mocha"],
+        "category": ["Drink", "Food", "Drink", "Seasonal"],
+        "revenue": [0.1, 0.2, 0.1, 0.35],
+    })
+    windows = {"both": (pd.Timestamp("2025-09-15"), pd.Timestamp("2025-09-17")),
+               "tue": (pd.Timestamp("2025-09-16"), pd.Timestamp("2025-09-17"))}
+    k = kpis_for_window(df, *windows["tue"])
+    assert {c: k[c] for c in ["Revenue", "Orders", "AOV", "Drinks %", "Seasonal %", "Peak Day"]} == {
+        "Revenue": 0.45, "Orders": 2, "AOV": 0.22, "Drinks %": 22.2, "Seasonal %": 77.8,
+        "Peak Day": "Tue ($0.45)"}
+    assert k["Daily Revenue"]["revenue"].tolist() == [0.44999999999999996]
+    assert k["AOV by Category"]["aov"].tolist() == [0.1, 0.0, 0.35]
+    k = kpis_for_window(df, *windows["both"])
+    assert (k["Revenue"], k["AOV"], k["% Orders w/ Food"]) == (0.75, 0.25, 33.3)
+    assert k["Daily Revenue"]["revenue"].tolist() == [0.30000000000000004, 0.44999999999999996]
+    assert k["Category Revenue"]["percent_of_total"].tolist() == [46.7, 26.7, 26.7]
+    kpis = kpis_for_windows({"Store1": df}, windows)
+    for label, (a, b) in windows.items():
+        _assert_kpis_equal(kpis["Store1"][label], kpis_for_window(df, a, b))
@@ -0,0 +1,67 @@
+import os
+import time
+from pathlib import Path
+import pandas as pd
+import pytest
+from report.io_load import collect_store_frames, discover_store_files, store_rejects
+from report.parquet_store import ingest_to_parquet, load_store_frames_parquet
+
+pytest.importorskip("pyarrow")
+HEADER = "date,order_id,item,category,revenue\n"
+START, END = pd.Timestamp("2025-09-01"), pd.Timestamp("2025-10-01")
+
+
+def _write(path: Path, rows: list[str], later: int = 0):
+    """Write a CSV; `later` seconds in the future marks it modified after the last ingest."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HEADER + "".join(r + "\n" for r in rows))
+    if later:
+        os.utime(path, (time.time() + later,) * 2)
+
+
+@pytest.fixture
+def data(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # DATA_DIR is relative
+    return Path("data")
+
+
+def _load(out):
+    return load_store_frames_parquet(START, END, out_dir=out)["Store101"]
+
+
+def test_reingest_replaces_days_a_csv_no_longer_holds(data, tmp_path):
+    out = tmp_path / "parquet"
+    csv = data / "store101" / "week.csv"
+    _write(csv, ["2025-09-15,1,Latte,Drink,4.5", "2025-09-16,2,Bagel,Food,3"])
+    ingest_to_parquet(data, out)
+    _write(csv, ["2025-09-17,1,Latte,Drink,4.5", "2025-09-17,2,Bagel,Food,3"], later=60)
+    assert ingest_to_parquet(data, out) == 1
+    df = _load(out)
+    assert df["date"].dt.day.tolist() == [17, 17]
+    assert sorted(p.parent.name for p in out.rglob("*.parquet")) == ["date=2025-09-17"]
+
+
+def test_same_stem_in_two_folders(data, tmp_path):
+    out = tmp_path / "parquet"
+    _write(data / "store101" / "eod.csv", ["2025-09-15,1,Latte,Drink,4.5"])
+    _write(data / "2024" / "store101" / "eod.csv", ["2025-09-15,2,Bagel,Food,3"])
+    assert ingest_to_parquet(data, out) == 2
+    assert sorted(_load(out)["order_id"]) == [1, 2]
+    (data / "2024" / "store101" / "eod.csv").unlink()
+    ingest_to_parquet(data, out)
+    assert _load(out)["order_id"].tolist() == [1]
+
+
+def test_rejects_match_csv_source(data, tmp_path):
+    out = tmp_path / "parquet"
+    _write(data / "store101" / "a.csv", ["2025-09-15,1,Latte,Drink,4.5", "2025-09-15,x,Latte,Drink,4.5"])
+    _write(data / "store101" / "b.csv", ["2025-09-16,2,Bagel,Food,3", "2/30/2025,3,Bagel,Food,3"])
+    ingest_to_parquet(data, out)
+    csv_rejects = store_rejects(collect_store_frames(by_store=discover_store_files(data)))
+    parquet_rejects = store_rejects(load_store_frames_parquet(START, END, out_dir=out))
+    assert len(parquet_rejects) == 2
+    pd.testing.assert_frame_equal(parquet_rejects,
+                                  csv_rejects.sort_values(["source", "line"], ignore_index=True))
+    _write(data / "store101" / "b.csv", ["2025-09-16,2,Bagel,Food,3"], later=60)
+    ingest_to_parquet(data, out)
+    assert store_rejects(load_store_frames_parquet(START, END, out_dir=out))["line"].tolist() == [3]
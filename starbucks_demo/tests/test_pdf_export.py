@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from report.hierarchy import hierarchy_summaries
+from report.metrics import kpis_for_windows, report_tables
+from report.pdf_export import export_report_pdf
+from report.trends import trends_for_stores
+
+pytest.importorskip("reportlab")
+pypdf = pytest.importorskip("pypdf")
+
+TODAY = pd.Timestamp("2025-09-20")
+WINDOWS = {"week": (pd.Timestamp("2025-09-13"), TODAY), "month": (pd.Timestamp("2025-08-21"), TODAY)}
+
+
+def _store(seed, days=40):
+    rng = np.random.default_rng(seed)
+    n = days * 10
+    return pd.DataFrame({
+        "date": TODAY - pd.Timedelta(days=days) + pd.to_timedelta(np.arange(n) // 10, "D"),
+        "order_id": np.arange(n) // 2,
+        "item": rng.choice(["Latte", "Bagel", "Mocha"], n),
+        "category": rng.choice(["Drink", "Food", "Seasonal"], n),
+        "revenue": rng.integers(100, 900, n) / 100,
+    })
+
+
+def _pages(path):
+    return [p.extract_text() for p in pypdf.PdfReader(str(path)).pages]
+
+
+def test_pdf_has_trend_and_hierarchy_pages_serial_or_parallel(tmp_path):
+    stores = {f"Store{i}": _store(i) for i in range(101, 105)}
+    kpis = kpis_for_windows(stores, WINDOWS)
+    weekly_df, weekly_tabs = report_tables(kpis, "week", "Week Range", "Sep 13 - Sep 20, 2025")
+    monthly_df, monthly_tabs = report_tables(kpis, "month", "Month Range", "Aug 21 - Sep 20, 2025")
+    trends = trends_for_stores(stores, TODAY, 10)
+    h = pd.DataFrame({"Chain": "Chain", "Region": ["East", "East", "West", "West"],
+                      "District": ["D1", "D2", "D3", "D3"]}, index=list(stores))
+    hierarchy = tuple(hierarchy_summaries(kpis, h, w, "Range", "") for w in ("week", "month"))
+
+    pages = {}
+    for workers in (1, 2):
+        path = tmp_path / f"report_{workers}.pdf"
+        export_report_pdf(weekly_df, monthly_df, weekly_tabs, monthly_tabs, path,
+                          workers=workers, trends=trends, hierarchy=hierarchy)
+        pages[workers] = _pages(path)
+    assert pages[1] == pages[2]
+    text = "\n".join(pages[1])
+    for title in ("Weekly Hierarchy", "Monthly Summary by Region", "Trailing Revenue by Store",
+                  "Trailing 30-day AOV", "Store104 – MONTHLY"):
+        assert title in text
+    assert text.index("Monthly Hierarchy") < text.index("Trailing Orders by Store") < text.index("Store101 –")
@@ -0,0 +1,119 @@
+import argparse
+import tempfile
+import threading
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+from report import cli
+from report.io_load import _load_store
+from report.pipeline import StagedPipeline
+from report.profiling import RunProfile
+
+TODAY = pd.Timestamp("2025-09-20")
+WINDOWS = {"week": (pd.Timestamp("2025-09-13"), TODAY), "month": (pd.Timestamp("2025-08-21"), TODAY)}
+
+
+def test_results_in_input_order_with_bounded_frames():
+    def load(key, value):
+        return [value] * 10
+
+    def compute(key, frame):
+        return sum(frame)
+
+    pipeline = StagedPipeline([("load", load), ("compute", compute), ("render", lambda k, v: v + 1)],
+                              depth=2)
+    out = pipeline.run((i, i) for i in range(50))
+    assert out == [(i, 10 * i + 1) for i in range(50)]
+    assert pipeline.peak_held <= 2 + 2
+    assert set(pipeline.busy) == {"load", "compute", "render"}
+
+
+def test_stage_error_is_raised_and_threads_stop():
+    def compute(key, value):
+        if key == 5:
+            raise ValueError("bad store")
+        return value
+
+    before = threading.active_count()
+    pipeline = StagedPipeline([("load", lambda k, v: v), ("compute", compute), ("render", lambda k, v: v)])
+    with pytest.raises(ValueError, match="bad store"):
+        pipeline.run((i, i) for i in range(100))
+    assert threading.active_count() == before
+
+
+def _write_store(folder, seed):
+    rng = np.random.default_rng(seed)
+    folder.mkdir()
+    n = 300
+    pd.DataFrame({
+        "date": [d.date().isoformat() for d in TODAY - pd.Timedelta(days=30) + pd.to_timedelta(np.arange(n) // 10, "D")],
+        "order_id": np.arange(n) // 2,
+        "item": rng.choice(["Latte", "Bagel", "Mocha"], n),
+        "category": rng.choice(["Drink", "Food"], n),
+        "revenue": rng.integers(100, 900, n) / 100,
+    }).to_csv(folder / "sales.csv", index=False)
+    return [folder / "sales.csv"]
+
+
+class _Future:
+    def __init__(self, fn, args, broken):
+        self.fn, self.args, self.broken = fn, args, broken
+
+    def result(self):
+        if self.broken:
+            raise BrokenProcessPool("worker died")
+        return self.fn(*self.args)
+
+
+class _BreakingPool:
+    """Runs loads inline until the third store, then reports a broken pool."""
+
+    def __init__(self, max_workers):
+        self.submitted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        return _Future(fn, args, broken=self.submitted >= 3)
+
+
+def test_pool_failure_discards_the_first_workbook(tmp_path, monkeypatch):
+    out, scratch = tmp_path / "output", tmp_path / "scratch"
+    out.mkdir()
+    scratch.mkdir()
+    monkeypatch.setattr(cli, "OUTDIR", out)
+    monkeypatch.setattr(cli, "ProcessPoolExecutor", _BreakingPool)
+    monkeypatch.setattr(tempfile, "tempdir", str(scratch))  # xlsxwriter's constant_memory files
+    books = []
+
+    class Book(cli.ReportWorkbook):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            books.append(self)
+
+    monkeypatch.setattr(cli, "ReportWorkbook", Book)
+    by_store = {f"Store{i}": _write_store(tmp_path / f"store{i}", i) for i in range(1, 6)}
+    args = argparse.Namespace(days_week=7, days_month=30, constant_memory=True, trend_days=0,
+                              hierarchy=None, no_rollup=True, rebuild_rollup=False,
+                              pipeline_depth=2, workers=2)
+
+    kpis, rejects, book = cli._report_pipelined(args, RunProfile(), by_store, {}, None, TODAY, WINDOWS)
+    assert sorted(kpis) == sorted(by_store)
+    assert [bool(b.wb.fileclosed) for b in books] == [True, False] and book is books[1]
+    weekly_df, _ = cli.report_tables(kpis, "week", "Week Range", "")
+    monthly_df, _ = cli.report_tables(kpis, "month", "Month Range", "")
+    path = book.close(weekly_df, monthly_df)
+    assert list(out.iterdir()) == [path]
+    assert list(scratch.iterdir()) == []
+    sheets = openpyxl.load_workbook(path).sheetnames
+    assert sheets == ["Summary – Weekly", "Summary – Monthly", *sorted(by_store)]
+    for store, files in by_store.items():
+        df = _load_store(files)[0]
+        assert kpis[store]["week"]["Revenue"] == cli.kpis_for_windows({store: df}, WINDOWS)[store]["week"]["Revenue"]
@@ -0,0 +1,66 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from report.io_load import collect_store_frames
+from report.profiling import RunProfile, peak_rss_mb
+
+
+def test_disabled_profile_records_nothing(tmp_path):
+    profile = RunProfile()
+    assert profile.stage("load") is profile.stage("kpis")  # one shared no-op context
+    with profile.stage("load") as info:
+        info["rows"] = 10
+    profile.add_store_loads({"Store1": pd.DataFrame({"x": [1]})})
+    assert (profile.stages, profile.stores, profile.files) == ([], [], [])
+
+
+def test_stages_record_time_memory_and_counts():
+    profile = RunProfile(enabled=True)
+    with profile.stage("big") as info:
+        block = np.ones(200 * 2**20 // 8)  # 200 MB, touched
+        info["rows"] = len(block)
+        del block
+    with profile.stage("small"):
+        sum(range(100_000))
+    with pytest.raises(RuntimeError):
+        with profile.stage("fails"):
+            raise RuntimeError("boom")
+
+    big, small, fails = profile.stages
+    assert [s["stage"] for s in profile.stages] == ["big", "small", "fails"]
+    assert big["rows"] == 200 * 2**20 // 8
+    assert all(s["wall_s"] >= 0 and s["cpu_s"] >= 0 and s["worker_cpu_s"] >= 0 for s in profile.stages)
+    if peak_rss_mb() is None:
+        return
+    assert big["peak_rss_mb"] >= 200
+    if big["peak_rss_scope"] == small["peak_rss_scope"] == "stage":
+        assert small["peak_rss_mb"] < big["peak_rss_mb"] - 100
+
+
+def test_run_log_lists_stores_files_and_cprofile(tmp_path, capsys):
+    stores = {}
+    for i, rows in enumerate((30, 300, 3)):
+        folder = tmp_path / f"store{i}"
+        folder.mkdir()
+        pd.DataFrame({"date": "2025-09-01", "order_id": range(rows), "item": "Latte", "category": "Drink",
+                      "revenue": 4.75}).to_csv(folder / "2025-09-01.csv", index=False)
+        (folder / "2025-09-02.csv").write_text("date,order_id,item,category,revenue\n2025-09-02,1,Tea,Drink,x\n")
+        stores[f"Store{i}"] = sorted(folder.glob("*.csv"))
+    profile = RunProfile(cprofile=("parse",))
+    assert profile.enabled
+    collect_store_frames(profile=profile, by_store=stores)
+
+    log = profile.write(tmp_path / "logs" / "run.json", top=2)
+    assert json.loads((tmp_path / "logs" / "run.json").read_text()) == json.loads(json.dumps(log, default=str))
+    assert [s["stage"] for s in log["stages"]] == ["parse", "share_categories"]
+    assert log["stages"][0]["rows"] == 333
+    assert {s["store"]: (s["files"], s["rows"], s["rejects"]) for s in log["stores"]} == {
+        "Store0": (2, 30, 1), "Store1": (2, 300, 1), "Store2": (2, 3, 1)}
+    assert len(log["slowest_stores"]) == len(log["slowest_files"]) == 2
+    walls = [s["wall_s"] for s in log["slowest_files"]]
+    assert walls == sorted(walls, reverse=True)
+    stats = log["cprofile"]["parse"]
+    assert (tmp_path / "logs" / "run.parse.prof").exists() and stats["stats_file"].endswith("run.parse.prof")
+    assert any("cumulative" in line or "cumtime" in line for line in stats["top_cumulative"])
+    assert "Run profile written to" in capsys.readouterr().out
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from report.metrics import kpis_for_windows
+from report.rollup import DailyRollup
+
+TODAY = pd.Timestamp("2025-09-20")
+WINDOWS = {"week": (pd.Timestamp("2025-09-13"), TODAY)}
+
+
+def _store(days=8, seed=0):
+    rng = np.random.default_rng(seed)
+    n = days * 20
+    return pd.DataFrame({
+        "date": pd.Timestamp("2025-09-12") + pd.to_timedelta(np.arange(n) // 20, "D"),
+        "order_id": np.arange(n) // 2,
+        "item": pd.Categorical(rng.choice(["Latte", "Bagel", "Mocha"], n)),
+        "category": pd.Categorical(rng.choice(["Drink", "Food"], n)),
+        "revenue": rng.integers(100, 900, n) / 100,
+    })
+
+
+def _orders(rollup):
+    return rollup.kpis_for_windows(WINDOWS)["Store1"]["week"]["Orders"]
+
+
+def test_correction_with_same_count_and_total_is_rebuilt(tmp_path):
+    df = _store()
+    first = DailyRollup(tmp_path)
+    first.update({"Store1": df}, TODAY)
+    first.save()
+    fixed = df.copy()
+    fixed.loc[fixed.index[-1], "order_id"] = 10_000  # same rows, same revenue
+    rollup = DailyRollup(tmp_path)
+    rollup.update({"Store1": fixed}, TODAY)
+    assert rollup.days_built == 1
+    assert _orders(rollup) == kpis_for_windows({"Store1": fixed}, WINDOWS)["Store1"]["week"]["Orders"]
+
+
+def test_window_limited_load_keeps_older_days(tmp_path):
+    df = _store()
+    full = DailyRollup(tmp_path)
+    full.update({"Store1": df}, TODAY)
+    full.save()
+    since = pd.Timestamp("2025-09-16")
+    recent = DailyRollup(tmp_path)
+    recent.update({"Store1": df[df["date"] >= since]}, TODAY, since)
+    recent.save()
+    assert recent.days_built == 0
+    again = DailyRollup(tmp_path)
+    again.update({"Store1": df}, TODAY)
+    assert again.days_built == 0
+    assert len(again.stores["Store1"]["days"]) == 8
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+from report import schema
+
+CSV = """date,order_id,item,category,revenue,register
+2025-09-15,1001,Latte,Coffee,4.50,A
+ 2025-09-15 ,  1002 , Bagel ,Food, 3.25 ,B
+2025-09-15T10:11:12,1003,Mocha,Coffee,5,A
+2025-09-15 10:11:12.123456,1004,,Food,2.5e0,
+9/16/2025,+1005,Scone,Food,.75,B
+09/16/2025,1006,None,NA,1.,A
+2025-09-15,2000.0,Latte,Coffee,4.50,A
+2025-09-15,1e3,Latte,Coffee,4.50,A
+2025-09-15,1007,Latte,Coffee,inf,A
+2025-09-15,1008,Latte,Coffee,1e999,A
+2025-09-15,1009,Latte,Coffee,nan,A
+2025-09-15,1234567890123456789,Latte,Coffee,1,A
+2025-02-30,1010,Latte,Coffee,1,A
+2025-09-15 24:00:00,1011,Latte,Coffee,1,A
+2025-09-15T10:11:12Z,1012,Latte,Coffee,1,A
+2025-09-15 10:11:12.1234567,1013,Latte,Coffee,1,A
+15/9/2025,1014,Latte,Coffee,1,A
+2/30/2025,1015,Latte,Coffee,1,A
+,,Latte,Coffee,,A
+2025-09-17,99999,Tea,Tea,-2.00,B
+"""
+
+
+def _pandas(path):
+    return schema.normalize_eod(schema.read_text(path), str(path))
+
+
+def _arrow(path):
+    return schema._read_eod_arrow(path, schema._pyarrow())
+
+
+@pytest.fixture
+def eod(tmp_path):
+    path = tmp_path / "eod.csv"
+    path.write_text(CSV)
+    return path
+
+
+def test_readers_agree(eod):
+    pytest.importorskip("pyarrow")
+    frame, rejects = _pandas(eod)
+    arrow_frame, arrow_rejects = _arrow(eod)
+    pd.testing.assert_frame_equal(frame, arrow_frame)
+    assert rejects == arrow_rejects
+
+
+def test_validation_rules(eod):
+    frame, rejects = _pandas(eod)
+    assert frame["order_id"].tolist() == [1001, 1002, 1003, 1004, 1005, 1006, 99999]
+    assert frame["order_id"].dtype == "int32"
+    assert frame["date"].tolist()[:6] == pd.to_datetime(
+        ["2025-09-15", "2025-09-15", "2025-09-15 10:11:12", "2025-09-15 10:11:12.123456",
+         "2025-09-16", "2025-09-16"], format="ISO8601").tolist()
+    assert [line for _, line, _, _ in rejects] == list(range(8, 21))
+    assert rejects[0][2] == "order_id invalid '2000.0'"
+    assert rejects[2][2] == "revenue invalid 'inf'"
+    assert rejects[-2][2] == "date invalid '2/30/2025'"
+    assert rejects[-1][2] == "date missing; order_id missing; revenue missing"
+
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_chunks_match_whole_file(eod, monkeypatch, arrow):
+    if not arrow:
+        monkeypatch.setattr(schema, "_pyarrow", lambda: None)
+    frame, rejects = schema.read_eod_csv(eod)
+    pieces = list(schema.read_eod_chunks(eod, rows=4))
+    chunked = schema.concat_eod([f for f, _ in pieces])
+    pd.testing.assert_frame_equal(chunked, schema.concat_eod([frame]))
+    assert [r for _, bad in pieces for r in bad] == rejects
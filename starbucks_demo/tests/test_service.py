@@ -0,0 +1,110 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import pandas as pd
+import pytest
+from report.io_load import _load_store
+from report.metrics import kpis_for_window
+from report.service import KpiService, LruCache, _jsonable, make_server
+
+HEADER = "date,order_id,item,category,revenue\n"
+
+
+def _csv(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HEADER + "".join(f"{r}\n" for r in rows))
+
+
+@pytest.fixture
+def served(tmp_path):
+    _csv(tmp_path / "store101" / "a.csv", ["2025-09-01,1,Latte,Drink,4.75", "2025-09-01,1,Bagel,Food,2.45",
+                                           "2025-09-03,2,Mocha,Drink,5.25"])
+    _csv(tmp_path / "store102" / "a.csv", ["2025-09-02,7,Latte,Drink,4.75"])
+    service = KpiService(data_dir=tmp_path, max_entries=8)
+    service.load()
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield service, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url) as r:
+            return r.status, json.loads(r.read()), r.headers.get("X-Cache")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read()), None
+
+
+def test_lru_cache():
+    lru = LruCache(max_entries=2)
+    lru.put(("A", 1), b"a")
+    lru.put(("B", 1), b"b")
+    assert lru.get(("A", 1)) == b"a"  # A is now the most recent
+    lru.put(("C", 1), b"c")
+    assert lru.get(("B", 1)) is None and lru.get(("C", 1)) == b"c"
+    lru.drop({"A"})
+    assert lru.get(("A", 1)) is None
+    assert lru.stats() == {"entries": 1, "max_entries": 2, "hits": 2, "misses": 2}
+
+
+def test_kpis_endpoint_matches_kpis_for_window_and_caches(served, tmp_path):
+    service, base = served
+    status, body, cache = _get(f"{base}/kpis?store=Store101&start=2025-09-01&end=2025-09-02")
+    assert (status, cache) == (200, "miss")
+    df = _load_store([tmp_path / "store101" / "a.csv"])[0]
+    want = kpis_for_window(df, pd.Timestamp("2025-09-01"), pd.Timestamp("2025-09-03"))
+    assert body == {"store": "Store101", "start": "2025-09-01", "end": "2025-09-02",
+                    "kpis": json.loads(json.dumps(_jsonable(want)))}
+    assert body["kpis"]["Revenue"] == 7.2 and body["kpis"]["Orders"] == 1
+
+    status, again, cache = _get(f"{base}/kpis?store=101&start=2025-09-01&end=2025-09-02")
+    assert (status, again, cache) == (200, body, "hit")
+    status, stores, _ = _get(f"{base}/stores")
+    assert stores["stores"] == {
+        "Store101": {"rows": 3, "first": "2025-09-01T00:00:00", "last": "2025-09-03T00:00:00"},
+        "Store102": {"rows": 1, "first": "2025-09-02T00:00:00", "last": "2025-09-02T00:00:00"}}
+    assert stores["cache"] == {"entries": 1, "max_entries": 8, "hits": 1, "misses": 1}
+
+
+@pytest.mark.parametrize("query, status", [
+    ("kpis?store=Store101&start=2025-09-01", 400),
+    ("kpis?store=Store101&start=2025-09-01&end=09/02/2025", 400),
+    ("kpis?store=Store101&start=2025-09-05&end=2025-09-01", 400),
+    ("kpis?store=Store999&start=2025-09-01&end=2025-09-02", 404),
+    ("report", 404),
+])
+def test_bad_requests(served, query, status):
+    _, base = served
+    got, body, _ = _get(f"{base}/{query}")
+    assert got == status and "error" in body
+
+
+def test_reload_drops_only_the_changed_store(served, tmp_path):
+    service, base = served
+    for store in ("Store101", "Store102"):
+        _get(f"{base}/kpis?store={store}&start=2025-09-01&end=2025-09-03")
+    _csv(tmp_path / "store101" / "b.csv", ["2025-09-02,3,Latte,Drink,1.25"])
+    assert service.reload() == {"Store101"}
+    assert service.reload() == set()
+
+    _, body, cache = _get(f"{base}/kpis?store=Store101&start=2025-09-01&end=2025-09-03")
+    assert (cache, body["kpis"]["Revenue"], body["kpis"]["Orders"]) == ("miss", 13.7, 3)
+    assert _get(f"{base}/kpis?store=Store102&start=2025-09-01&end=2025-09-03")[2] == "hit"
+
+
+def test_flat_custom_data_dir(tmp_path):
+    # CSVs directly under a data_dir other than ./data are named by file, not by the folder
+    flat = tmp_path / "exports"
+    _csv(flat / "store101.csv", ["2025-09-01,1,Latte,Drink,4.75"])
+    _csv(flat / "store102.csv", ["2025-09-01,7,Mocha,Drink,5.25"])
+    service = KpiService(data_dir=flat)
+    service.load()
+    assert sorted(service.frames) == ["Store101", "Store102"]
+
+    _csv(flat / "store102.csv", ["2025-09-01,7,Mocha,Drink,5.25", "2025-09-02,8,Latte,Drink,4.75"])
+    assert service.reload() == {"Store102"}
+    assert len(service.frames["Store101"][1]) == 1 and len(service.frames["Store102"][1]) == 2
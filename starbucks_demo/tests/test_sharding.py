@@ -0,0 +1,105 @@
+import argparse
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+from report.cli import _positive_int
+from report.excel_report import write_excel
+from report.metrics import kpis_for_windows, report_tables
+from report.sharding import load_region_map, shard_stores, write_sharded_excel
+
+TODAY = pd.Timestamp("2025-09-20")
+WINDOWS = {"week": (pd.Timestamp("2025-09-13"), TODAY), "month": (pd.Timestamp("2025-08-21"), TODAY)}
+STORES = ["Store101", "Store102", "Store150", "Store7", "Store210"]
+
+
+def _store(seed):
+    rng = np.random.default_rng(seed)
+    n = 200
+    return pd.DataFrame({
+        "date": TODAY - pd.Timedelta(days=20) + pd.to_timedelta(np.arange(n) // 10, "D"),
+        "order_id": np.arange(n) // 2,
+        "item": rng.choice(["Latte", "Bagel", "Mocha"], n),
+        "category": rng.choice(["Drink", "Food"], n),
+        "revenue": rng.integers(100, 900, n) / 100,
+    })
+
+
+def _report_args():
+    kpis = kpis_for_windows({s: _store(i) for i, s in enumerate(STORES)}, WINDOWS)
+    weekly_df, weekly_tabs = report_tables(kpis, "week", "Week Range", "Sep 13 - Sep 20, 2025")
+    monthly_df, monthly_tabs = report_tables(kpis, "month", "Month Range", "Aug 21 - Sep 20, 2025")
+    return weekly_df, monthly_df, weekly_tabs, monthly_tabs
+
+
+def _sheets(path):
+    wb = openpyxl.load_workbook(path)
+    return {name: list(wb[name].iter_rows(values_only=True)) for name in wb.sheetnames}
+
+
+def test_shard_modes():
+    assert shard_stores(STORES, "size", 2) == {
+        "part001": ["Store101", "Store102"], "part002": ["Store150", "Store210"], "part003": ["Store7"]}
+    assert shard_stores(STORES, "range", 100) == {
+        "Store100-199": ["Store101", "Store102", "Store150"], "Store200-299": ["Store210"],
+        "Store0-99": ["Store7"]}
+    assert shard_stores(STORES + ["Kiosk"], "range", 100)["Other"] == ["Kiosk"]
+    regions = {"Store101": "North East", "Store150": "North/East", "Store7": "South"}
+    assert shard_stores(STORES, "region", regions=regions) == {
+        "North East": ["Store101"], "Unassigned": ["Store102", "Store210"], "North/East": ["Store150"],
+        "South": ["Store7"]}
+    with pytest.raises(ValueError):
+        shard_stores(STORES, "color")
+
+
+@pytest.mark.parametrize("by", ["size", "range"])
+@pytest.mark.parametrize("size", [0, -2])
+def test_shard_size_must_be_positive(by, size):
+    with pytest.raises(ValueError, match="positive"):
+        shard_stores(STORES, by, size)
+    with pytest.raises(argparse.ArgumentTypeError):
+        _positive_int(str(size))
+    assert _positive_int("3") == 3
+
+
+def test_load_region_map(tmp_path):
+    path = tmp_path / "regions.csv"
+    path.write_text("store,region\nstore 101,North \n102, South\nKiosk,East\n")
+    assert load_region_map(path) == {"Store101": "North", "Store102": "South", "Kiosk": "East"}
+    path.write_text("store,zone\n101,North\n")
+    with pytest.raises(ValueError):
+        load_region_map(path)
+    path.write_text("store,region\n101,North\n102,\n")
+    assert load_region_map(path) == {"Store101": "North"}  # no region: unassigned
+    path.write_text("store,region\n101,North\n,South\n")
+    with pytest.raises(ValueError, match=r"regions\.csv line 3: store is empty"):
+        load_region_map(path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_shards_hold_the_unsharded_tabs(tmp_path, workers):
+    weekly_df, monthly_df, weekly_tabs, monthly_tabs = _report_args()
+    whole = _sheets(write_excel(weekly_df, monthly_df, weekly_tabs, monthly_tabs, out_dir=tmp_path))
+    # Labels that collide once made file-safe still get their own file
+    shards = shard_stores(STORES, "region", regions={"Store101": "North East", "Store150": "North/East"})
+    index, paths = write_sharded_excel(weekly_df, monthly_df, weekly_tabs, monthly_tabs, shards,
+                                       workers=workers, out_dir=tmp_path / "out")
+    assert [p.name for p in paths] == ["North_East.xlsx", "Unassigned.xlsx", "North_East_.xlsx"]
+
+    seen = []
+    for stores, path in zip(shards.values(), paths):
+        sheets = _sheets(path)
+        assert list(sheets) == stores
+        for store in stores:
+            assert sheets[store] == whole[store]
+        seen += stores
+    assert sorted(seen) == sorted(STORES)
+
+    index_sheets = _sheets(index)
+    assert list(index_sheets) == ["Summary – Weekly", "Summary – Monthly", "Shards"]
+    for name in ("Summary – Weekly", "Summary – Monthly"):
+        assert index_sheets[name] == whole[name]
+    listing = index_sheets["Shards"][2:]
+    assert listing == [("North East", "North_East.xlsx", 1, "Store101", "Store101"),
+                       ("Unassigned", "Unassigned.xlsx", 3, "Store102", "Store7"),
+                       ("North/East", "North_East_.xlsx", 1, "Store150", "Store150")]
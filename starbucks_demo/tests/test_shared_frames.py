@@ -0,0 +1,40 @@
+import pandas as pd
+from report.metrics import kpis_for_windows
+from report.schema import normalize_eod, shared_categories
+from report.shared_frames import attach_frames, map_stores, SharedFrames
+
+
+def _store(text):
+    return normalize_eod(pd.read_csv(pd.io.common.StringIO(text), dtype=str), "x")[0]
+
+
+STORES = {
+    "Store1": _store("date,order_id,item,category,revenue,register\n"
+                     "2025-09-15,1,Latte,Coffee,4.5,A\n2025-09-15,1,Bagel,Food,3\n"),
+    "Store2": _store("revenue,category,order_id,date\n2.5,Tea,7,2025-09-16\n"),
+    "Store3": _store("date,order_id,revenue,item\n2025-09-16,9,1.25,Latte\n"),
+}
+STORES = dict(zip(STORES, shared_categories(list(STORES.values()))))  # as collect_store_frames
+WINDOWS = {"Weekly": (pd.Timestamp("2025-09-15"), pd.Timestamp("2025-09-22"))}
+
+
+def test_reordered_and_missing_columns_share():
+    with SharedFrames(STORES) as shared:
+        views = attach_frames(shared.handle)
+        for name, df in STORES.items():
+            view = views[name]
+            assert list(view.columns) == ["date", "order_id", "item", "category", "revenue", "register"]
+            for c in df.columns:
+                assert view[c].astype(object).tolist() == df[c].astype(object).tolist()
+
+
+def test_map_stores_matches_serial():
+    serial = kpis_for_windows(STORES, WINDOWS)
+    pooled = map_stores(kpis_for_windows, STORES, 2, WINDOWS)
+    for store, by_label in serial.items():
+        for key, value in by_label["Weekly"].items():
+            other = pooled[store]["Weekly"][key]
+            if isinstance(value, pd.DataFrame):
+                pd.testing.assert_frame_equal(value, other)
+            else:
+                assert value == other
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+import split_to_daily
+
+
+def _weekly(path, seed, n=300):
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp("2025-09-01") + pd.to_timedelta(rng.integers(0, 7, n), "D")
+    # Day 3 has times of day (one with milliseconds), the other days are bare dates
+    times = np.where(days.day == 3, rng.integers(0, 86400, n), 0)
+    dates = days + pd.to_timedelta(times, "s")
+    text = [str(d.date()) if d.day != 3 else str(d) for d in dates]
+    text[np.flatnonzero(days.day == 3)[-1]] = "2025-09-03 23:59:59.250"
+    df = pd.DataFrame({
+        "date": text,
+        "order_id": np.arange(n) // 2,
+        "item": rng.choice(["Latte", "Bagel", "Mocha"], n),
+        "category": rng.choice(["Drink", "Food", ""], n),
+        "revenue": (rng.integers(100, 900, n) / 100).astype(object),
+    })
+    df.loc[[5, 150], "revenue"] = "oops"
+    df.to_csv(path, index=False)
+
+
+def _split(monkeypatch, data_dir, streaming):
+    monkeypatch.setattr(split_to_daily, "DATA_DIR", data_dir)
+    if streaming:
+        split_to_daily.split_weekly_to_daily_streaming(chunksize=37, max_open=2)
+    else:
+        split_to_daily.split_weekly_to_daily()
+    return {p.relative_to(data_dir).as_posix(): p.read_bytes()
+            for p in sorted(data_dir.rglob("*.csv")) if p.parent != data_dir}
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_streaming_split_matches_in_memory(tmp_path, monkeypatch, seed):
+    outputs = {}
+    for streaming in (False, True):
+        data = tmp_path / f"data_{streaming}"
+        data.mkdir()
+        _weekly(data / "starbucks_store101_week (1).csv", seed)
+        _weekly(data / "store102_sales.csv", seed + 10)
+        outputs[streaming] = _split(monkeypatch, data, streaming)
+    assert len(outputs[False]) == 14
+    assert outputs[True] == outputs[False]
+
+
+def test_handle_pool_reopens_for_append(tmp_path):
+    pool = split_to_daily._HandlePool(max_open=1)
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    a.write_text("stale\n")
+    for path, text in ((a, "1\n"), (b, "2\n"), (a, "3\n")):
+        fh, is_new = pool.get(path)
+        fh.write(("h\n" if is_new else "") + text)
+        assert len(pool.handles) == 1
+    pool.close()
+    assert a.read_text() == "h\n1\n3\n" and b.read_text() == "h\n2\n"
@@ -0,0 +1,108 @@
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+import pytest
+from report import streaming
+from report.metrics import kpis_for_window
+from report.rollup import kpis_from_tables
+from report.schema import read_eod_csv
+from report.trends import trends_for_stores
+
+TODAY = pd.Timestamp("2025-09-20")
+WINDOWS = {"week": (pd.Timestamp("2025-09-13"), TODAY), "month": (pd.Timestamp("2025-08-21"), TODAY)}
+# Prices in quarters sum exactly in float64, so a line-item run has no rounding
+# error and the micro-unit sums of the stream must match it to the bit
+PRICES = [0.25, 1.25, 2.5, 3.75, 4.75, 5.25, 6.5]
+CENT_PRICES = [0.1, 0.35, 1.15, 2.45, 3.95, 4.75, 5.25, 6.45]
+
+
+def _write_store(folder, seed, days=35, prices=PRICES):
+    """One CSV per day plus a file holding late rows for earlier days."""
+    rng = np.random.default_rng(seed)
+    folder.mkdir()
+    n = 40
+    for d in pd.date_range(TODAY - pd.Timedelta(days=days), periods=days):
+        pd.DataFrame({
+            "date": d.date().isoformat(),
+            "order_id": seed * 100_000 + d.dayofyear * 100 + np.arange(n) // 3,
+            "item": rng.choice(["Latte", "Bagel", "Mocha", "Scone"], n),
+            "category": rng.choice(["Drink", "Food", "Seasonal"], n),
+            "revenue": rng.choice(prices, n),
+        }).to_csv(folder / f"{d.date()}.csv", index=False)
+    pd.DataFrame({"date": ["2025-09-14", "2025-09-01"], "order_id": [1, 2], "item": ["Latte", "Tea"],
+                  "category": ["Drink", "Drink"], "revenue": [prices[0], prices[1]]}) \
+        .to_csv(folder / "late.csv", index=False)
+    return sorted(folder.glob("*.csv"))
+
+
+def _assert_kpis_equal(got, want):
+    assert got.keys() == want.keys()
+    for k, v in want.items():
+        if isinstance(v, pd.DataFrame):
+            pd.testing.assert_frame_equal(got[k].reset_index(drop=True), v.reset_index(drop=True),
+                                          check_dtype=False, check_categorical=False, check_exact=True)
+        else:
+            assert got[k] == v, k
+
+
+@pytest.mark.parametrize("rows", [25, 100_000])
+def test_stream_matches_line_items(tmp_path, monkeypatch, rows):
+    monkeypatch.setattr(streaming, "COMPACT_ROWS", 50)  # compact many times
+    start = min(s for s, _ in WINDOWS.values())
+    files = {f"Store{i}": _write_store(tmp_path / f"store{i}", i) for i in (1, 2)}
+    tables, frames = {}, {}
+    for store, paths in files.items():
+        acc, rejects = streaming.stream_store(paths, start, TODAY, rows)
+        assert rejects == []
+        tables[store] = acc.tables()
+        frames[store] = pd.concat([read_eod_csv(p)[0] for p in paths], ignore_index=True)
+    kpis = kpis_from_tables(tables, WINDOWS)
+    for store, df in frames.items():
+        for label, (a, b) in WINDOWS.items():
+            _assert_kpis_equal(kpis[store][label], kpis_for_window(df, a, b))
+
+
+def test_stream_revenue_is_correctly_rounded(tmp_path):
+    # With cent prices a float64 sum of line items drifts in the last digit;
+    # the stream sums in micro-units and gives the exact total's nearest float
+    start = min(s for s, _ in WINDOWS.values())
+    paths = _write_store(tmp_path / "store1", 1, prices=CENT_PRICES)
+    acc, _ = streaming.stream_store(paths, start, TODAY, 50)
+    kpis = kpis_from_tables({"Store1": acc.tables()}, WINDOWS)["Store1"]
+    df = pd.concat([read_eod_csv(p)[0] for p in paths], ignore_index=True)
+    for label, (a, b) in WINDOWS.items():
+        win = df[(df["date"] >= a) & (df["date"] < b)]
+        exact = {c: float(sum(map(Decimal, g.astype(str)))) for c, g in win.groupby("category")["revenue"]}
+        got = kpis[label]["Category Revenue"]
+        assert dict(zip(got["category"], got["revenue"])) == exact
+        assert kpis[label]["Revenue"] == round(float(sum(map(Decimal, win["revenue"].astype(str)))), 2)
+        want = kpis_for_window(df, a, b)
+        pd.testing.assert_frame_equal(got.reset_index(drop=True), want["Category Revenue"], check_dtype=False,
+                                      check_categorical=False, check_exact=False, rtol=1e-12)
+
+
+def test_stream_kpis_trends_match_line_items(tmp_path):
+    files = {f"Store{i}": _write_store(tmp_path / f"store{i}", i, days=60) for i in (1, 2)}
+    kpis, _ = streaming.stream_kpis(files, WINDOWS, TODAY, trend_days=20, rows=50)
+    frames = {s: pd.concat([read_eod_csv(p)[0] for p in paths], ignore_index=True)
+              for s, paths in files.items()}
+    for store, trend in trends_for_stores(frames, TODAY, 20).items():
+        pd.testing.assert_frame_equal(kpis[store]["trend"], trend, check_exact=True)
+
+
+def test_merge_in_any_order(tmp_path):
+    start = min(s for s, _ in WINDOWS.values())
+    paths = _write_store(tmp_path / "store1", 1)
+    parts = []
+    for p in paths:
+        part, _ = streaming.stream_store([p], start, TODAY)
+        parts.append(part)
+    forward, backward = streaming.WindowAccumulator(start, TODAY), streaming.WindowAccumulator(start, TODAY)
+    for part in parts:
+        forward.merge(part)
+    for part in reversed(parts):
+        backward.merge(part)
+    for a, b in zip(forward.tables(), backward.tables()):
+        cols = list(a.columns[:-1])
+        pd.testing.assert_frame_equal(a.sort_values(cols, ignore_index=True),
+                                      b.sort_values(cols, ignore_index=True), check_exact=True)
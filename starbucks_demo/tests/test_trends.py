@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from report.metrics import kpis_for_window
+from report.rollup import DailyRollup
+from report.trends import TREND_WINDOWS, trend_points, trend_tables, trends_for_stores
+
+TODAY = pd.Timestamp("2025-09-20")
+DAYS = 12
+
+
+def _store(seed, days=50, per_day=25):
+    rng = np.random.default_rng(seed)
+    n = days * per_day
+    return pd.DataFrame({
+        "date": TODAY - pd.Timedelta(days=days) + pd.to_timedelta(np.sort(rng.integers(0, days * 86400, n)), "s"),
+        # ids reused across days: one order can span several days of a window
+        "order_id": rng.integers(0, n // 4, n),
+        "item": rng.choice(["Latte", "Bagel", "Mocha"], n),
+        "category": rng.choice(["Drink", "Food"], n),
+        "revenue": rng.choice([0.1, 0.2, 0.35, 1.15, 4.75], n),
+    })
+
+
+def test_trend_points():
+    points = trend_points(TODAY + pd.Timedelta(hours=5), 3)
+    assert list(points) == list(pd.date_range("2025-09-17", "2025-09-19"))
+
+
+def test_trends_match_direct_window_recompute():
+    stores = {"Store1": _store(1), "Store2": _store(2, days=20), "Store3": _store(3).iloc[:0]}
+    trends = trends_for_stores(stores, TODAY, DAYS)
+    for store, df in stores.items():
+        trend = trends[store]
+        assert list(trend["date"]) == list(trend_points(TODAY, DAYS))
+        for i, day in enumerate(trend["date"]):
+            for label, length in TREND_WINDOWS.items():
+                want = kpis_for_window(df, day - pd.Timedelta(days=length - 1), day + pd.Timedelta(days=1))
+                got = trend.iloc[i]
+                assert got[f"revenue_{label}"] == want["Revenue"], (store, day, label)
+                assert got[f"orders_{label}"] == want["Orders"], (store, day, label)
+                assert got[f"aov_{label}"] == want["AOV"], (store, day, label)
+
+
+def test_rollup_trends_match_line_items(tmp_path):
+    stores = {"Store1": _store(1), "Store2": _store(2)}
+    rollup = DailyRollup(tmp_path)
+    rollup.update(stores, TODAY)
+    direct = trends_for_stores(stores, TODAY, DAYS)
+    for store, trend in rollup.trends(TODAY, DAYS).items():
+        pd.testing.assert_frame_equal(trend, direct[store], check_exact=True)
+
+
+def test_trend_tables_total_the_stores():
+    stores = {"Store2": _store(2), "Store1": _store(1)}
+    trends = trends_for_stores(stores, TODAY, DAYS)
+    tables = trend_tables(trends)
+    for label in TREND_WINDOWS:
+        rev, orders, aov = (tables[m][label] for m in ("Revenue", "Orders", "AOV"))
+        assert list(rev.columns) == ["Date", "All Stores", "Store1", "Store2"]
+        assert rev["All Stores"].tolist() == (rev["Store1"] + rev["Store2"]).round(2).tolist()
+        assert orders["All Stores"].tolist() == (orders["Store1"] + orders["Store2"]).tolist()
+        assert aov["All Stores"].tolist() == (rev["All Stores"] / orders["All Stores"]).round(2).tolist()
+        assert rev["Store1"].tolist() == trends["Store1"][f"revenue_{label}"].tolist()
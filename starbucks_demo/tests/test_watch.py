@@ -0,0 +1,126 @@
+import pandas as pd
+import pytest
+from report import watch
+from report.metrics import kpis_for_windows
+from report.watch import ReportWatcher, changed_stores, scan
+
+TODAY = pd.Timestamp.today().normalize()
+HEADER = "date,order_id,item,category,revenue\n"
+
+
+def _csv(path, rows=1, revenue=4.75):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    day = (TODAY - pd.Timedelta(days=1)).date()
+    path.write_text(HEADER + "".join(f"{day},{i},Latte,Drink,{revenue}\n" for i in range(rows)))
+
+
+class _Stop(Exception):
+    pass
+
+
+class _Clock:
+    """Fake time for ReportWatcher.run: `events` {second: action} fire as sleep() reaches them."""
+
+    def __init__(self, events: dict, until: float):
+        self.now, self.events, self.until = 0.0, dict(events), until
+
+    def sleep(self, seconds):
+        self.now += seconds
+        for t in sorted(t for t in self.events if t <= self.now):
+            self.events.pop(t)()
+        if self.now > self.until:
+            raise _Stop
+
+    def monotonic(self):
+        return self.now
+
+
+def _run(monkeypatch, watcher, events, until):
+    clock = _Clock(events, until)
+    monkeypatch.setattr(watch.time, "sleep", clock.sleep)
+    monkeypatch.setattr(watch.time, "monotonic", clock.monotonic)
+    with pytest.raises(_Stop):
+        watcher.run()
+
+
+def _watcher(data, published, **kwargs):
+    def publish(stores, kpis, today):
+        published.append((round(watch.time.monotonic()), sorted(stores), kpis))
+    return ReportWatcher({"week": 7}, publish, data_dir=data, **kwargs)
+
+
+def test_scan_and_changed_stores(tmp_path):
+    _csv(tmp_path / "store1" / "a.csv")
+    _csv(tmp_path / "store2" / "a.csv")
+    before = scan(tmp_path)
+    _csv(tmp_path / "store1" / "a.csv", rows=2)
+    _csv(tmp_path / "store3" / "a.csv")
+    (tmp_path / "store2" / "a.csv").unlink()
+    assert changed_stores(before, scan(tmp_path)) == {"Store1", "Store2", "Store3"}
+    assert changed_stores(before, before) == set()
+
+
+def test_burst_is_debounced_into_one_rebuild(tmp_path, monkeypatch):
+    for s in (1, 2, 3):
+        _csv(tmp_path / f"store{s}" / "a.csv")
+    published = []
+    watcher = _watcher(tmp_path, published, debounce=5, poll=1)
+    loads = []
+    real_load = watch._load_store
+
+    def load(files, cache):
+        loads.append(files[0].parent.name)
+        return real_load(files, cache)
+
+    monkeypatch.setattr(watch, "_load_store", load)
+    events = {2: lambda: _csv(tmp_path / "store1" / "b.csv"),
+              4: lambda: _csv(tmp_path / "store2" / "a.csv", rows=3),
+              7: lambda: _csv(tmp_path / "store2" / "a.csv", rows=4)}
+    _run(monkeypatch, watcher, events, until=30)
+
+    assert [(t, stores) for t, stores, _ in published] == [(0, ["Store1", "Store2", "Store3"]),
+                                                            (12, ["Store1", "Store2", "Store3"])]
+    assert sorted(loads[3:]) == ["store1", "store2"]  # store3 stays resident
+    kpis = published[-1][2]
+    want = kpis_for_windows({s: watcher.stores[s] for s in kpis}, watcher.windows(TODAY))
+    assert {s: k["week"]["Orders"] for s, k in kpis.items()} == {"Store1": 1, "Store2": 4, "Store3": 1}
+    assert all(kpis[s]["week"]["Revenue"] == want[s]["week"]["Revenue"] for s in kpis)
+
+
+def test_steady_trickle_rebuilds_after_max_wait(tmp_path, monkeypatch):
+    _csv(tmp_path / "store1" / "a.csv")
+    published = []
+    watcher = _watcher(tmp_path, published, debounce=5, poll=1, max_wait=10)
+    events = {t: (lambda t=t: _csv(tmp_path / "store1" / f"{t}.csv")) for t in range(2, 30, 2)}
+    _run(monkeypatch, watcher, events, until=25)
+    assert [t for t, _, _ in published] == [0, 12, 24]
+
+
+def test_failed_load_keeps_previous_frame_and_removed_store_drops(tmp_path, capsys):
+    _csv(tmp_path / "store1" / "a.csv", rows=2)
+    _csv(tmp_path / "store2" / "a.csv")
+    published = []
+    watcher = _watcher(tmp_path, published)
+    watcher.refresh(None)
+    (tmp_path / "store1" / "b.csv").write_text("half,an,upload\n")
+    for p in (tmp_path / "store2").iterdir():
+        p.unlink()
+    assert watcher.refresh(set()) == set()
+    assert "Store1: could not load" in capsys.readouterr().out
+    assert list(watcher.stores) == ["Store1"] and len(watcher.stores["Store1"]) == 2
+    assert published[-1][1] == ["Store1"]
+
+    _csv(tmp_path / "store1" / "b.csv", revenue=1.25)  # upload completed
+    assert watcher.refresh(set()) == {"Store1"}
+    assert watcher.kpis["Store1"]["week"]["Revenue"] == 4.75 * 2 + 1.25
+
+
+def test_flat_custom_data_dir(tmp_path):
+    _csv(tmp_path / "store1.csv")
+    _csv(tmp_path / "store2.csv")
+    published = []
+    watcher = _watcher(tmp_path, published)
+    assert watcher.refresh(None) == {"Store1", "Store2"}
+    _csv(tmp_path / "store2.csv", rows=3)
+    assert watcher.refresh(set()) == {"Store2"}
+    assert {s: k["week"]["Orders"] for s, k in watcher.kpis.items()} == {"Store1": 1, "Store2": 3}